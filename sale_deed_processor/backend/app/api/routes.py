@@ -26,9 +26,13 @@ class StartProcessingRequest(BaseModel):
     max_workers: int = 2          # For legacy mode or total workers
     ocr_workers: Optional[int] = None  # For pipeline mode
     llm_workers: Optional[int] = None  # For pipeline mode
+    table_workers: Optional[int] = None  # For pipeline mode (YOLO table detection)
     stage2_queue_size: Optional[int] = None  # Bounded queue size for Stage-2
     enable_ocr_multiprocessing: Optional[bool] = None  # Enable OCR multiprocessing
     ocr_page_workers: Optional[int] = None  # OCR page-level workers
+
+class StartBulkProcessingRequest(BaseModel):
+    backend: Optional[str] = None  # "gemini", "vllm" or "local" (default BULK_BATCH_BACKEND)
 from app.models import DocumentDetail, PropertyDetail, BuyerDetail, SellerDetail
 from app.utils.file_handler import FileHandler
 from app.config import settings
@@ -44,7 +48,8 @@ if settings.ENABLE_PIPELINE:
 
     pipeline_processor = PipelineBatchProcessor(
         max_ocr_workers=settings.MAX_OCR_WORKERS,
-        max_llm_workers=settings.MAX_LLM_WORKERS
+        max_llm_workers=settings.MAX_LLM_WORKERS,
+        max_table_workers=settings.MAX_TABLE_WORKERS
     )
     pdf_processor_v2 = PDFProcessorV2(batch_processor=pipeline_processor)
     batch_processor = pipeline_processor  # For compatibility
@@ -113,6 +118,7 @@ async def start_batch_processing(background_tasks: BackgroundTasks, request: Sta
             # Pipeline Mode (V2): Separate OCR and LLM workers
             ocr_workers = request.ocr_workers if request.ocr_workers is not None else settings.MAX_OCR_WORKERS
             llm_workers = request.llm_workers if request.llm_workers is not None else settings.MAX_LLM_WORKERS
+            table_workers = request.table_workers if request.table_workers is not None else settings.MAX_TABLE_WORKERS
 
             # Handle new settings (apply runtime overrides)
             if request.stage2_queue_size is not None:
@@ -133,13 +139,17 @@ async def start_batch_processing(background_tasks: BackgroundTasks, request: Sta
                 raise HTTPException(status_code=400, detail="ocr_workers must be between 1 and 20")
             if llm_workers < 1 or llm_workers > 20:
                 raise HTTPException(status_code=400, detail="llm_workers must be between 1 and 20")
+            if table_workers < 1 or table_workers > 20:
+                raise HTTPException(status_code=400, detail="table_workers must be between 1 and 20")
 
             # Update pipeline processor
             pipeline_processor.max_ocr_workers = ocr_workers
             pipeline_processor.max_llm_workers = llm_workers
+            pipeline_processor.max_table_workers = table_workers
 
             logger.info(
-                f"Starting pipeline processing: {ocr_workers} OCR + {llm_workers} LLM workers, "
+                f"Starting pipeline processing: {ocr_workers} OCR + {llm_workers} LLM + "
+                f"{table_workers} table workers, "
                 f"Queue size: {settings.STAGE2_QUEUE_SIZE}, "
                 f"OCR multiprocessing: {settings.ENABLE_OCR_MULTIPROCESSING}, "
                 f"OCR page workers: {settings.OCR_PAGE_WORKERS}"
@@ -159,6 +169,7 @@ async def start_batch_processing(background_tasks: BackgroundTasks, request: Sta
                 "total_files": len(pdf_files),
                 "ocr_workers": ocr_workers,
                 "llm_workers": llm_workers,
+                "table_workers": table_workers,
                 "stage2_queue_size": settings.STAGE2_QUEUE_SIZE,
                 "enable_ocr_multiprocessing": settings.ENABLE_OCR_MULTIPROCESSING,
                 "ocr_page_workers": settings.OCR_PAGE_WORKERS,
@@ -195,6 +206,54 @@ async def start_batch_processing(background_tasks: BackgroundTasks, request: Sta
         logger.error(f"Start processing error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/process/bulk/start", response_model=dict)
+async def start_bulk_processing(background_tasks: BackgroundTasks, request: StartBulkProcessingRequest = StartBulkProcessingRequest()):
+    """Start bulk processing: OCR as usual, LLM stage as one batch-inference job (pipeline mode only)"""
+    from app.services.batch_inference import get_batch_backend
+
+    try:
+        if not settings.ENABLE_PIPELINE:
+            raise HTTPException(status_code=400, detail="Bulk processing requires pipeline mode")
+
+        if batch_processor.is_running:
+            raise HTTPException(status_code=400, detail="Batch processing already running")
+
+        try:
+            backend = get_batch_backend(request.backend)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        pdf_files = FileHandler.get_pdf_files(settings.NEWLY_UPLOADED_DIR)
+
+        if not pdf_files:
+            return {
+                "success": False,
+                "message": "No PDF files found in newly_uploaded folder"
+            }
+
+        logger.info(f"Starting bulk processing: {len(pdf_files)} PDFs via {backend.name} batch backend")
+
+        background_tasks.add_task(
+            pipeline_processor.process_bulk_batch,
+            pdf_files,
+            pdf_processor_v2,
+            pdf_processor_v2,
+            backend
+        )
+
+        return {
+            "success": True,
+            "message": f"Started bulk processing of {len(pdf_files)} PDFs via {backend.name} batch backend",
+            "total_files": len(pdf_files),
+            "batch_backend": backend.name
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Start bulk processing error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/process/stop", response_model=dict)
 async def stop_batch_processing():
     """Stop PDF OCR batch processing (completes current tasks)"""
@@ -381,6 +440,40 @@ async def get_document(document_id: str, db: Session = Depends(get_db)):
     
     return document
 
+# ==================== LLM USAGE ENDPOINTS ====================
+
+@router.get("/usage/summary", response_model=dict)
+async def get_usage_summary(db: Session = Depends(get_db)):
+    """LLM token, latency and cost totals over all documents, per backend"""
+    from app.services.llm_usage_store import aggregate_usage
+    return aggregate_usage(db)
+
+@router.get("/usage/batches", response_model=List[dict])
+async def get_batch_usage_list(limit: int = 50, db: Session = Depends(get_db)):
+    """LLM usage totals of the most recent batches"""
+    from app.services.llm_usage_store import list_batch_usage
+    return list_batch_usage(db, limit=limit)
+
+@router.get("/usage/batches/{batch_id}", response_model=dict)
+async def get_batch_usage(batch_id: str, db: Session = Depends(get_db)):
+    """LLM usage totals of one batch, per backend"""
+    from app.services.llm_usage_store import aggregate_usage
+
+    usage = aggregate_usage(db, batch_id=batch_id)
+    if not usage["documents"]:
+        raise HTTPException(status_code=404, detail="No LLM usage recorded for this batch")
+    return usage
+
+@router.get("/usage/documents/{document_id}", response_model=List[dict])
+async def get_document_usage(document_id: str, db: Session = Depends(get_db)):
+    """LLM calls of a document, one entry per processing attempt"""
+    from app.services.llm_usage_store import get_document_usage as load_document_usage
+
+    usage = load_document_usage(db, document_id)
+    if not usage:
+        raise HTTPException(status_code=404, detail="No LLM usage recorded for this document")
+    return usage
+
 def format_number(value):
     """Format number to remove unnecessary decimals"""
     if value is None:
@@ -544,7 +637,8 @@ async def get_system_info():
         ollama_connected = pdf_processor.llm_service.check_connection()
     
     # Check YOLO model
-    yolo_model_loaded = settings.YOLO_MODEL_PATH.exists()
+    from app.services.yolo_detector import get_yolo_model_path
+    yolo_model_loaded = get_yolo_model_path().exists()
     
     return {
         "cuda_available": cuda_available,
@@ -562,16 +656,49 @@ async def get_system_config():
         "enable_pipeline": settings.ENABLE_PIPELINE,
         "max_ocr_workers": settings.MAX_OCR_WORKERS,
         "max_llm_workers": settings.MAX_LLM_WORKERS,
+        "max_table_workers": settings.MAX_TABLE_WORKERS,
         "stage2_queue_size": settings.STAGE2_QUEUE_SIZE,
+        "enable_async_llm": settings.ENABLE_ASYNC_LLM,
+        "async_llm_max_concurrency": settings.ASYNC_LLM_MAX_CONCURRENCY,
+        "enable_adaptive_llm_concurrency": settings.ENABLE_ADAPTIVE_LLM_CONCURRENCY,
         "enable_ocr_multiprocessing": settings.ENABLE_OCR_MULTIPROCESSING,
         "ocr_page_workers": settings.OCR_PAGE_WORKERS,
         "max_workers": settings.MAX_WORKERS,  # Legacy mode
         "llm_backend": settings.LLM_BACKEND,
+        "llm_backends": settings.LLM_BACKENDS,
+        "bulk_batch_backend": settings.BULK_BATCH_BACKEND,
         "tesseract_lang": settings.TESSERACT_LANG,
         "poppler_dpi": settings.POPPLER_DPI,
         "use_embedded_ocr": settings.USE_EMBEDDED_OCR
     }
 
+@router.get("/system/llm-cache", response_model=dict)
+async def get_llm_cache_stats():
+    """Get LLM response cache hit counters and size"""
+    from app.services.llm_response_cache import get_llm_response_cache
+
+    cache = get_llm_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.post("/system/llm-cache/clear", response_model=dict)
+async def clear_llm_cache():
+    """Remove all cached LLM responses"""
+    from app.services.llm_response_cache import get_llm_response_cache
+
+    try:
+        cache = get_llm_response_cache()
+        if cache is None:
+            return {"success": False, "message": "LLM response cache is disabled"}
+
+        removed = cache.clear()
+        return {"success": True, "message": f"Removed {removed} cached LLM responses", "removed": removed}
+
+    except Exception as e:
+        logger.error(f"Clear LLM cache error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/system/folders", response_model=dict)
 async def get_folder_stats():
     """Get file counts in each folder"""
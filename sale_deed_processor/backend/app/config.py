@@ -25,6 +25,27 @@ class Settings(BaseSettings):
     # YOLO Model
     YOLO_MODEL_PATH: Path = MODELS_DIR / "table1.19.1.onnx"
     YOLO_CONF_THRESHOLD: float = 0.80
+    YOLO_USE_INT8: bool = False       # Load the INT8 quantized model (see quantize_yolo_model.py / evaluate_yolo_model.py)
+    YOLO_INT8_MODEL_PATH: Path = MODELS_DIR / "table1.19.1.int8.onnx"
+    YOLO_IOU_THRESHOLD: float = 0.45  # Non-max suppression overlap threshold
+    YOLO_BATCH_SIZE: int = 4          # Pages rendered lazily and run per YOLO session call
+    YOLO_MAX_SEARCH_PAGES: int = 25   # Pages searched for the fee table (0 = all pages)
+    YOLO_TWO_SCALE: bool = True       # Detect on a low-DPI PyMuPDF render, re-render only the table box at POPPLER_DPI
+    YOLO_DETECT_DPI: int = 80         # Render DPI for detection (YOLO letterboxes to 640x640 anyway)
+    YOLO_CROP_MARGIN_PT: float = 6.0  # Padding around the detected box for the high-DPI crop (PDF points)
+    ENABLE_TABLE_DETECTION_CACHE: bool = True  # Reuse table search results for reprocessed PDFs (same content + model)
+    TABLE_DETECTION_CACHE_PATH: Path = DATA_DIR / "cache" / "table_detections.sqlite3"  # Outside the main DB, survives recreate_db
+    TABLE_DETECTION_NEGATIVE_TTL_HOURS: float = 168.0  # Cached "no table" outcomes are searched again after this long (0 = never expire)
+
+    # YOLO ONNX Runtime Session
+    YOLO_INTRA_OP_THREADS: int = 2    # Threads per operator (0 = ONNX Runtime default, all cores)
+    YOLO_INTER_OP_THREADS: int = 1    # Threads across operators, only used in parallel mode (0 = default)
+    YOLO_EXECUTION_MODE: str = "sequential"  # "sequential" or "parallel"
+    YOLO_ENABLE_MEM_ARENA: bool = True
+    YOLO_GRAPH_OPTIMIZATION: str = "all"     # "disable", "basic", "extended", "all"
+    YOLO_CACHE_OPTIMIZED_MODEL: bool = True  # Persist the optimized graph so startup skips optimization
+    YOLO_OPTIMIZED_MODEL_DIR: Path = MODELS_DIR / "optimized"
+    YOLO_WARMUP: bool = True                 # Run a dummy inference during API startup
     
     # Tesseract
     TESSERACT_LANG: str = "eng+kan"
@@ -38,11 +59,17 @@ class Settings(BaseSettings):
     # LLM Backend Configuration
     # Available backends: "ollama", "llamacpp", "vllm", "groq", "gemini"
     LLM_BACKEND: str = "gemini"  # Primary backend to use
+    LLM_BACKENDS: str = ""       # Ordered list for hedging/failover, e.g. "gemini,groq" (empty = LLM_BACKEND only)
+    LLM_HEDGE_PERCENTILE: float = 95.0   # Start the next backend once a request exceeds this latency percentile
+    LLM_HEDGE_MIN_SAMPLES: int = 20      # Latency samples needed before the percentile is used
+    LLM_HEDGE_INITIAL_DELAY: float = 60.0  # Hedge delay (seconds) until enough samples exist
+    LLM_HEDGE_MIN_DELAY: float = 2.0     # Lower bound for the hedge delay
 
     # Ollama Configuration
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_LLM_MODEL: str = "qwen2.5:3b-instruct"
     OLLAMA_VISION_MODEL: str = "qwen3-vl:4b"
+    OLLAMA_KEEP_ALIVE: str = "30m"  # Keep the model (and its cached prompt prefix) loaded between requests
 
     # llama.cpp Configuration
     USE_LLAMACPP: bool = False
@@ -55,6 +82,8 @@ class Settings(BaseSettings):
     VLLM_BASE_URL: str = "http://localhost:8000"
     VLLM_LLM_MODEL: str = "Qwen/Qwen2.5-3B-Instruct"
     VLLM_VISION_MODEL: str = "Qwen/Qwen3-VL-4B"
+    # Start vLLM with --enable-prefix-caching (default in the V1 engine) so the shared
+    # extraction instructions are computed once and reused across requests
 
     # Groq Configuration (Cloud API)
     USE_GROQ: bool = False
@@ -66,17 +95,58 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = ""  # Add your Gemini API key here or set via environment variable
     GEMINI_MODEL: str = "gemini-2.5-flash-lite"
     GEMINI_VISION_MODEL: str = "gemini-2.5-flash-lite"  # Gemini Flash Lite supports vision
+    GEMINI_CONTEXT_CACHE: bool = False          # Explicit context cache for the instructions (billed per cached token-hour)
+    GEMINI_CONTEXT_CACHE_TTL_MINUTES: int = 60  # Cache lifetime, recreated when it expires
+
+    # Hosted API Rate Limits (shared by all workers; 0 = unlimited, set to the account's quota)
+    GEMINI_RPM: int = 0               # Gemini requests per minute
+    GEMINI_TPM: int = 0               # Gemini tokens per minute
+    GROQ_RPM: int = 0                 # Groq requests per minute
+    GROQ_TPM: int = 0                 # Groq tokens per minute
+    LLM_RATE_LIMIT_RETRIES: int = 5   # Retries of 429/503 responses (Gemini / Groq)
+    LLM_RETRY_BASE_DELAY: float = 2.0 # First backoff delay in seconds, doubled per retry with jitter
+    LLM_RETRY_MAX_DELAY: float = 60.0 # Cap for one backoff or Retry-After wait
+
+    # LLM Usage Accounting (USD per million tokens for cost estimates; backends without prices cost 0)
+    GEMINI_INPUT_PRICE_PER_M: float = 0.0
+    GEMINI_OUTPUT_PRICE_PER_M: float = 0.0
+    GROQ_INPUT_PRICE_PER_M: float = 0.0
+    GROQ_OUTPUT_PRICE_PER_M: float = 0.0
 
     # LLM General Settings
     LLM_TEMPERATURE: float = 0.6
     LLM_MAX_TOKENS: int = 4096
     LLM_TIMEOUT: int = 300
+    ENABLE_JSON_SCHEMA_OUTPUT: bool = True  # Constrain output to the extraction schema (vLLM/llama.cpp json_schema, Ollama >= 0.5 format, Gemini response_schema)
+
+    # HTTP Connection Pooling (Ollama / llama.cpp / vLLM)
+    HTTP_POOL_MAXSIZE: int = 0        # Keep-alive connections per backend (0 = MAX_LLM_WORKERS)
+    HTTP_MAX_RETRIES: int = 2         # Retries for connection errors and 502/503/504 responses
+    HTTP_RETRY_BACKOFF: float = 0.5   # Exponential backoff factor between retries (seconds)
+
+    # LLM Response Cache (content-addressed: prompt version + backend + model + temperature + OCR text)
+    # Off by default: with LLM_TEMPERATURE > 0 the first sampled answer is served on every rerun,
+    # including a bad one. Enable for LLM_TEMPERATURE = 0; POST /api/system/llm-cache/clear empties it.
+    ENABLE_LLM_CACHE: bool = False
+    LLM_CACHE_PATH: Path = DATA_DIR / "cache" / "llm_responses.sqlite3"  # Outside the main DB, survives recreate_db
+    LLM_CACHE_TTL_DAYS: float = 30       # Entry lifetime (0 = never expire)
+    LLM_CACHE_MAX_ENTRIES: int = 50000   # Least recently used entries evicted beyond this (0 = unlimited)
 
     # Pipeline Processing (Version 2)
     ENABLE_PIPELINE: bool = True  # Enable pipeline parallelism
     MAX_OCR_WORKERS: int = 5      # CPU-intensive workers (OCR/Tesseract)
     MAX_LLM_WORKERS: int = 5      # I/O-intensive workers (LLM API calls)
+    MAX_TABLE_WORKERS: int = 2    # CPU-intensive workers (page rendering + YOLO table detection)
     STAGE2_QUEUE_SIZE: int = 2    # Max documents waiting between OCR and LLM stages (bounded queue)
+    ENABLE_ASYNC_LLM: bool = False           # Run LLM calls on an asyncio event loop instead of blocking LLM workers
+    ASYNC_LLM_MAX_CONCURRENCY: int = 100     # Max async LLM requests in flight
+
+    # Adaptive LLM concurrency (AIMD: +1 per clean round, x factor on 429/5xx/timeout)
+    ENABLE_ADAPTIVE_LLM_CONCURRENCY: bool = True
+    LLM_AIMD_INITIAL_LIMIT: int = 4          # Starting limit (capped at LLM workers / ASYNC_LLM_MAX_CONCURRENCY)
+    LLM_AIMD_MIN_LIMIT: int = 1              # Floor after backoff
+    LLM_AIMD_DECREASE_FACTOR: float = 0.5    # Multiplicative decrease on a retryable backend error
+    LLM_AIMD_LATENCY_TOLERANCE: float = 1.5  # Increase only while p50 <= baseline p50 x this
 
     # OCR Multiprocessing (Per-PDF page-level parallelism)
     ENABLE_OCR_MULTIPROCESSING: bool = True  # Enable multiprocessing for OCR pages
@@ -84,10 +154,40 @@ class Settings(BaseSettings):
 
     # OCR Registration Fee Extraction (Backup extraction from OCR text)
     ENABLE_OCR_REG_FEE_EXTRACTION: bool = False  # Enable extraction of registration fee from OCR text (fallback when pdfplumber fails)
+    ENABLE_OCR_WORDBOX_REG_FEE: bool = True  # Tesseract word-box table extraction on fee pages when pdfplumber fails (before YOLO + Vision)
+
+    # Local Table OCR (digit-only Tesseract pass on YOLO crops before the vision model)
+    ENABLE_LOCAL_TABLE_OCR: bool = True
+    TABLE_OCR_SCALE: float = 2.0  # Upscale factor applied to the crop before OCR
+    TABLE_OCR_PSM: int = 6        # Single uniform block of text
+    TABLE_OCR_WHITELIST: str = "0123456789.,/-Rs"
 
     # Embedded OCR Mode (PyMuPDF)
     USE_EMBEDDED_OCR: bool = False  # Enable PyMuPDF to read embedded OCR instead of Poppler+Tesseract
 
+    # OCR Text Compaction (before the LLM: repeated headers/footers, page numbers, noise lines, Unicode/whitespace)
+    ENABLE_OCR_TEXT_COMPACTION: bool = True
+    OCR_COMPACTION_MIN_REPEAT_PAGES: int = 3  # A header/footer line on this many pages is a repeat (first copy kept)
+
+    # Relevant-Page Selection (highest-scoring pages within a token budget; full text retry if parties are missing)
+    ENABLE_PAGE_SELECTION: bool = False
+    PAGE_SELECTION_TOKEN_BUDGET: int = 6000   # Estimated tokens of OCR text sent (documents under it are sent whole)
+
+    # Chunked (map-reduce) Extraction for long deeds: overlapping page windows extracted concurrently, then merged
+    ENABLE_CHUNKED_EXTRACTION: bool = False
+    CHUNK_MIN_PAGES: int = 10        # Only documents with more pages are chunked
+    CHUNK_WINDOW_PAGES: int = 5      # Pages per window
+    CHUNK_OVERLAP_PAGES: int = 1     # Pages shared by consecutive windows
+    CHUNK_MAX_PARALLEL: int = 4      # Windows extracted concurrently per document
+
+    # Bulk Mode (one batch-inference job for the LLM stage, for overnight backfills)
+    BULK_BATCH_BACKEND: str = "gemini"   # "gemini" (Batch API), "vllm" (offline run_batch) or "local" (stand-in)
+    BULK_BATCH_DIR: Path = DATA_DIR / "bulk_batches"  # Request/result JSONL files, one folder per job
+    BULK_POLL_INTERVAL: int = 60         # Seconds between job status checks
+    BULK_MAX_WAIT_HOURS: float = 24.0    # Cancel the job (documents fail, can be rerun) after this long
+    VLLM_BATCH_COMMAND: str = "python -m vllm.entrypoints.openai.run_batch"  # -i/-o/--model are appended
+    BULK_BATCH_PRICE_FACTOR: float = 0.5  # Batch API token price relative to interactive (cost estimates)
+
     # Legacy Processing (Version 1)
     MAX_WORKERS: int = 2          # Used only if ENABLE_PIPELINE = False
     BATCH_SIZE: int = 10
@@ -6,3 +6,29 @@ class ProcessingStoppedException(Exception):
     def __init__(self, message: str = "Processing stopped by user"):
         self.message = message
         super().__init__(self.message)
+
+
+class LLMBackendError(Exception):
+    """
+    Exception raised when an LLM backend rejects or fails a request
+
+    Raised for transport-level failures (HTTP error status, rate limiting,
+    timeouts) so callers can distinguish overload from a bad model answer,
+    which is still reported by returning None.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int = None,
+        retry_after: float = None,
+        retryable: bool = None
+    ):
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after  # Seconds the server asked us to wait, if given
+        # 429 and 5xx are worth retrying / backing off; other 4xx are request errors
+        if retryable is None:
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+        self.retryable = retryable
+        super().__init__(self.message)
@@ -11,6 +11,9 @@ from pathlib import Path
 from app.config import settings
 from app.database import init_db
 from app.api.routes import router
+from app.api import routes
+from app.services.yolo_detector import get_yolo_model_path
+from app.utils.http_client import close_http_sessions
 
 # Configure logging with UTF-8 support for Kannada text
 import io
@@ -57,10 +60,20 @@ async def lifespan(app: FastAPI):
         raise
     
     # Verify critical files
-    if not settings.YOLO_MODEL_PATH.exists():
-        logger.warning(f"YOLO model not found at: {settings.YOLO_MODEL_PATH}")
+    yolo_model_path = get_yolo_model_path()
+    if not yolo_model_path.exists():
+        logger.warning(f"YOLO model not found at: {yolo_model_path}")
     else:
-        logger.info(f"YOLO model found: {settings.YOLO_MODEL_PATH}")
+        logger.info(f"YOLO model found: {yolo_model_path}")
+
+        # Warm up YOLO so the first document does not pay for cold inference
+        if settings.YOLO_WARMUP:
+            try:
+                processor = routes.pdf_processor_v2 if settings.ENABLE_PIPELINE else routes.pdf_processor
+                elapsed_ms = processor.yolo_detector.warmup()
+                logger.info(f"YOLO warmup completed in {elapsed_ms:.0f} ms")
+            except Exception as e:
+                logger.warning(f"YOLO warmup failed: {e}")
     
     logger.info("Application startup complete")
     
@@ -68,6 +81,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Sale Deed Processor API...")
+    if settings.ENABLE_PIPELINE:
+        routes.pipeline_processor.shutdown()
+    close_http_sessions()
 
 # Create FastAPI app
 app = FastAPI(
@@ -1,6 +1,6 @@
 # backend/app/models.py
 
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, Date
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, Date, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -75,4 +75,26 @@ class BuyerDetail(Base):
     secondary_phone_number = Column(String, nullable=True)
     email = Column(String, nullable=True)
     
-    document = relationship("DocumentDetail", back_populates="buyers")
\ No newline at end of file
+    document = relationship("DocumentDetail", back_populates="buyers")
+
+class LLMUsage(Base):
+    __tablename__ = "llm_usage"
+
+    # One row per document processing attempt (no foreign key: failed documents have no details)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    document_id = Column(String, index=True)
+    batch_id = Column(String, index=True, nullable=True)
+    status = Column(String, nullable=True)  # Document result: success, failed, stopped
+    backends = Column(String, nullable=True)  # Comma-separated backends called
+    models = Column(String, nullable=True)
+    calls = Column(Integer, default=0)
+    failed_calls = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cached_tokens = Column(Integer, default=0)
+    llm_seconds = Column(Float, default=0.0)  # Sum of request latencies
+    queue_wait_seconds = Column(Float, nullable=True)  # End of Stage 1 to first LLM request
+    cost = Column(Float, default=0.0)  # Estimated USD
+    call_details = Column(Text, nullable=True)  # JSON list of individual calls
+    created_at = Column(DateTime, default=datetime.utcnow)
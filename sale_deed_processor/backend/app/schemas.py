@@ -99,10 +99,21 @@ class ProcessingStatsSchema(BaseModel):
     # Pipeline-specific fields (V2)
     ocr_workers: Optional[int] = None
     llm_workers: Optional[int] = None
+    table_workers: Optional[int] = None
     ocr_active: Optional[int] = None
     llm_active: Optional[int] = None
+    table_active: Optional[int] = None
+    llm_in_flight: Optional[int] = None
+    llm_limit: Optional[int] = None
+    llm_limit_history: Optional[List[dict]] = None
     in_queue: Optional[int] = None
+    bulk_job: Optional[str] = None    # Batch-inference job id (bulk mode)
+    bulk_state: Optional[str] = None  # pending, running, succeeded, failed, cancelled, expired
+    batch_id: Optional[str] = None
+    llm_usage: Optional[dict] = None  # LLM token / latency / cost totals of the batch
     pipeline_mode: Optional[bool] = None
+    # Vision-specific fields
+    local_ocr_successful: Optional[int] = None
 
 class BatchResultSchema(BaseModel):
     document_id: str
@@ -110,6 +121,10 @@ class BatchResultSchema(BaseModel):
     registration_fee: Optional[float] = None
     llm_extracted: bool
     saved_to_db: bool
+    ocr_tokens: Optional[int] = None     # Estimated tokens of the raw OCR text
+    prompt_tokens: Optional[int] = None  # Estimated tokens sent to the LLM after compaction / page selection
+    page_selection_fallback: Optional[bool] = None  # Full text resent because parties were missing
+    llm_usage: Optional[dict] = None     # Reported tokens, latency and cost of the document's LLM calls
     error: Optional[str] = None
 
 class SystemInfoSchema(BaseModel):
@@ -0,0 +1,491 @@
+# backend/app/services/batch_inference.py
+
+"""
+Batch Inference - Offline LLM extraction through batch APIs
+
+Overnight backfills of thousands of deeds do not need interactive latency.
+Instead of one request per document, all Stage 1 texts are written to a
+JSONL file, submitted as one job and the results collected when it is done:
+
+- gemini: Gemini Batch API (file upload + batchGenerateContent), billed at
+  the batch discount and outside the interactive rate limits
+- vllm:   vLLM offline batch runner (vllm.entrypoints.openai.run_batch),
+  run as a local process on the GPU host
+- local:  stand-in that answers each request with a normal LLM service (or
+  any extract function) in a background thread, writing the same output
+  format as vLLM; used for tests and dry runs
+
+Every request carries a custom id, so results are matched to documents
+regardless of the order the backend returns them in.
+"""
+
+import json
+import logging
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from app.config import settings
+from app.exceptions import LLMBackendError
+from app.utils.http_client import raise_for_backend_status, TRANSPORT_ERRORS
+from app.utils.extraction_schema import build_json_schema_response_format, get_extraction_response_schema
+from app.utils.prompts import (
+    build_extraction_messages,
+    build_extraction_user_message,
+    get_sale_deed_extraction_prompt,
+)
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ("succeeded", "failed", "cancelled", "expired")
+
+
+@dataclass
+class BatchItem:
+    """One document of a batch job"""
+    custom_id: str
+    ocr_text: str
+
+
+@dataclass
+class BatchJob:
+    """A submitted batch job"""
+    backend: str
+    job_id: str
+    input_path: Path
+    state: str = "pending"              # pending, running, succeeded, failed, cancelled, expired
+    output_ref: Optional[str] = None    # Output file (path or remote file name) once known
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    usage: Dict[str, Dict] = field(default_factory=dict)  # custom_id -> token counts (filled by results())
+
+
+def batch_custom_id(index: int, document_id: str) -> str:
+    """Unique request id (document ids may repeat within a batch)"""
+    return f"{index:06d}-{document_id}"
+
+
+def parse_json_content(content: Optional[str]) -> Optional[dict]:
+    """Model answer to the extraction dict, None if it is not a JSON object"""
+    if not content:
+        return None
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def parse_openai_batch_output(lines: List[str], usage: Dict[str, Dict] = None) -> Dict[str, Any]:
+    """
+    Results of an OpenAI-format batch output file (vLLM run_batch, local stand-in)
+
+    Args:
+        lines: Output JSONL lines
+        usage: Filled with custom_id -> token counts when given
+
+    Returns:
+        custom_id -> extracted dict, None (unusable answer) or LLMBackendError
+    """
+    outputs = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        error = record.get("error")
+
+        if error or response.get("status_code", 200) != 200:
+            message = (error or {}).get("message") if isinstance(error, dict) else error
+            outputs[custom_id] = LLMBackendError(
+                f"Batch request failed: {message or response.get('status_code')}",
+                status_code=response.get("status_code")
+            )
+            continue
+
+        body = response.get("body") or {}
+        if usage is not None and body.get("usage"):
+            usage[custom_id] = {
+                "prompt_tokens": body["usage"].get("prompt_tokens"),
+                "completion_tokens": body["usage"].get("completion_tokens"),
+                "cached_tokens": (body["usage"].get("prompt_tokens_details") or {}).get("cached_tokens")
+            }
+        choices = body.get("choices") or [{}]
+        outputs[custom_id] = parse_json_content(choices[0].get("message", {}).get("content"))
+    return outputs
+
+
+class BaseBatchBackend:
+    """
+    Base class for batch inference backends
+
+    write_requests -> submit -> poll until a terminal state -> results
+    """
+
+    name = "unknown"
+    model_name = ""
+
+    def request_line(self, item: BatchItem) -> dict:
+        """One JSONL request record"""
+        raise NotImplementedError("Subclass must implement request_line")
+
+    def write_requests(self, items: List[BatchItem], path: Path) -> Path:
+        """Write the batch input file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(self.request_line(item), ensure_ascii=False) + "\n")
+        logger.info(f"Batch input written: {len(items)} requests, {path.stat().st_size / 1e6:.1f} MB ({path})")
+        return path
+
+    def submit(self, input_path: Path) -> BatchJob:
+        raise NotImplementedError("Subclass must implement submit")
+
+    def poll(self, job: BatchJob) -> str:
+        """Refresh and return job.state"""
+        raise NotImplementedError("Subclass must implement poll")
+
+    def results(self, job: BatchJob) -> Dict[str, Any]:
+        """custom_id -> extracted dict, None (unusable answer) or LLMBackendError"""
+        raise NotImplementedError("Subclass must implement results")
+
+    def cancel(self, job: BatchJob):
+        raise NotImplementedError("Subclass must implement cancel")
+
+
+class GeminiBatchBackend(BaseBatchBackend):
+    """Gemini Batch API over REST (the google-generativeai SDK has no batch support)"""
+
+    name = "gemini"
+    API_ROOT = "https://generativelanguage.googleapis.com"
+
+    def __init__(self, api_key: str = None, model: str = None):
+        self.api_key = api_key or settings.GEMINI_API_KEY
+        self.model_name = model or settings.GEMINI_MODEL
+        self.session = requests.Session()
+        self.session.headers["x-goog-api-key"] = self.api_key
+        self.system_instruction = get_sale_deed_extraction_prompt()
+        self.generation_config = {
+            "temperature": settings.LLM_TEMPERATURE,
+            "max_output_tokens": settings.LLM_MAX_TOKENS,
+            "response_mime_type": "application/json"
+        }
+        if settings.ENABLE_JSON_SCHEMA_OUTPUT:
+            self.generation_config["response_schema"] = get_extraction_response_schema()
+
+    def request_line(self, item: BatchItem) -> dict:
+        return {
+            "key": item.custom_id,
+            "request": {
+                "system_instruction": {"parts": [{"text": self.system_instruction}]},
+                "contents": [{"role": "user", "parts": [{"text": build_extraction_user_message(item.ocr_text)}]}],
+                "generation_config": self.generation_config
+            }
+        }
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """REST call mapped to LLMBackendError on transport or status errors"""
+        try:
+            response = self.session.request(method, url, timeout=settings.LLM_TIMEOUT, **kwargs)
+        except TRANSPORT_ERRORS as e:
+            raise LLMBackendError(f"Gemini batch connection error: {e}") from e
+        if response.status_code != 200:
+            logger.error(f"Gemini batch API error {response.status_code}: {response.text[:500]}")
+        raise_for_backend_status(response, "Gemini batch")
+        return response
+
+    def _upload(self, path: Path) -> str:
+        """Resumable upload of the input file, returns its file name ("files/...")"""
+        start = self._request(
+            "POST",
+            f"{self.API_ROOT}/upload/v1beta/files",
+            headers={
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(path.stat().st_size),
+                "X-Goog-Upload-Header-Content-Type": "application/jsonl"
+            },
+            json={"file": {"display_name": path.parent.name + "-" + path.name}}
+        )
+        upload_url = start.headers["X-Goog-Upload-URL"]
+
+        with open(path, "rb") as f:
+            uploaded = self._request(
+                "POST",
+                upload_url,
+                headers={"X-Goog-Upload-Offset": "0", "X-Goog-Upload-Command": "upload, finalize"},
+                data=f
+            )
+        return uploaded.json()["file"]["name"]
+
+    def submit(self, input_path: Path) -> BatchJob:
+        file_name = self._upload(input_path)
+        response = self._request(
+            "POST",
+            f"{self.API_ROOT}/v1beta/models/{self.model_name}:batchGenerateContent",
+            json={"batch": {
+                "display_name": f"sale-deeds-{input_path.parent.name}",
+                "input_config": {"file_name": file_name}
+            }}
+        )
+        job = BatchJob(backend=self.name, job_id=response.json()["name"], input_path=input_path)
+        logger.info(f"Gemini batch submitted: {job.job_id} (input {file_name})")
+        return job
+
+    @staticmethod
+    def _normalize_state(state: str) -> str:
+        """BATCH_STATE_SUCCEEDED / JOB_STATE_SUCCEEDED -> succeeded"""
+        state = (state or "").rsplit("_STATE_", 1)[-1].lower()
+        return {"unspecified": "pending", "canceled": "cancelled"}.get(state, state or "pending")
+
+    def poll(self, job: BatchJob) -> str:
+        batch = self._request("GET", f"{self.API_ROOT}/v1beta/{job.job_id}").json()
+        metadata = batch.get("metadata") or {}
+        job.state = self._normalize_state(metadata.get("state"))
+        job.output_ref = (
+            (batch.get("response") or {}).get("responsesFile")
+            or (metadata.get("output") or {}).get("responsesFile")
+            or job.output_ref
+        )
+        return job.state
+
+    def results(self, job: BatchJob) -> Dict[str, Any]:
+        if not job.output_ref:
+            raise LLMBackendError(f"Gemini batch {job.job_id} has no responses file")
+
+        response = self._request("GET", f"{self.API_ROOT}/download/v1beta/{job.output_ref}:download", params={"alt": "media"})
+        output_path = job.input_path.with_name("results.jsonl")
+        output_path.write_bytes(response.content)
+
+        outputs = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key = record.get("key")
+            if record.get("error"):
+                error = record["error"]
+                outputs[key] = LLMBackendError(f"Gemini batch request failed: {error.get('message')}", status_code=error.get("code"))
+                continue
+            metadata = (record.get("response") or {}).get("usageMetadata")
+            if metadata:
+                job.usage[key] = {
+                    "prompt_tokens": metadata.get("promptTokenCount"),
+                    "completion_tokens": metadata.get("candidatesTokenCount"),
+                    "cached_tokens": metadata.get("cachedContentTokenCount")
+                }
+            candidates = (record.get("response") or {}).get("candidates") or [{}]
+            parts = (candidates[0].get("content") or {}).get("parts") or []
+            outputs[key] = parse_json_content("".join(part.get("text", "") for part in parts))
+        return outputs
+
+    def cancel(self, job: BatchJob):
+        self._request("POST", f"{self.API_ROOT}/v1beta/{job.job_id}:cancel")
+        job.state = "cancelled"
+        logger.info(f"Gemini batch cancelled: {job.job_id}")
+
+
+class VLLMBatchBackend(BaseBatchBackend):
+    """vLLM offline batch runner (OpenAI batch file format), run as a subprocess"""
+
+    name = "vllm"
+
+    def __init__(self, model: str = None, command: str = None):
+        self.model = model or settings.VLLM_LLM_MODEL
+        self.model_name = self.model
+        self.command = shlex.split(command or settings.VLLM_BATCH_COMMAND)
+        self._processes: Dict[str, subprocess.Popen] = {}
+
+    def request_line(self, item: BatchItem) -> dict:
+        return {
+            "custom_id": item.custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.model,
+                "messages": build_extraction_messages(item.ocr_text),
+                "temperature": settings.LLM_TEMPERATURE,
+                "max_tokens": settings.LLM_MAX_TOKENS,
+                "response_format": (
+                    build_json_schema_response_format() if settings.ENABLE_JSON_SCHEMA_OUTPUT
+                    else {"type": "json_object"}
+                )
+            }
+        }
+
+    def submit(self, input_path: Path) -> BatchJob:
+        output_path = input_path.with_name("results.jsonl")
+        log_file = open(input_path.with_name("run_batch.log"), "w", encoding="utf-8")
+        process = subprocess.Popen(
+            self.command + ["-i", str(input_path), "-o", str(output_path), "--model", self.model],
+            stdout=log_file,
+            stderr=subprocess.STDOUT
+        )
+        log_file.close()  # The child keeps its own handle
+
+        job = BatchJob(
+            backend=self.name,
+            job_id=f"run_batch-{process.pid}",
+            input_path=input_path,
+            state="running",
+            output_ref=str(output_path)
+        )
+        self._processes[job.job_id] = process
+        logger.info(f"vLLM run_batch started: pid {process.pid}, output {output_path}")
+        return job
+
+    def poll(self, job: BatchJob) -> str:
+        process = self._processes.get(job.job_id)
+        if process is None:
+            return job.state
+        code = process.poll()
+        if code is not None:
+            job.state = "succeeded" if code == 0 else "failed"
+            if code != 0:
+                logger.error(f"vLLM run_batch exited with {code}, see {job.input_path.with_name('run_batch.log')}")
+        return job.state
+
+    def results(self, job: BatchJob) -> Dict[str, Any]:
+        output_path = Path(job.output_ref)
+        if not output_path.exists():
+            raise LLMBackendError(f"vLLM run_batch wrote no output ({output_path})")
+        return parse_openai_batch_output(output_path.read_text(encoding="utf-8").splitlines(), job.usage)
+
+    def cancel(self, job: BatchJob):
+        process = self._processes.get(job.job_id)
+        if process is not None and process.poll() is None:
+            process.terminate()
+        job.state = "cancelled"
+        logger.info(f"vLLM run_batch cancelled: {job.job_id}")
+
+
+class LocalBatchBackend(BaseBatchBackend):
+    """
+    Local stand-in for a batch API
+
+    Requests are answered in a background thread by `extract` (default: the
+    configured LLM service) and written in the OpenAI batch output format,
+    so the same submit/poll/results path runs without a batch provider.
+    """
+
+    name = "local"
+    model_name = "local"
+
+    def __init__(self, extract: Callable[[str], Optional[dict]] = None, max_parallel: int = None):
+        """
+        Args:
+            extract: OCR text -> extracted dict (default: get_llm_service().extract_structured_data)
+            max_parallel: Requests answered concurrently (default MAX_LLM_WORKERS)
+        """
+        self._extract = extract
+        self.max_parallel = max(1, max_parallel or settings.MAX_LLM_WORKERS)
+        self._jobs: Dict[str, threading.Thread] = {}
+        self._cancelled: Dict[str, threading.Event] = {}
+        self._failed: Dict[str, bool] = {}
+
+    @property
+    def extract(self) -> Callable[[str], Optional[dict]]:
+        if self._extract is None:
+            from app.services.llm_service_factory import get_llm_service
+            self._extract = get_llm_service().extract_structured_data
+        return self._extract
+
+    def request_line(self, item: BatchItem) -> dict:
+        return {"custom_id": item.custom_id, "ocr_text": item.ocr_text}
+
+    def _answer(self, request: dict) -> dict:
+        """One request in the OpenAI batch output format"""
+        record = {"id": f"local-{request['custom_id']}", "custom_id": request["custom_id"], "response": None, "error": None}
+        try:
+            data = self.extract(request["ocr_text"])
+        except LLMBackendError as e:
+            record["response"] = {"status_code": e.status_code or 500, "body": None}
+            record["error"] = {"message": str(e)}
+            return record
+        except Exception as e:
+            record["error"] = {"message": str(e)}
+            return record
+
+        content = json.dumps(data, ensure_ascii=False) if data is not None else ""
+        record["response"] = {"status_code": 200, "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}}
+        return record
+
+    def _run(self, job: BatchJob, cancelled: threading.Event):
+        try:
+            with open(job.input_path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+
+            with ThreadPoolExecutor(max_workers=self.max_parallel) as executor, \
+                 open(job.output_ref, "w", encoding="utf-8") as out:
+                pending = [executor.submit(self._answer, record) for record in records]
+                for future in pending:
+                    if cancelled.is_set():
+                        for remaining in pending:
+                            remaining.cancel()
+                        return
+                    out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+
+        except Exception as e:
+            logger.error(f"Local batch {job.job_id} failed: {e}")
+            self._failed[job.job_id] = True
+
+    def submit(self, input_path: Path) -> BatchJob:
+        job = BatchJob(
+            backend=self.name,
+            job_id=f"local-{input_path.parent.name}-{int(time.time() * 1000)}",
+            input_path=input_path,
+            state="running",
+            output_ref=str(input_path.with_name("results.jsonl"))
+        )
+        cancelled = threading.Event()
+        thread = threading.Thread(target=self._run, args=(job, cancelled), name=job.job_id, daemon=True)
+        self._jobs[job.job_id] = thread
+        self._cancelled[job.job_id] = cancelled
+        thread.start()
+        logger.info(f"Local batch started: {job.job_id}")
+        return job
+
+    def poll(self, job: BatchJob) -> str:
+        thread = self._jobs.get(job.job_id)
+        if thread is None or thread.is_alive() or job.state in TERMINAL_STATES:
+            return job.state
+        job.state = "failed" if self._failed.get(job.job_id) else "succeeded"
+        return job.state
+
+    def results(self, job: BatchJob) -> Dict[str, Any]:
+        return parse_openai_batch_output(Path(job.output_ref).read_text(encoding="utf-8").splitlines(), job.usage)
+
+    def cancel(self, job: BatchJob):
+        event = self._cancelled.get(job.job_id)
+        if event is not None:
+            event.set()
+        job.state = "cancelled"
+
+
+BATCH_BACKEND_CLASSES = {
+    "gemini": GeminiBatchBackend,
+    "vllm": VLLMBatchBackend,
+    "local": LocalBatchBackend,
+}
+
+
+def get_batch_backend(name: str = None) -> BaseBatchBackend:
+    """
+    Batch backend by name
+
+    Args:
+        name: "gemini", "vllm" or "local" (default BULK_BATCH_BACKEND)
+    """
+    name = (name or settings.BULK_BATCH_BACKEND).lower()
+    try:
+        return BATCH_BACKEND_CLASSES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown batch backend '{name}'") from None
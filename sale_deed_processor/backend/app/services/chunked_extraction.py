@@ -0,0 +1,260 @@
+# backend/app/services/chunked_extraction.py
+
+"""
+Chunked Extraction - Map-reduce LLM extraction for very long deeds
+
+A long deed (many sellers, long schedules) makes one large request: it is
+the slowest call in a batch and can hit context / output token limits.
+Instead the OCR text is split into overlapping page windows, each window is
+extracted concurrently with the normal prompt, and the partial JSON results
+are merged deterministically:
+
+- Buyers/sellers: the same person seen in several windows (matched by PAN,
+  Aadhaar or normalised name) becomes one entry; missing fields are filled
+  from later windows.
+- Property/document fields: most frequent non-null value across windows,
+  ties going to the earliest window.
+
+Wall-clock time is then bounded by the slowest window, not the page count.
+"""
+
+import asyncio
+import json
+import logging
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.exceptions import LLMBackendError
+from app.utils.llm_usage import bind_context
+from app.utils.text_compaction import split_pages
+
+logger = logging.getLogger(__name__)
+
+PARTY_LISTS = ("buyer_details", "seller_details")
+FIELD_SECTIONS = ("property_details", "document_details")
+HONORIFICS_RE = re.compile(r"\b(?:sri|shri|smt|srimathi|sriman|mr|mrs|ms|miss|dr|kum|kumari|late)\b\.?")
+
+
+def split_page_windows(text: str, window_pages: int, overlap_pages: int) -> List[str]:
+    """
+    Split OCR text into overlapping windows of whole pages
+
+    Args:
+        text: OCR text with page markers
+        window_pages: Pages per window
+        overlap_pages: Pages shared by consecutive windows (keeps parties or
+            schedules that straddle a page break in one window)
+
+    Returns:
+        Window texts in document order (one window if the text is short or unmarked)
+    """
+    pages = [(label, body.strip()) for label, body in split_pages(text) if body.strip()]
+    if len(pages) <= window_pages:
+        return [text]
+
+    step = max(1, window_pages - overlap_pages)
+    windows = []
+    for start in range(0, len(pages), step):
+        chunk = pages[start:start + window_pages]
+        windows.append("\n\n".join(
+            f"--- Page {label} ---\n\n{body}" if label is not None else body
+            for label, body in chunk
+        ))
+        if start + window_pages >= len(pages):
+            break
+    return windows
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase name without honorifics, punctuation or extra spaces"""
+    if not name:
+        return ""
+    name = HONORIFICS_RE.sub(" ", name.lower())
+    name = re.sub(r"[^\w\s]", " ", name)
+    return " ".join(name.split())
+
+
+def _party_keys(party: Dict) -> set:
+    """Identity keys of a party: PAN, Aadhaar and normalised name"""
+    keys = set()
+    pan = re.sub(r"[^A-Za-z0-9]", "", party.get("pan_card_number") or "").upper()
+    if len(pan) == 10:
+        keys.add(f"pan:{pan}")
+    aadhaar = re.sub(r"\D", "", party.get("aadhaar_number") or "")
+    if len(aadhaar) == 12:
+        keys.add(f"aadhaar:{aadhaar}")
+    name = normalize_name(party.get("name"))
+    if name:
+        keys.add(f"name:{name}")
+    return keys
+
+
+def merge_parties(party_lists: List[List[Dict]]) -> List[Dict]:
+    """
+    Merge the buyer (or seller) lists of all windows
+
+    Parties sharing any identity key are one person; the first window's
+    values win and empty fields are filled from later windows.
+    """
+    merged: List[Dict] = []
+    merged_keys: List[set] = []
+
+    for parties in party_lists:
+        for party in parties or []:
+            if not isinstance(party, dict):
+                continue
+            keys = _party_keys(party)
+            if not keys:
+                continue
+
+            match = next((i for i, existing in enumerate(merged_keys) if existing & keys), None)
+            if match is None:
+                merged.append(dict(party))
+                merged_keys.append(keys)
+                continue
+
+            target = merged[match]
+            for field_name, value in party.items():
+                if target.get(field_name) in (None, "") and value not in (None, ""):
+                    target[field_name] = value
+            merged_keys[match] |= keys
+
+    return merged
+
+
+def merge_fields(sections: List[Dict]) -> Dict:
+    """Per field, the most frequent non-null value (ties: earliest window)"""
+    values: Dict[str, List] = {}
+    for section in sections:
+        for field_name, value in (section or {}).items():
+            values.setdefault(field_name, [])
+            if value not in (None, ""):
+                values[field_name].append(value)
+
+    merged = {}
+    for field_name, candidates in values.items():
+        if not candidates:
+            merged[field_name] = None
+            continue
+        counts = Counter(json.dumps(v, sort_keys=True, ensure_ascii=False) for v in candidates)
+        best = max(counts.values())
+        merged[field_name] = next(
+            v for v in candidates
+            if counts[json.dumps(v, sort_keys=True, ensure_ascii=False)] == best
+        )
+    return merged
+
+
+def merge_extractions(partials: List[Dict]) -> Dict:
+    """Reduce the windows' extraction results into one document result"""
+    merged = {
+        name: merge_parties([partial.get(name) or [] for partial in partials])
+        for name in PARTY_LISTS
+    }
+    for name in FIELD_SECTIONS:
+        merged[name] = merge_fields([
+            partial.get(name) for partial in partials if isinstance(partial.get(name), dict)
+        ])
+    return merged
+
+
+class ChunkedExtractor:
+    """
+    Runs one LLM extraction per page window and merges the results
+    """
+
+    def __init__(self, llm_service, window_pages: int, overlap_pages: int, min_pages: int, max_parallel: int):
+        """
+        Args:
+            llm_service: LLM service (extract_structured_data / _async)
+            window_pages: Pages per window
+            overlap_pages: Pages shared by consecutive windows
+            min_pages: Only documents with more pages than this are chunked
+            max_parallel: Windows extracted concurrently per document
+        """
+        self.llm_service = llm_service
+        self.window_pages = max(1, window_pages)
+        self.overlap_pages = min(max(0, overlap_pages), self.window_pages - 1)
+        self.min_pages = min_pages
+        self.max_parallel = max(1, max_parallel)
+
+    def windows(self, text: str) -> List[str]:
+        """Windows for a document, a single window when it is not long enough to chunk"""
+        if len([body for _, body in split_pages(text) if body.strip()]) <= self.min_pages:
+            return [text]
+        return split_page_windows(text, self.window_pages, self.overlap_pages)
+
+    @staticmethod
+    def _reduce(windows: List[str], outcomes: List) -> Optional[Dict]:
+        """Merge successful windows; a backend error fails the document so it can be rerun"""
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        backend_errors = [e for e in errors if isinstance(e, LLMBackendError)]
+        if backend_errors:
+            raise backend_errors[0]
+        if errors:
+            raise errors[0]
+
+        partials = [o for o in outcomes if o]
+        if len(partials) < len(windows):
+            logger.warning(f"Chunked extraction: {len(windows) - len(partials)}/{len(windows)} windows returned no data")
+        if not partials:
+            return None
+        return merge_extractions(partials)
+
+    def extract(
+        self,
+        text: str,
+        extract_window: Callable[[str], Optional[Dict]] = None
+    ) -> Optional[Dict]:
+        """
+        Extract a document window by window in parallel threads
+
+        Args:
+            text: OCR text with page markers
+            extract_window: One window's extraction (default: the LLM service;
+                the pipeline passes its cache-then-slot call)
+
+        Returns:
+            Merged extraction, or None if no window produced data
+        """
+        extract_window = extract_window or self.llm_service.extract_structured_data
+        windows = self.windows(text)
+        if len(windows) == 1:
+            return extract_window(text)
+
+        logger.info(f"Chunked extraction: {len(windows)} windows of {self.window_pages} pages")
+
+        def run(window: str):
+            try:
+                return extract_window(window)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(len(windows), self.max_parallel)) as executor:
+            outcomes = list(executor.map(bind_context(run), windows))  # Usage stays on the document
+
+        return self._reduce(windows, outcomes)
+
+    async def extract_async(
+        self,
+        text: str,
+        extract_window: Callable[[str], Awaitable[Optional[Dict]]] = None
+    ) -> Optional[Dict]:
+        """Async variant of extract(), windows run concurrently on the event loop"""
+        extract_window = extract_window or self.llm_service.extract_structured_data_async
+        windows = self.windows(text)
+        if len(windows) == 1:
+            return await extract_window(text)
+
+        logger.info(f"Chunked extraction: {len(windows)} windows of {self.window_pages} pages (async)")
+
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def run(window: str):
+            async with semaphore:
+                return await extract_window(window)
+
+        outcomes = await asyncio.gather(*(run(w) for w in windows), return_exceptions=True)
+        return self._reduce(windows, outcomes)
@@ -1,13 +1,31 @@
+import asyncio
 import json
 import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
 import google.generativeai as genai
+from google.generativeai import caching
 from google.api_core import exceptions as google_exceptions
 from ..config import settings
-from ..utils.prompts import get_sale_deed_extraction_prompt
+from ..exceptions import LLMBackendError
+from ..utils.prompts import get_sale_deed_extraction_prompt, build_extraction_user_message
+from ..utils.rate_limiter import get_rate_limiter, estimate_tokens
+from ..utils.extraction_schema import get_extraction_response_schema
+from ..utils.llm_usage import LLMCallUsage, track_llm_call
 
 logger = logging.getLogger(__name__)
 
+# Context cache creation errors meaning the model/prompt does not qualify
+# (e.g. below the minimum token count): explicit caching is turned off
+CONTEXT_CACHE_UNSUPPORTED_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.NotFound,
+    google_exceptions.PermissionDenied,
+)
+CONTEXT_CACHE_RETRY_SECONDS = 30  # Plain model after a transient creation error, then retry
+
 class GeminiLLMService:
     def __init__(self, api_key: str = None, model: str = None):
         """
@@ -23,18 +41,176 @@ class GeminiLLMService:
         # Configure the Gemini API
         genai.configure(api_key=self.api_key)
 
-        # Initialize the model with JSON response configuration
+        self.generation_config = {
+            "temperature": settings.LLM_TEMPERATURE,
+            "max_output_tokens": settings.LLM_MAX_TOKENS,
+            "response_mime_type": "application/json"
+        }
+        if settings.ENABLE_JSON_SCHEMA_OUTPUT:
+            self.generation_config["response_schema"] = get_extraction_response_schema()
+
+        # Instructions as system instruction: an identical prefix on every call,
+        # which Gemini 2.x caches implicitly
+        self.system_instruction = get_sale_deed_extraction_prompt()
         self.model = genai.GenerativeModel(
             model_name=self.model_name,
-            generation_config={
-                "temperature": settings.LLM_TEMPERATURE,
-                "max_output_tokens": settings.LLM_MAX_TOKENS,
-                "response_mime_type": "application/json"
-            }
+            generation_config=self.generation_config,
+            system_instruction=self.system_instruction
         )
+        self.instruction_tokens = estimate_tokens(self.system_instruction)
+
+        # Explicit context cache (GEMINI_CONTEXT_CACHE), created on first use:
+        # (CachedContent, model bound to it), replaced as a pair
+        self._cached = None
+        self._context_cache_enabled = settings.GEMINI_CONTEXT_CACHE
+        self._cache_retry_at = 0.0
+        self._cache_lock = threading.Lock()
+
+        self.rate_limiter = get_rate_limiter("gemini")
 
         logger.info(f"Gemini LLM initialized with model: {self.model_name}")
 
+    def _build_prompt(self, ocr_text: str) -> str:
+        """Per-document content (the instructions are the system instruction)"""
+        return build_extraction_user_message(ocr_text)
+
+    def _ready_model(self) -> Optional[genai.GenerativeModel]:
+        """Model usable without a network call; None when the context cache must be created or refreshed"""
+        if not self._context_cache_enabled:
+            return self.model
+
+        cached = self._cached
+        if cached is not None and cached[0].expire_time > datetime.now(timezone.utc) + timedelta(minutes=1):
+            return cached[1]
+        if time.monotonic() < self._cache_retry_at:
+            return self.model
+        return None
+
+    def _get_model(self) -> genai.GenerativeModel:
+        """
+        Model to call: bound to the explicit context cache when enabled
+
+        The cache holds the system instruction; it is recreated shortly before
+        it expires. If the model or prompt does not qualify for explicit
+        caching (e.g. below the minimum token count), the plain model is used
+        from then on; after any other error it is used for this call and
+        creation is retried CONTEXT_CACHE_RETRY_SECONDS later. Creating the
+        cache is a blocking API call.
+        """
+        model = self._ready_model()
+        if model is not None:
+            return model
+
+        with self._cache_lock:
+            model = self._ready_model()
+            if model is not None:
+                return model
+
+            try:
+                cached_content = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name="sale-deed-extraction-instructions",
+                    system_instruction=self.system_instruction,
+                    ttl=timedelta(minutes=settings.GEMINI_CONTEXT_CACHE_TTL_MINUTES)
+                )
+                cached_model = genai.GenerativeModel.from_cached_content(
+                    cached_content,
+                    generation_config=self.generation_config
+                )
+                self._cached = (cached_content, cached_model)
+                logger.info(f"Gemini context cache created: {cached_content.name}")
+                return cached_model
+
+            except CONTEXT_CACHE_UNSUPPORTED_ERRORS as e:
+                logger.warning(f"Gemini context caching unavailable, using implicit caching: {e}")
+                self._context_cache_enabled = False
+                return self.model
+
+            except Exception as e:
+                logger.warning(
+                    f"Gemini context cache creation failed, retrying in {CONTEXT_CACHE_RETRY_SECONDS}s: {e}"
+                )
+                self._cache_retry_at = time.monotonic() + CONTEXT_CACHE_RETRY_SECONDS
+                return self.model
+
+    def _parse_response(self, response_text: str) -> Dict:
+        """Parse JSON response and log extraction details"""
+        data = json.loads(response_text)
+
+        logger.info(f"Gemini successfully returned structured JSON")
+
+        # Log extraction details
+        buyer_count = len(data.get("buyer_details", []))
+        seller_count = len(data.get("seller_details", []))
+        logger.info(f"Extracted {buyer_count} buyers, {seller_count} sellers")
+
+        return data
+
+    @staticmethod
+    def _retry_delay(error: Exception) -> Optional[float]:
+        """Server retry hint (google.rpc.RetryInfo) attached to a quota error, in seconds"""
+        for detail in getattr(error, "details", None) or []:
+            delay = getattr(detail, "retry_delay", None)
+            if delay is not None:
+                return delay.seconds + delay.nanos / 1e9
+            if isinstance(detail, dict) and "retryDelay" in detail:
+                try:
+                    return float(str(detail["retryDelay"]).rstrip("s"))
+                except ValueError:
+                    return None
+        return None
+
+    @classmethod
+    def _backend_error(cls, error: Exception) -> LLMBackendError:
+        """Map a Google API error to LLMBackendError (HTTP status when known)"""
+        code = getattr(error, "code", None)
+        return LLMBackendError(
+            f"Gemini API error: {error}",
+            status_code=int(code) if code else None,
+            retry_after=cls._retry_delay(error)
+        )
+
+    @staticmethod
+    def _total_tokens(response) -> Optional[int]:
+        usage = getattr(response, "usage_metadata", None)
+        return getattr(usage, "total_token_count", None)
+
+    @staticmethod
+    def _record_usage(call: LLMCallUsage, response):
+        """Token counts from usage_metadata"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            call.set_tokens(
+                getattr(usage, "prompt_token_count", None),
+                getattr(usage, "candidates_token_count", None),
+                getattr(usage, "cached_content_token_count", None)
+            )
+
+    def _generate(self, full_prompt: str):
+        """One generate_content call"""
+        with track_llm_call("gemini", self.model_name) as call:
+            try:
+                response = self._get_model().generate_content(full_prompt)
+            except google_exceptions.GoogleAPIError as e:
+                raise self._backend_error(e) from e
+            self._record_usage(call, response)
+            return response
+
+    async def _generate_async(self, full_prompt: str):
+        """One async generate_content call"""
+        # Creating / refreshing the context cache blocks: keep it off the event loop
+        model = self._ready_model()
+        if model is None:
+            model = await asyncio.to_thread(self._get_model)
+
+        with track_llm_call("gemini", self.model_name) as call:
+            try:
+                response = await model.generate_content_async(full_prompt)
+            except google_exceptions.GoogleAPIError as e:
+                raise self._backend_error(e) from e
+            self._record_usage(call, response)
+            return response
+
     def extract_structured_data(self, ocr_text: str) -> Optional[Dict]:
         """
         Extract structured JSON using Gemini API
@@ -43,39 +219,60 @@ class GeminiLLMService:
             ocr_text: OCR text from the document
 
         Returns:
-            Extracted data as dictionary or None if failed
+            Extracted data as dictionary or None if the answer was unusable
+
+        Requests are queued within GEMINI_RPM / GEMINI_TPM and 429/503
+        responses retried with backoff.
+
+        Raises:
+            LLMBackendError: API error (rate limit, server error, timeout)
         """
-        system_prompt = get_sale_deed_extraction_prompt()
-        full_prompt = f"{system_prompt}\n\nHere is the complete OCR text from the document:\n\n{ocr_text}\n\nExtract the data and return ONLY valid JSON:"
+        full_prompt = self._build_prompt(ocr_text)
+        tokens = self.instruction_tokens + estimate_tokens(full_prompt)
 
         try:
             logger.info(f"Sending {len(ocr_text)} chars to Gemini model {self.model_name}")
 
             # Generate content
-            response = self.model.generate_content(full_prompt)
+            response = self.rate_limiter.call(self._generate, full_prompt, tokens=tokens)
+            self.rate_limiter.settle(tokens, self._total_tokens(response))
 
             # Get the response text
             response_text = response.text
 
-            # Parse JSON response
-            data = json.loads(response_text)
+            return self._parse_response(response_text)
 
-            logger.info(f"Gemini successfully returned structured JSON")
+        except LLMBackendError as e:
+            logger.error(f"Gemini API Error: {e}")
+            raise
 
-            # Log extraction details
-            buyer_count = len(data.get("buyer_details", []))
-            seller_count = len(data.get("seller_details", []))
-            logger.info(f"Extracted {buyer_count} buyers, {seller_count} sellers")
+        except json.JSONDecodeError as e:
+            logger.error(f"Gemini returned non-JSON: {e}")
+            logger.debug(f"Response text: {response_text[:500] if 'response_text' in locals() else 'N/A'}")
+            return None
+
+        except Exception as e:
+            logger.error(f"Unexpected Gemini error: {e}")
+            return None
 
-            return data
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[Dict]:
+        """Async variant of extract_structured_data (event-loop LLM stage)"""
+        full_prompt = self._build_prompt(ocr_text)
+        tokens = self.instruction_tokens + estimate_tokens(full_prompt)
 
-        except google_exceptions.GoogleAPIError as e:
+        try:
+            logger.info(f"Sending {len(ocr_text)} chars to Gemini model {self.model_name} (async)")
+
+            response = await self.rate_limiter.call_async(self._generate_async, full_prompt, tokens=tokens)
+            self.rate_limiter.settle(tokens, self._total_tokens(response))
+            return self._parse_response(response.text)
+
+        except LLMBackendError as e:
             logger.error(f"Gemini API Error: {e}")
-            return None
+            raise
 
         except json.JSONDecodeError as e:
             logger.error(f"Gemini returned non-JSON: {e}")
-            logger.debug(f"Response text: {response_text[:500] if 'response_text' in locals() else 'N/A'}")
             return None
 
         except Exception as e:
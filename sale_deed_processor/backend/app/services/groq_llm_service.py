@@ -1,9 +1,13 @@
 import json
 import logging
 from typing import Dict, Optional
-from groq import Groq, APIError, APIConnectionError
+from groq import Groq, AsyncGroq, APIError, APIConnectionError, APIStatusError
 from ..config import settings
-from ..utils.prompts import get_sale_deed_extraction_prompt
+from ..exceptions import LLMBackendError
+from ..utils.http_client import parse_retry_after
+from ..utils.rate_limiter import get_rate_limiter, estimate_tokens
+from ..utils.prompts import build_extraction_messages
+from ..utils.llm_usage import LLMCallUsage, track_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -14,30 +18,89 @@ class GroqLLMService:
         """
         self.api_key = api_key or settings.GROQ_API_KEY
         self.model = model or settings.GROQ_MODEL
-        self.client = Groq(api_key=self.api_key)
+        # Retries of 429/5xx are done by the shared rate limiter, not the SDK
+        self.client = Groq(api_key=self.api_key, max_retries=0)
+        self.async_client = None
+        self.rate_limiter = get_rate_limiter("groq")
 
         logger.info(f"Groq LLM initialized with model: {self.model}")
 
+    def _build_request(self, ocr_text: str) -> Dict:
+        """Chat completion arguments"""
+        return {
+            "messages": build_extraction_messages(ocr_text),
+            "model": self.model,
+            "temperature": 0,
+            "response_format": {"type": "json_object"}
+        }
+
+    @staticmethod
+    def _backend_error(error: APIError) -> LLMBackendError:
+        """Map a Groq transport/status error to LLMBackendError"""
+        if isinstance(error, APIStatusError):
+            return LLMBackendError(
+                f"Groq API error: {error.status_code}",
+                status_code=error.status_code,
+                retry_after=parse_retry_after(error.response.headers.get("retry-after"))
+            )
+        return LLMBackendError(f"Groq connection error: {error}")
+
+    @staticmethod
+    def _estimate_tokens(request: Dict) -> int:
+        return estimate_tokens("".join(m["content"] for m in request["messages"]))
+
+    @staticmethod
+    def _total_tokens(chat_completion) -> Optional[int]:
+        usage = getattr(chat_completion, "usage", None)
+        return getattr(usage, "total_tokens", None)
+
+    @staticmethod
+    def _record_usage(call: LLMCallUsage, chat_completion):
+        """Token counts from the completion's usage"""
+        usage = getattr(chat_completion, "usage", None)
+        if usage is not None:
+            call.set_tokens(getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+
+    def _create(self, request: Dict):
+        """One chat completion call"""
+        with track_llm_call("groq", self.model) as call:
+            try:
+                chat_completion = self.client.chat.completions.create(**request)
+            except (APIConnectionError, APIStatusError) as e:
+                raise self._backend_error(e) from e
+            self._record_usage(call, chat_completion)
+            return chat_completion
+
+    async def _create_async(self, request: Dict):
+        """One async chat completion call"""
+        # Created on first use so it binds to the event loop that runs it
+        if self.async_client is None:
+            self.async_client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        with track_llm_call("groq", self.model) as call:
+            try:
+                chat_completion = await self.async_client.chat.completions.create(**request)
+            except (APIConnectionError, APIStatusError) as e:
+                raise self._backend_error(e) from e
+            self._record_usage(call, chat_completion)
+            return chat_completion
+
     def extract_structured_data(self, ocr_text: str) -> Optional[Dict]:
         """
         Extract structured JSON using Groq chat completion API
-        """
 
-        system_prompt = get_sale_deed_extraction_prompt()
-        user_prompt = f"Here is the complete OCR text from the document:\n\n{ocr_text}"
+        Requests are queued within GROQ_RPM / GROQ_TPM and 429/503 responses
+        retried with backoff.
 
+        Raises:
+            LLMBackendError: Connection failure, timeout or HTTP error status
+        """
         try:
             logger.info(f"Sending {len(ocr_text)} chars to Groq model {self.model}")
 
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                model=self.model,
-                temperature=0,
-                response_format={"type": "json_object"}
-            )
+            request = self._build_request(ocr_text)
+            tokens = self._estimate_tokens(request)
+            chat_completion = self.rate_limiter.call(self._create, request, tokens=tokens)
+            self.rate_limiter.settle(tokens, self._total_tokens(chat_completion))
 
             response_text = chat_completion.choices[0].message.content
 
@@ -47,10 +110,42 @@ class GroqLLMService:
 
             return data
 
-        except APIConnectionError as e:
-            logger.error(f"Groq Connection Error: {e}")
+        except LLMBackendError as e:
+            logger.error(f"Groq API Error: {e}")
+            raise
+
+        except APIError as e:
+            logger.error(f"Groq API Error: {e}")
+            return None
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Groq returned non-JSON: {e}")
+            return None
+
+        except Exception as e:
+            logger.error(f"Unexpected Groq error: {e}")
             return None
 
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[Dict]:
+        """Async variant of extract_structured_data (event-loop LLM stage)"""
+        try:
+            logger.info(f"Sending {len(ocr_text)} chars to Groq model {self.model} (async)")
+
+            request = self._build_request(ocr_text)
+            tokens = self._estimate_tokens(request)
+            chat_completion = await self.rate_limiter.call_async(self._create_async, request, tokens=tokens)
+            self.rate_limiter.settle(tokens, self._total_tokens(chat_completion))
+
+            data = json.loads(chat_completion.choices[0].message.content)
+
+            logger.info(f"Groq successfully returned structured JSON")
+
+            return data
+
+        except LLMBackendError as e:
+            logger.error(f"Groq API Error: {e}")
+            raise
+
         except APIError as e:
             logger.error(f"Groq API Error: {e}")
             return None
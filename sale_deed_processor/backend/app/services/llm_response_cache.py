@@ -0,0 +1,207 @@
+# backend/app/services/llm_response_cache.py
+
+"""
+LLM Response Cache - Content-addressed store of structured extraction results
+
+Keys are a hash of (prompt version, backend, model, temperature, output
+settings, OCR text), so re-running a document whose OCR text did not change
+(after a DB wipe, rerun-failed for post-LLM errors, duplicate uploads) returns
+the stored JSON instead of paying for another LLM call. Any prompt, model,
+output setting (max tokens, schema-constrained decoding) or text change
+produces a different key.
+
+Entries expire after LLM_CACHE_TTL_DAYS and the least recently used entries
+are evicted beyond LLM_CACHE_MAX_ENTRIES. Like the table detection cache it is
+a SQLite file outside the main database.
+
+The cache is off by default (ENABLE_LLM_CACHE): at a sampling temperature
+above 0 a stored answer is only one possible answer, and "rerun failed" would
+get the same bad answer back. To drop stored answers (e.g. after a bad run),
+call POST /api/system/llm-cache/clear; GET /api/system/llm-cache shows hit
+counters and size.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def output_settings_fingerprint() -> str:
+    """Settings that shape the answer besides prompt, model and temperature"""
+    return f"max_tokens={settings.LLM_MAX_TOKENS};json_schema={int(settings.ENABLE_JSON_SCHEMA_OUTPUT)}"
+
+
+def make_cache_key(
+    prompt_version: str,
+    backend: str,
+    model: str,
+    temperature: float,
+    text: str,
+    output_settings: str = ""
+) -> str:
+    """SHA-256 over the request identity and the text sent to the LLM"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, backend, model, f"{temperature:.4f}", output_settings):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Thread-safe SQLite store of LLM extraction results
+    """
+
+    def __init__(self, db_path: Path, ttl_days: float = 0, max_entries: int = 0):
+        """
+        Open (or create) the cache
+
+        Args:
+            db_path: SQLite file location
+            ttl_days: Entry lifetime in days (0 = never expires)
+            max_entries: Entry limit, least recently used evicted first (0 = unlimited)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                cache_key TEXT PRIMARY KEY,
+                backend TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used_at)"
+        )
+        self._conn.commit()
+
+        logger.info(f"LLM response cache opened: {self.db_path}")
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """
+        Look up a stored response
+
+        Returns:
+            The extracted data, or None on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (cache_key,))
+                self._conn.commit()
+                self._counters["evictions"] += 1
+                row = None
+
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_responses SET last_used_at = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, cache_key)
+            )
+            self._conn.commit()
+            self._counters["hits"] += 1
+
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, backend: str, model: str, data: Dict):
+        """Store a response and evict the least recently used entries beyond the limit"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(cache_key, backend, model, response, created_at, last_used_at, hit_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (cache_key, backend, model, json.dumps(data, ensure_ascii=False), now, now)
+            )
+            self._counters["stores"] += 1
+
+            if self.max_entries:
+                evicted = self._conn.execute(
+                    "DELETE FROM llm_responses WHERE cache_key IN ("
+                    "SELECT cache_key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+                self._counters["evictions"] += max(evicted, 0)
+
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit counters since startup plus current size"""
+        with self._lock:
+            entries, total_hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM llm_responses"
+            ).fetchone()
+            counters = dict(self._counters)
+
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "lifetime_hits": total_hits,
+            "max_entries": self.max_entries,
+            "ttl_days": self.ttl_seconds / 86400,
+            "path": str(self.db_path)
+        }
+
+    def clear(self) -> int:
+        """Remove all entries, returns the number removed"""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM llm_responses").rowcount
+            self._conn.commit()
+        return removed
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache instance (None when ENABLE_LLM_CACHE is off or it cannot be opened)"""
+    global _cache
+    if not settings.ENABLE_LLM_CACHE:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMResponseCache(
+                    settings.LLM_CACHE_PATH,
+                    ttl_days=settings.LLM_CACHE_TTL_DAYS,
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                logger.warning(f"LLM response cache disabled: {e}")
+                return None
+        return _cache
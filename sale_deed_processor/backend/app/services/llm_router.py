@@ -0,0 +1,214 @@
+# backend/app/services/llm_router.py
+
+"""
+LLM Router - Hedged requests and failover across an ordered backend list
+
+With LLM_BACKENDS set (e.g. "gemini,groq,ollama") every extraction starts on
+the first backend. The next backend is started as well when either:
+- the running request has taken longer than the current backend's rolling
+  p95 latency (hedge), or
+- it failed (backend error, unusable answer) before that point (failover).
+
+The first valid JSON wins. Pending async requests are cancelled; a blocking
+request that already started cannot be interrupted and its result is simply
+discarded. A slow or unavailable backend therefore costs at most about its
+p95 latency instead of LLM_TIMEOUT.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.exceptions import LLMBackendError
+from app.services.llm_service_factory import BaseLLMService
+from app.utils.llm_usage import bind_context
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200  # Successful latencies kept per backend for the p95
+
+
+class BackendLatency:
+    """Rolling latency window of one backend"""
+
+    def __init__(self):
+        self._samples = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class HedgedLLMRouter(BaseLLMService):
+    """
+    BaseLLMService over several backends with hedging and failover
+    """
+
+    def __init__(self, services: List[BaseLLMService]):
+        """
+        Args:
+            services: Backends in priority order
+        """
+        if not services:
+            raise ValueError("HedgedLLMRouter needs at least one backend")
+
+        self.services = services
+        self.backend = "router:" + ",".join(s.backend for s in services)
+        self.model_name = ",".join(s.model_name for s in services)
+        self.temperature = services[0].temperature
+
+        self._latency = {s.backend: BackendLatency() for s in services}
+        self._counters = {"requests": 0, "hedged": 0, "failovers": 0, "secondary_wins": 0}
+        self._lock = threading.Lock()
+
+        # Room for every LLM worker to have each backend in flight, plus abandoned hedges
+        self._executor = ThreadPoolExecutor(
+            max_workers=2 * settings.MAX_LLM_WORKERS * len(services),
+            thread_name_prefix="llm-router"
+        )
+
+        logger.info(f"LLM router: {' -> '.join(s.backend for s in services)} (hedge at p{settings.LLM_HEDGE_PERCENTILE:g})")
+
+    def hedge_delay(self, service: BaseLLMService) -> float:
+        """Seconds to wait on a backend before starting the next one"""
+        p = self._latency[service.backend].percentile(settings.LLM_HEDGE_PERCENTILE)
+        if p is None:
+            return settings.LLM_HEDGE_INITIAL_DELAY
+        return max(p, settings.LLM_HEDGE_MIN_DELAY)
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counters[key] += 1
+
+    def stats(self) -> Dict:
+        """Routing counters and current hedge delays"""
+        with self._lock:
+            counters = dict(self._counters)
+        counters["hedge_delays"] = {s.backend: round(self.hedge_delay(s), 2) for s in self.services}
+        return counters
+
+    def _call(self, service: BaseLLMService, ocr_text: str) -> Optional[dict]:
+        """One backend call, recording its latency when it succeeds"""
+        start = time.monotonic()
+        data = service.extract_structured_data(ocr_text)
+        if isinstance(data, dict):
+            self._latency[service.backend].record(time.monotonic() - start)
+        return data
+
+    async def _call_async(self, service: BaseLLMService, ocr_text: str) -> Optional[dict]:
+        start = time.monotonic()
+        data = await service.extract_structured_data_async(ocr_text)
+        if isinstance(data, dict):
+            self._latency[service.backend].record(time.monotonic() - start)
+        return data
+
+    def _launch_next(self, started: int, reason: str) -> bool:
+        """Account for starting backend number `started`; False when none are left"""
+        if started >= len(self.services):
+            return False
+        self._count(reason)
+        logger.warning(
+            f"LLM router: {reason} {self.services[started - 1].backend} -> {self.services[started].backend}"
+        )
+        return True
+
+    @staticmethod
+    def _raise_or_none(errors: List[BaseException]) -> None:
+        """No backend produced data: re-raise the last backend error (None if answers were unusable)"""
+        backend_errors = [e for e in errors if isinstance(e, LLMBackendError)]
+        if backend_errors:
+            raise backend_errors[-1]
+        return None
+
+    def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
+        self._count("requests")
+        pending = {self._executor.submit(bind_context(self._call), self.services[0], ocr_text): 0}
+        started = 1
+        errors: List[BaseException] = []
+
+        while pending:
+            newest = self.services[started - 1]
+            done, _ = wait(pending, timeout=self.hedge_delay(newest), return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Slowest-tail case: hedge with the next backend, keep waiting on both
+                if self._launch_next(started, "hedged"):
+                    pending[self._executor.submit(bind_context(self._call), self.services[started], ocr_text)] = started
+                    started += 1
+                continue
+
+            for future in done:
+                index = pending.pop(future)
+                error = future.exception()
+                if error is None and isinstance(future.result(), dict):
+                    for loser in pending:
+                        loser.cancel()  # Only stops calls that have not started yet
+                    if index > 0:
+                        self._count("secondary_wins")
+                    return future.result()
+
+                errors.append(error or ValueError(f"{self.services[index].backend} returned no data"))
+                logger.warning(f"LLM router: {self.services[index].backend} failed: {errors[-1]}")
+
+            if not pending and self._launch_next(started, "failovers"):
+                pending[self._executor.submit(bind_context(self._call), self.services[started], ocr_text)] = started
+                started += 1
+
+        return self._raise_or_none(errors)
+
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        self._count("requests")
+        pending = {asyncio.ensure_future(self._call_async(self.services[0], ocr_text)): 0}
+        started = 1
+        errors: List[BaseException] = []
+
+        try:
+            while pending:
+                newest = self.services[started - 1]
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay(newest), return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    if self._launch_next(started, "hedged"):
+                        pending[asyncio.ensure_future(self._call_async(self.services[started], ocr_text))] = started
+                        started += 1
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    error = task.exception()
+                    if error is None and isinstance(task.result(), dict):
+                        if index > 0:
+                            self._count("secondary_wins")
+                        return task.result()
+
+                    errors.append(error or ValueError(f"{self.services[index].backend} returned no data"))
+                    logger.warning(f"LLM router: {self.services[index].backend} failed: {errors[-1]}")
+
+                if not pending and self._launch_next(started, "failovers"):
+                    pending[asyncio.ensure_future(self._call_async(self.services[started], ocr_text))] = started
+                    started += 1
+
+            return self._raise_or_none(errors)
+
+        finally:
+            # Cancel the losers (their HTTP requests are aborted)
+            for task in pending:
+                task.cancel()
+
+    def check_connection(self) -> bool:
+        return any(service.check_connection() for service in self.services)
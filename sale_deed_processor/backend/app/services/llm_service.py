@@ -3,11 +3,21 @@
 from app.services.groq_llm_service import GroqLLMService #used when GROQ is enabled for testing only
 
 import requests
+import httpx
 import json
 from typing import Dict, Optional
 import logging
 from app.config import settings
-from app.utils.prompts import get_sale_deed_extraction_prompt
+from app.utils.prompts import build_extraction_messages
+from app.utils.extraction_schema import get_extraction_json_schema
+from app.utils.llm_usage import LLMCallUsage, track_llm_call
+from app.utils.http_client import (
+    get_http_session,
+    get_async_http_client,
+    raise_for_backend_status,
+    TRANSPORT_ERRORS,
+)
+from app.exceptions import LLMBackendError
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +39,15 @@ class LLMService:
         self.base_url = base_url or settings.OLLAMA_BASE_URL
         self.model = model or settings.OLLAMA_LLM_MODEL  # Updated to use new config
         self.temperature = temperature or settings.LLM_TEMPERATURE
-        self.api_url = f"{self.base_url}/api/generate"
+        self.api_url = f"{self.base_url}/api/chat"
+        self.session = get_http_session(self.base_url)
         
         logger.info(f"LLM Service initialized: {self.model} at {self.base_url}")
     
     def check_connection(self) -> bool:
         """Check if Ollama is running and accessible"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 logger.info("Ollama connection successful")
                 return True
@@ -45,6 +56,54 @@ class LLMService:
             logger.error(f"Cannot connect to Ollama: {e}")
             return False
     
+    def _build_payload(self, ocr_text: str) -> Dict:
+        """
+        Ollama chat request body
+
+        The instructions go in a separate system message ahead of the OCR
+        text, so every request starts with the same tokens and Ollama can
+        reuse the cached prefix of the loaded model.
+        """
+        return {
+            "model": self.model,
+            "messages": build_extraction_messages(ocr_text),
+            "stream": False,
+            "temperature": self.temperature,
+            "format": get_extraction_json_schema() if settings.ENABLE_JSON_SCHEMA_OUTPUT else "json",
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE
+        }
+
+    def _parse_response_text(
+        self,
+        response_text: str,
+        call: Optional[LLMCallUsage] = None,
+        result: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """Parse the model's JSON answer (and record the token counts of the response)"""
+        if call is not None and result is not None:
+            # prompt_eval_count excludes prompt tokens reused from the cached prefix
+            call.set_tokens(result.get("prompt_eval_count"), result.get("eval_count"))
+
+        try:
+            extracted_data = json.loads(response_text)
+
+            # Log what was extracted for debugging
+            buyer_count = len(extracted_data.get("buyer_details", []))
+            seller_count = len(extracted_data.get("seller_details", []))
+            logger.info(f"Successfully extracted structured data from LLM: {buyer_count} buyers, {seller_count} sellers")
+
+            # Log full response if no buyers/sellers found
+            if buyer_count == 0 and seller_count == 0:
+                logger.warning(f"LLM returned ZERO buyers and sellers. Full response: {response_text[:1000]}")
+
+            return extracted_data
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM JSON response: {e}")
+            logger.debug(f"Response text: {response_text[:500]}")
+            if call is not None:
+                call.status = "invalid"
+            return None
+
     def extract_structured_data(self, ocr_text: str) -> Optional[Dict]:
         """
         Extract structured data from OCR text using LLM
@@ -53,58 +112,68 @@ class LLMService:
             ocr_text: Complete OCR text from document
             
         Returns:
-            Extracted data as dictionary or None if failed
+            Extracted data as dictionary or None if the answer was unusable
+
+        Raises:
+            LLMBackendError: HTTP error status, timeout or connection failure
         """
-        system_prompt = get_sale_deed_extraction_prompt()
-        
-        full_prompt = f"{system_prompt}\n\nHere is the OCR text from the sale deed document:\n\n{ocr_text}\n\nExtract the data and return ONLY valid JSON:"
-        
-        payload = {
-            "model": self.model,
-            "prompt": full_prompt,
-            "stream": False,
-            "temperature": self.temperature,
-            "format": "json"
-        }
+        payload = self._build_payload(ocr_text)
         
         try:
             logger.info(f"Sending request to LLM (text length: {len(ocr_text)} chars)")
             
-            response = requests.post(
-                self.api_url,
-                json=payload,
-                timeout=120
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"LLM API error: {response.status_code} - {response.text}")
-                return None
-            
-            result = response.json()
-            response_text = result.get("response", "")
-            
-            # Parse JSON response
-            try:
-                extracted_data = json.loads(response_text)
-
-                # Log what was extracted for debugging
-                buyer_count = len(extracted_data.get("buyer_details", []))
-                seller_count = len(extracted_data.get("seller_details", []))
-                logger.info(f"Successfully extracted structured data from LLM: {buyer_count} buyers, {seller_count} sellers")
-
-                # Log full response if no buyers/sellers found
-                if buyer_count == 0 and seller_count == 0:
-                    logger.warning(f"LLM returned ZERO buyers and sellers. Full response: {response_text[:1000]}")
-
-                return extracted_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM JSON response: {e}")
-                logger.debug(f"Response text: {response_text[:500]}")
-                return None
+            with track_llm_call("ollama", self.model) as call:
+                response = self.session.post(
+                    self.api_url,
+                    json=payload,
+                    timeout=120
+                )
+
+                if response.status_code != 200:
+                    logger.error(f"LLM API error: {response.status_code} - {response.text}")
+                    raise_for_backend_status(response, "Ollama")
+
+                result = response.json()
+                return self._parse_response_text(result.get("message", {}).get("content", ""), call, result)
                 
+        except LLMBackendError:
+            raise
         except requests.exceptions.Timeout:
             logger.error("LLM request timeout")
+            raise LLMBackendError("Ollama request timeout")
+        except TRANSPORT_ERRORS as e:
+            logger.error(f"LLM connection error: {e}")
+            raise LLMBackendError(f"Ollama connection error: {e}") from e
+        except Exception as e:
+            logger.error(f"LLM extraction error: {e}")
             return None
+
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[Dict]:
+        """Async variant of extract_structured_data (event-loop LLM stage)"""
+        payload = self._build_payload(ocr_text)
+
+        try:
+            logger.info(f"Sending async request to LLM (text length: {len(ocr_text)} chars)")
+
+            client = get_async_http_client(self.base_url)
+            with track_llm_call("ollama", self.model) as call:
+                response = await client.post(self.api_url, json=payload, timeout=120)
+
+                if response.status_code != 200:
+                    logger.error(f"LLM API error: {response.status_code} - {response.text}")
+                    raise_for_backend_status(response, "Ollama")
+
+                result = response.json()
+                return self._parse_response_text(result.get("message", {}).get("content", ""), call, result)
+
+        except LLMBackendError:
+            raise
+        except httpx.TimeoutException:
+            logger.error("LLM request timeout")
+            raise LLMBackendError("Ollama request timeout")
+        except TRANSPORT_ERRORS as e:
+            logger.error(f"LLM connection error: {e}")
+            raise LLMBackendError(f"Ollama connection error: {e}") from e
         except Exception as e:
             logger.error(f"LLM extraction error: {e}")
             return None
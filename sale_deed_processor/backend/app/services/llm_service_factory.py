@@ -1,18 +1,76 @@
 # backend/app/services/llm_service_factory.py
 
+import asyncio
+import json
 import logging
+import time
 from typing import Optional
 from app.config import settings
+from app.utils.http_client import (
+    get_http_session,
+    get_async_http_client,
+    raise_for_backend_status,
+    TRANSPORT_ERRORS,
+)
+from app.exceptions import LLMBackendError
+from app.utils.prompts import build_extraction_messages, get_sale_deed_prompt_version
+from app.utils.extraction_schema import build_json_schema_response_format
+from app.utils.llm_usage import LLMCallUsage, record_call, track_llm_call
+from app.services.llm_response_cache import (
+    LLMResponseCache,
+    get_llm_response_cache,
+    make_cache_key,
+    output_settings_fingerprint,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class BaseLLMService:
-    """Base class for LLM services"""
+    """
+    Base class for LLM services
+
+    extract_structured_data returns the extracted dict, or None when the model's
+    answer is unusable, and raises LLMBackendError when the backend itself
+    fails (error status, rate limit, timeout) so callers can back off.
+    """
+
+    # Request identity (used as part of the response cache key)
+    backend = "unknown"
+    model_name = ""
+    temperature = 0.0
 
     def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
         raise NotImplementedError("Subclass must implement extract_structured_data")
 
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        """
+        Async variant for the event-loop LLM stage
+
+        Backends without a native async client run the sync call in a thread.
+        """
+        return await asyncio.to_thread(self.extract_structured_data, ocr_text)
+
+    def lookup(self, ocr_text: str) -> Optional[dict]:
+        """Answer available without a backend call (response cache hit), None otherwise"""
+        return None
+
+    async def lookup_async(self, ocr_text: str) -> Optional[dict]:
+        return None
+
+    def extract_uncached(self, ocr_text: str) -> Optional[dict]:
+        """
+        Backend call after a lookup() miss
+
+        Callers holding an adaptive concurrency slot use lookup() first and
+        only take the slot for this call, so cache hits neither wait for a
+        slot nor count as backend latencies.
+        """
+        return self.extract_structured_data(ocr_text)
+
+    async def extract_uncached_async(self, ocr_text: str) -> Optional[dict]:
+        return await self.extract_structured_data_async(ocr_text)
+
     def check_connection(self) -> bool:
         """Check if the LLM service is accessible"""
         raise NotImplementedError("Subclass must implement check_connection")
@@ -21,155 +79,171 @@ class BaseLLMService:
 class OllamaLLMService(BaseLLMService):
     """Ollama backend using existing implementation"""
 
+    backend = "ollama"
+
     def __init__(self):
-        from app.services.llm_service import OllamaLLMService as OllamaImpl
+        from app.services.llm_service import LLMService as OllamaImpl
         self.service = OllamaImpl(
             base_url=settings.OLLAMA_BASE_URL,
             model=settings.OLLAMA_LLM_MODEL
         )
+        self.model_name = self.service.model
+        self.temperature = self.service.temperature
         logger.info(f"Initialized Ollama LLM: {settings.OLLAMA_LLM_MODEL}")
 
     def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
         return self.service.extract_structured_data(ocr_text)
 
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        return await self.service.extract_structured_data_async(ocr_text)
+
     def check_connection(self) -> bool:
         return self.service.check_connection()
 
 
-class LlamaCppLLMService(BaseLLMService):
-    """llama.cpp server backend (OpenAI-compatible API)"""
+class OpenAICompatibleLLMService(BaseLLMService):
+    """Shared implementation for servers exposing the OpenAI chat completions API"""
 
-    def __init__(self):
-        import requests
-        self.base_url = settings.LLAMACPP_BASE_URL
-        self.model = settings.LLAMACPP_LLM_MODEL
+    backend_name = "OpenAI-compatible"
+    extra_payload: dict = {}  # Server-specific request fields
+
+    def __init__(self, base_url: str, model: str):
+        self.base_url = base_url
+        self.model = model
+        self.model_name = model
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
         self.timeout = settings.LLM_TIMEOUT
-        logger.info(f"Initialized llama.cpp LLM: {self.model} at {self.base_url}")
+        self.session = get_http_session(self.base_url)
+        logger.info(f"Initialized {self.backend_name} LLM: {self.model} at {self.base_url}")
+
+    def _build_payload(self, ocr_text: str) -> dict:
+        """Chat completion request body"""
+        return {
+            "model": self.model,
+            "messages": build_extraction_messages(ocr_text),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "response_format": (
+                build_json_schema_response_format() if settings.ENABLE_JSON_SCHEMA_OUTPUT
+                else {"type": "json_object"}
+            ),
+            **self.extra_payload
+        }
+
+    def _parse_response(self, response, call: Optional[LLMCallUsage] = None) -> Optional[dict]:
+        """Extract the JSON content of a chat completion response (requests or httpx)"""
+        if response.status_code != 200:
+            logger.error(f"{self.backend_name} API error: {response.status_code}")
+            raise_for_backend_status(response, self.backend_name)
+
+        result = response.json()
+        if call is not None:
+            usage = result.get("usage") or {}
+            call.set_tokens(
+                usage.get("prompt_tokens"),
+                usage.get("completion_tokens"),
+                (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            )
+        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        return json.loads(content)
 
     def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
-        import requests
-        import json
-        from app.utils.prompts import get_sale_deed_extraction_prompt
-
         try:
-            system_prompt = get_sale_deed_extraction_prompt()
-
-            # llama.cpp uses OpenAI-compatible API
-            response = requests.post(
-                f"{self.base_url}/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": ocr_text}
-                    ],
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens,
-                    "response_format": {"type": "json_object"}
-                },
-                timeout=self.timeout
-            )
-
-            if response.status_code != 200:
-                logger.error(f"llama.cpp API error: {response.status_code}")
-                return None
-
-            result = response.json()
-            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-
-            return json.loads(content)
+            with track_llm_call(self.backend, self.model) as call:
+                response = self.session.post(
+                    f"{self.base_url}/v1/chat/completions",
+                    json=self._build_payload(ocr_text),
+                    timeout=self.timeout
+                )
+                return self._parse_response(response, call)
+
+        except LLMBackendError:
+            raise
+        except TRANSPORT_ERRORS as e:
+            logger.error(f"{self.backend_name} connection error: {e}")
+            raise LLMBackendError(f"{self.backend_name} connection error: {e}") from e
+        except Exception as e:
+            logger.error(f"{self.backend_name} extraction error: {e}")
+            return None
 
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        try:
+            client = get_async_http_client(self.base_url)
+            with track_llm_call(self.backend, self.model) as call:
+                response = await client.post(
+                    f"{self.base_url}/v1/chat/completions",
+                    json=self._build_payload(ocr_text),
+                    timeout=self.timeout
+                )
+                return self._parse_response(response, call)
+
+        except LLMBackendError:
+            raise
+        except TRANSPORT_ERRORS as e:
+            logger.error(f"{self.backend_name} connection error: {e}")
+            raise LLMBackendError(f"{self.backend_name} connection error: {e}") from e
         except Exception as e:
-            logger.error(f"llama.cpp extraction error: {e}")
+            logger.error(f"{self.backend_name} async extraction error: {e}")
             return None
 
     def check_connection(self) -> bool:
-        """Check if llama.cpp server is accessible"""
+        """Check if the server is accessible"""
         try:
-            import requests
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=5)
             return response.status_code == 200
         except Exception as e:
-            logger.error(f"llama.cpp connection check failed: {e}")
+            logger.error(f"{self.backend_name} connection check failed: {e}")
             return False
 
 
-class VLLMLLMService(BaseLLMService):
-    """vLLM backend (OpenAI-compatible API) - Production optimized"""
-
-    def __init__(self):
-        import requests
-        self.base_url = settings.VLLM_BASE_URL
-        self.model = settings.VLLM_LLM_MODEL
-        self.temperature = settings.LLM_TEMPERATURE
-        self.max_tokens = settings.LLM_MAX_TOKENS
-        self.timeout = settings.LLM_TIMEOUT
-        logger.info(f"Initialized vLLM LLM: {self.model} at {self.base_url}")
+class LlamaCppLLMService(OpenAICompatibleLLMService):
+    """llama.cpp server backend (OpenAI-compatible API)"""
 
-    def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
-        import requests
-        import json
-        from app.utils.prompts import get_sale_deed_extraction_prompt
+    backend = "llamacpp"
+    backend_name = "llama.cpp"
+    extra_payload = {"cache_prompt": True}  # Reuse the KV cache of the shared instruction prefix
 
-        try:
-            system_prompt = get_sale_deed_extraction_prompt()
-
-            # vLLM uses OpenAI-compatible API
-            response = requests.post(
-                f"{self.base_url}/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": ocr_text}
-                    ],
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens,
-                    "response_format": {"type": "json_object"}
-                },
-                timeout=self.timeout
-            )
+    def __init__(self):
+        super().__init__(settings.LLAMACPP_BASE_URL, settings.LLAMACPP_LLM_MODEL)
 
-            if response.status_code != 200:
-                logger.error(f"vLLM API error: {response.status_code}")
-                return None
 
-            result = response.json()
-            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+class VLLMLLMService(OpenAICompatibleLLMService):
+    """
+    vLLM backend (OpenAI-compatible API) - Production optimized
 
-            return json.loads(content)
+    Prefix caching is a server option (--enable-prefix-caching); requests only
+    need the identical leading system message, which build_extraction_messages gives.
+    """
 
-        except Exception as e:
-            logger.error(f"vLLM extraction error: {e}")
-            return None
+    backend = "vllm"
+    backend_name = "vLLM"
 
-    def check_connection(self) -> bool:
-        """Check if vLLM server is accessible"""
-        try:
-            import requests
-            response = requests.get(f"{self.base_url}/health", timeout=5)
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"vLLM connection check failed: {e}")
-            return False
+    def __init__(self):
+        super().__init__(settings.VLLM_BASE_URL, settings.VLLM_LLM_MODEL)
 
 
 class GroqLLMService(BaseLLMService):
     """Groq Cloud API backend (existing implementation)"""
 
+    backend = "groq"
+
     def __init__(self):
         from app.services.llm_service import GroqLLMService as GroqImpl
         self.service = GroqImpl(
             api_key=settings.GROQ_API_KEY,
             model=settings.GROQ_MODEL
         )
+        self.model_name = settings.GROQ_MODEL
+        self.temperature = 0.0  # Groq requests are sent with temperature 0
         logger.info(f"Initialized Groq LLM: {settings.GROQ_MODEL}")
 
     def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
         return self.service.extract_structured_data(ocr_text)
 
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        return await self.service.extract_structured_data_async(ocr_text)
+
     def check_connection(self) -> bool:
         return self.service.check_connection()
 
@@ -177,17 +251,95 @@ class GroqLLMService(BaseLLMService):
 class GeminiLLMService(BaseLLMService):
     """Google Gemini Cloud API backend"""
 
+    backend = "gemini"
+
     def __init__(self):
         from app.services.gemini_llm_service import GeminiLLMService as GeminiImpl
         self.service = GeminiImpl(
             api_key=settings.GEMINI_API_KEY,
             model=settings.GEMINI_MODEL
         )
+        self.model_name = settings.GEMINI_MODEL
+        self.temperature = settings.LLM_TEMPERATURE
         logger.info(f"Initialized Gemini LLM: {settings.GEMINI_MODEL}")
 
     def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
         return self.service.extract_structured_data(ocr_text)
 
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        return await self.service.extract_structured_data_async(ocr_text)
+
+    def check_connection(self) -> bool:
+        return self.service.check_connection()
+
+
+class CachedLLMService(BaseLLMService):
+    """Checks the content-addressed response cache before calling the wrapped backend"""
+
+    def __init__(self, service: BaseLLMService, cache: LLMResponseCache):
+        self.service = service
+        self.cache = cache
+        self.backend = service.backend
+        self.model_name = service.model_name
+        self.temperature = service.temperature
+        logger.info(f"LLM response cache enabled for {self.backend} ({self.model_name})")
+
+    def _cache_key(self, ocr_text: str) -> str:
+        return make_cache_key(
+            get_sale_deed_prompt_version(), self.backend, self.model_name, self.temperature, ocr_text,
+            output_settings_fingerprint()
+        )
+
+    def _lookup(self, cache_key: str) -> Optional[dict]:
+        try:
+            data = self.cache.get(cache_key)
+            if data is not None:
+                logger.info(f"LLM response cache hit ({self.backend}), skipping LLM call")
+                record_call(LLMCallUsage(
+                    backend=self.backend, model=self.model_name, started_at=time.monotonic(), status="cache_hit"
+                ))
+            return data
+        except Exception as e:
+            logger.warning(f"LLM response cache lookup failed: {e}")
+            return None
+
+    def _store(self, cache_key: str, data: Optional[dict]):
+        if not isinstance(data, dict):
+            return
+        try:
+            self.cache.put(cache_key, self.backend, self.model_name, data)
+        except Exception as e:
+            logger.warning(f"LLM response cache store failed: {e}")
+
+    def lookup(self, ocr_text: str) -> Optional[dict]:
+        return self._lookup(self._cache_key(ocr_text))
+
+    async def lookup_async(self, ocr_text: str) -> Optional[dict]:
+        # SQLite calls run off the event loop
+        return await asyncio.to_thread(self.lookup, ocr_text)
+
+    def extract_uncached(self, ocr_text: str) -> Optional[dict]:
+        data = self.service.extract_structured_data(ocr_text)
+        self._store(self._cache_key(ocr_text), data)
+        return data
+
+    async def extract_uncached_async(self, ocr_text: str) -> Optional[dict]:
+        data = await self.service.extract_structured_data_async(ocr_text)
+        await asyncio.to_thread(self._store, self._cache_key(ocr_text), data)
+        return data
+
+    def extract_structured_data(self, ocr_text: str) -> Optional[dict]:
+        data = self.lookup(ocr_text)
+        if data is None:
+            data = self.extract_uncached(ocr_text)
+        return data
+
+    async def extract_structured_data_async(self, ocr_text: str) -> Optional[dict]:
+        data = await self.lookup_async(ocr_text)
+        if data is None:
+            data = await self.extract_uncached_async(ocr_text)
+        return data
+
     def check_connection(self) -> bool:
         return self.service.check_connection()
 
@@ -196,9 +348,50 @@ def get_llm_service() -> BaseLLMService:
     """
     Factory function to get the appropriate LLM service based on config
 
+    With LLM_BACKENDS set, the listed backends are combined behind the hedging /
+    failover router. The result is wrapped with the response cache when
+    ENABLE_LLM_CACHE is on.
+
     Returns:
         BaseLLMService instance for the configured backend
     """
+    if settings.LLM_BACKENDS.strip():
+        from app.services.llm_router import HedgedLLMRouter
+        names = [name.strip() for name in settings.LLM_BACKENDS.split(",") if name.strip()]
+        service = HedgedLLMRouter([create_llm_service(name) for name in names])
+    else:
+        service = _select_llm_service()
+
+    cache = get_llm_response_cache()
+    if cache is not None:
+        return CachedLLMService(service, cache)
+    return service
+
+
+LLM_SERVICE_CLASSES = {
+    "ollama": OllamaLLMService,
+    "llamacpp": LlamaCppLLMService,
+    "vllm": VLLMLLMService,
+    "groq": GroqLLMService,
+    "gemini": GeminiLLMService,
+}
+
+
+def create_llm_service(backend: str) -> BaseLLMService:
+    """
+    Backend instance by name (ignores the USE_* switches)
+
+    Args:
+        backend: "ollama", "llamacpp", "vllm", "groq" or "gemini"
+    """
+    try:
+        return LLM_SERVICE_CLASSES[backend.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend '{backend}'") from None
+
+
+def _select_llm_service() -> BaseLLMService:
+    """Backend instance for LLM_BACKEND (with fallbacks)"""
     backend = settings.LLM_BACKEND.lower()
 
     if backend == "gemini" and settings.USE_GEMINI:
@@ -0,0 +1,159 @@
+# backend/app/services/llm_usage_store.py
+
+"""
+LLM Usage Store - Per-document usage rows (llm_usage table) and aggregates
+
+Each processed document gets one row with the totals of its LLM calls
+(tokens, latency, queue wait, estimated cost) plus the individual calls as
+JSON. Aggregates per batch and per backend are computed in SQL for the
+usage endpoints.
+"""
+
+import json
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import LLMUsage
+from app.utils.llm_usage import UsageRecorder
+
+logger = logging.getLogger(__name__)
+
+
+def save_document_usage(
+    db: Session,
+    document_id: str,
+    batch_id: Optional[str],
+    status: str,
+    recorder: UsageRecorder
+) -> Optional[Dict]:
+    """
+    Store the LLM usage of one document
+
+    Returns:
+        The usage summary, or None if no LLM call was made
+    """
+    summary = recorder.summary()
+    if not summary["calls"] and not summary["cache_hits"]:
+        return None
+
+    try:
+        db.add(LLMUsage(
+            document_id=document_id,
+            batch_id=batch_id,
+            status=status,
+            backends=",".join(summary["backends"]),
+            models=",".join(summary["models"]),
+            calls=summary["calls"],
+            failed_calls=summary["failed_calls"],
+            cache_hits=summary["cache_hits"],
+            prompt_tokens=summary["prompt_tokens"],
+            completion_tokens=summary["completion_tokens"],
+            cached_tokens=summary["cached_tokens"],
+            llm_seconds=summary["llm_seconds"],
+            queue_wait_seconds=summary["queue_wait_seconds"],
+            cost=summary["cost"],
+            call_details=json.dumps(recorder.details())
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[{document_id}] LLM usage not saved: {e}")
+
+    return summary
+
+
+def _aggregate_columns():
+    return (
+        func.count(LLMUsage.id).label("documents"),
+        func.sum(LLMUsage.calls).label("calls"),
+        func.sum(LLMUsage.failed_calls).label("failed_calls"),
+        func.sum(LLMUsage.cache_hits).label("cache_hits"),
+        func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+        func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+        func.sum(LLMUsage.cached_tokens).label("cached_tokens"),
+        func.sum(LLMUsage.llm_seconds).label("llm_seconds"),
+        func.avg(LLMUsage.llm_seconds).label("avg_llm_seconds"),
+        func.max(LLMUsage.llm_seconds).label("max_llm_seconds"),
+        func.avg(LLMUsage.queue_wait_seconds).label("avg_queue_wait_seconds"),
+        func.max(LLMUsage.queue_wait_seconds).label("max_queue_wait_seconds"),
+        func.sum(LLMUsage.cost).label("cost"),
+    )
+
+
+def _row_to_dict(row) -> Dict:
+    data = dict(row._mapping)
+    for key, value in data.items():
+        if isinstance(value, float):
+            data[key] = round(value, 6)
+    return data
+
+
+def aggregate_usage(db: Session, batch_id: Optional[str] = None) -> Dict:
+    """
+    Usage totals, overall and per backend combination
+
+    Args:
+        db: Database session
+        batch_id: Limit to one batch (None = all documents)
+    """
+    query = db.query(*_aggregate_columns())
+    by_backend = db.query(LLMUsage.backends, *_aggregate_columns())
+    if batch_id is not None:
+        query = query.filter(LLMUsage.batch_id == batch_id)
+        by_backend = by_backend.filter(LLMUsage.batch_id == batch_id)
+
+    return {
+        "batch_id": batch_id,
+        **_row_to_dict(query.one()),
+        "by_backend": [_row_to_dict(row) for row in by_backend.group_by(LLMUsage.backends).all()]
+    }
+
+
+def list_batch_usage(db: Session, limit: int = 50) -> List[Dict]:
+    """Per-batch totals, most recent batches first"""
+    rows = (
+        db.query(
+            LLMUsage.batch_id,
+            func.min(LLMUsage.created_at).label("started_at"),
+            *_aggregate_columns()
+        )
+        .filter(LLMUsage.batch_id.isnot(None))
+        .group_by(LLMUsage.batch_id)
+        .order_by(func.min(LLMUsage.created_at).desc())
+        .limit(limit)
+        .all()
+    )
+    return [_row_to_dict(row) for row in rows]
+
+
+def get_document_usage(db: Session, document_id: str) -> List[Dict]:
+    """All usage rows of a document (one per processing attempt), newest first"""
+    rows = (
+        db.query(LLMUsage)
+        .filter(LLMUsage.document_id == document_id)
+        .order_by(LLMUsage.created_at.desc())
+        .all()
+    )
+    return [
+        {
+            "batch_id": row.batch_id,
+            "status": row.status,
+            "backends": row.backends,
+            "models": row.models,
+            "calls": row.calls,
+            "failed_calls": row.failed_calls,
+            "cache_hits": row.cache_hits,
+            "prompt_tokens": row.prompt_tokens,
+            "completion_tokens": row.completion_tokens,
+            "cached_tokens": row.cached_tokens,
+            "llm_seconds": row.llm_seconds,
+            "queue_wait_seconds": row.queue_wait_seconds,
+            "cost": row.cost,
+            "call_details": json.loads(row.call_details) if row.call_details else [],
+            "created_at": row.created_at
+        }
+        for row in rows
+    ]
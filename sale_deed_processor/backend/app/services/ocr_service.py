@@ -1,9 +1,9 @@
 # backend/app/services/ocr_service.py
 
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
 import logging
 from multiprocessing import Pool
 from functools import partial
@@ -11,6 +11,46 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def _words_from_data(data: Dict) -> List[Dict]:
+    """Word dicts from a Tesseract image_to_data result"""
+    words = []
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        conf = float(data["conf"][i])
+        # conf == -1 marks block/paragraph/line rows without text
+        if not text or conf < 0:
+            continue
+        words.append({
+            "text": text,
+            "left": data["left"][i],
+            "top": data["top"][i],
+            "width": data["width"][i],
+            "height": data["height"][i],
+            "conf": conf
+        })
+    return words
+
+
+def _text_from_data(data: Dict) -> str:
+    """Page text from a Tesseract image_to_data result (lines and paragraph breaks as image_to_string)"""
+    paragraphs = []
+    lines = {}
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        if not text or float(data["conf"][i]) < 0:
+            continue
+        paragraph = (data["block_num"][i], data["par_num"][i])
+        if not paragraphs or paragraphs[-1] != paragraph:
+            paragraphs.append(paragraph)
+        lines.setdefault(paragraph, {}).setdefault(data["line_num"][i], []).append(text)
+
+    return "\n\n".join(
+        "\n".join(" ".join(words) for words in lines[paragraph].values())
+        for paragraph in paragraphs
+    )
+
+
 class OCRService:
     def __init__(
         self,
@@ -66,35 +106,136 @@ class OCRService:
             logger.error(f"Error converting PDF to images: {e}")
             raise
     
-    def ocr_image(self, image: Image.Image, page_num: int) -> Dict:
+    def get_page_count(self, pdf_path: str) -> int:
         """
-        Perform OCR on a single image
+        Get number of pages in PDF without rendering it
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Page count
+        """
+        info = pdfinfo_from_path(
+            pdf_path,
+            poppler_path=self.poppler_path if self.poppler_path else None
+        )
+        return int(info["Pages"])
+
+    def render_page(self, pdf_path: str, page_num: int, dpi: Optional[int] = None) -> Optional[Image.Image]:
+        """
+        Render a single PDF page using Poppler
+
+        Args:
+            pdf_path: Path to PDF file
+            page_num: 1-based page number
+            dpi: Render DPI (default: service DPI)
+
+        Returns:
+            PIL Image or None if the page could not be rendered
+        """
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi or self.dpi,
+            poppler_path=self.poppler_path if self.poppler_path else None,
+            first_page=page_num,
+            last_page=page_num
+        )
+        return images[0] if images else None
+
+    def ocr_image_words(
+        self,
+        image: Image.Image,
+        page_num: int,
+        lang: Optional[str] = None,
+        config: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Perform OCR on a single image and return per-word boxes (Tesseract TSV)
 
         Args:
             image: PIL Image object
             page_num: Page number (for reference)
+            lang: Tesseract language (default: service language)
+            config: Tesseract config string (default: service config)
 
         Returns:
-            Dictionary with page_num and extracted text
+            List of word dicts with text, left, top, width, height and conf
         """
         try:
-            text = pytesseract.image_to_string(
+            data = pytesseract.image_to_data(
                 image,
-                lang=self.lang,
-                config=self.tesseract_config
+                lang=lang or self.lang,
+                config=config or self.tesseract_config,
+                output_type=pytesseract.Output.DICT
             )
-            logger.debug(f"OCR completed for page {page_num}: {len(text)} characters")
-            return {
-                "page_num": page_num,
-                "text": text.strip()
-            }
         except Exception as e:
-            logger.error(f"OCR error on page {page_num}: {e}")
-            return {
-                "page_num": page_num,
-                "text": "",
-                "error": str(e)
-            }
+            logger.error(f"OCR word extraction error on page {page_num}: {e}")
+            return []
+
+        words = _words_from_data(data)
+        logger.debug(f"OCR word extraction completed for page {page_num}: {len(words)} words")
+        return words
+
+    def ocr_table_crop_words(self, image_path: str) -> List[Dict]:
+        """
+        OCR a cropped fee table with a digits/currency whitelist
+
+        The crop is converted to grayscale and upscaled before a single-block
+        Tesseract pass, so small printed amounts survive recognition.
+
+        Args:
+            image_path: Path to cropped table image
+
+        Returns:
+            List of word dicts (same format as ocr_image_words)
+        """
+        with Image.open(image_path) as crop:
+            image = crop.convert("L")
+
+        scale = settings.TABLE_OCR_SCALE
+        if scale and scale != 1.0:
+            image = image.resize(
+                (int(image.width * scale), int(image.height * scale)),
+                Image.LANCZOS
+            )
+
+        config = (
+            f"--oem {self.oem} --psm {settings.TABLE_OCR_PSM} "
+            f"-c tessedit_char_whitelist={settings.TABLE_OCR_WHITELIST}"
+        )
+        return self.ocr_image_words(image, page_num=1, lang="eng", config=config)
+
+    def iter_page_words(self, pdf_path: str, page_indices: Iterable[int]) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Lazily render and OCR pages, yielding word boxes one page at a time
+
+        Args:
+            pdf_path: Path to PDF file
+            page_indices: 0-based page indices to process, in order
+
+        Yields:
+            Tuples of (0-based page index, word dicts)
+        """
+        for page_index in page_indices:
+            image = self.render_page(pdf_path, page_index + 1)
+            if image is None:
+                continue
+            yield page_index, self.ocr_image_words(image, page_index + 1)
+
+    def ocr_image(self, image: Image.Image, page_num: int, with_words: bool = False) -> Dict:
+        """
+        Perform OCR on a single image
+
+        Args:
+            image: PIL Image object
+            page_num: Page number (for reference)
+            with_words: Also return word boxes (text and boxes from one image_to_data pass)
+
+        Returns:
+            Dictionary with page_num, extracted text and, with_words, the word dicts
+        """
+        return self._ocr_image_static((image, page_num, self.lang, self.tesseract_config, with_words))
 
     @staticmethod
     def _ocr_image_static(args: tuple) -> Dict:
@@ -102,18 +243,34 @@ class OCRService:
         Static method for multiprocessing OCR on a single image
 
         Args:
-            args: Tuple of (image, page_num, lang, tesseract_config)
+            args: Tuple of (image, page_num, lang, tesseract_config, with_words)
 
         Returns:
-            Dictionary with page_num and extracted text
+            Dictionary with page_num and extracted text (plus "words" when with_words)
         """
-        image, page_num, lang, tesseract_config = args
+        image, page_num, lang, tesseract_config, with_words = args
         try:
+            if with_words:
+                data = pytesseract.image_to_data(
+                    image,
+                    lang=lang,
+                    config=tesseract_config,
+                    output_type=pytesseract.Output.DICT
+                )
+                text = _text_from_data(data)
+                logger.debug(f"OCR completed for page {page_num}: {len(text)} characters (with word boxes)")
+                return {
+                    "page_num": page_num,
+                    "text": text,
+                    "words": _words_from_data(data)
+                }
+
             text = pytesseract.image_to_string(
                 image,
                 lang=lang,
                 config=tesseract_config
             )
+            logger.debug(f"OCR completed for page {page_num}: {len(text)} characters")
             return {
                 "page_num": page_num,
                 "text": text.strip()
@@ -126,7 +283,7 @@ class OCRService:
                 "error": str(e)
             }
     
-    def ocr_pdf(self, pdf_path: str, max_pages: int = 25) -> List[Dict]:
+    def ocr_pdf(self, pdf_path: str, max_pages: int = 25, word_pages: Iterable[int] = ()) -> List[Dict]:
         """
         Perform OCR on entire PDF (limited to max_pages)
         Uses multiprocessing if ENABLE_OCR_MULTIPROCESSING is True
@@ -134,21 +291,23 @@ class OCRService:
         Args:
             pdf_path: Path to PDF file
             max_pages: Maximum pages to process (default: 25)
+            word_pages: 0-based page indices that also return word boxes
 
         Returns:
             List of dictionaries with page_num and text for each page
         """
+        word_pages = set(word_pages)
         try:
             images = self.pdf_to_images(pdf_path, max_pages=max_pages)
 
             # Use multiprocessing if enabled and we have multiple pages
             if settings.ENABLE_OCR_MULTIPROCESSING and len(images) > 1:
-                results = self._ocr_pdf_multiprocess(images)
+                results = self._ocr_pdf_multiprocess(images, word_pages)
             else:
                 # Sequential processing (original behavior)
                 results = []
                 for idx, image in enumerate(images, start=1):
-                    result = self.ocr_image(image, idx)
+                    result = self.ocr_image(image, idx, with_words=idx - 1 in word_pages)
                     results.append(result)
 
             logger.info(
@@ -161,12 +320,13 @@ class OCRService:
             logger.error(f"Error in OCR PDF processing: {e}")
             raise
 
-    def _ocr_pdf_multiprocess(self, images: List[Image.Image]) -> List[Dict]:
+    def _ocr_pdf_multiprocess(self, images: List[Image.Image], word_pages: Iterable[int] = ()) -> List[Dict]:
         """
         Process OCR using multiprocessing for faster page-level parallelism
 
         Args:
             images: List of PIL Image objects
+            word_pages: 0-based page indices that also return word boxes
 
         Returns:
             List of dictionaries with page_num and text for each page
@@ -175,7 +335,7 @@ class OCRService:
 
         # Prepare arguments for each page
         ocr_args = [
-            (image, idx, self.lang, self.tesseract_config)
+            (image, idx, self.lang, self.tesseract_config, idx - 1 in word_pages)
             for idx, image in enumerate(images, start=1)
         ]
 
@@ -191,7 +351,7 @@ class OCRService:
             # Fallback to sequential processing
             results = []
             for idx, image in enumerate(images, start=1):
-                result = self.ocr_image(image, idx)
+                result = self.ocr_image(image, idx, with_words=idx - 1 in word_pages)
                 results.append(result)
             return results
     
@@ -206,12 +366,38 @@ class OCRService:
         Returns:
             Complete text with page markers
         """
-        results = self.ocr_pdf(pdf_path, max_pages=max_pages)
+        full_text, _ = self.get_full_text_and_words(pdf_path, max_pages=max_pages)
+        return full_text
+
+    def get_full_text_and_words(
+        self,
+        pdf_path: str,
+        max_pages: int = 25,
+        word_pages: Iterable[int] = ()
+    ) -> Tuple[str, List[Tuple[int, List[Dict]]]]:
+        """
+        Get complete OCR text plus word boxes of selected pages from one OCR pass
+
+        The word_pages are OCRed with image_to_data only, so their text and
+        boxes come from the same render and the same Tesseract call.
+
+        Args:
+            pdf_path: Path to PDF file
+            max_pages: Maximum pages to process (default: 25)
+            word_pages: 0-based page indices to return word boxes for
+
+        Returns:
+            Tuple of (complete text with page markers, [(0-based page index, word dicts)])
+        """
+        results = self.ocr_pdf(pdf_path, max_pages=max_pages, word_pages=word_pages)
         full_text = ""
+        page_words = []
 
         for result in results:
             page_num = result.get("page_num", 0)
             text = result.get("text", "")
             full_text += f"\n\n--- Page {page_num} ---\n\n{text}"
+            if "words" in result:
+                page_words.append((page_num - 1, result["words"]))
 
-        return full_text.strip()
\ No newline at end of file
+        return full_text.strip(), page_words
\ No newline at end of file
@@ -9,12 +9,13 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.services.registration_fee_extractor import RegistrationFeeExtractor
 from app.services.ocr_service import OCRService
-from app.services.yolo_detector import YOLOTableDetector
+from app.services.yolo_detector import YOLOTableDetector, get_yolo_model_path
 #from app.services.llm_service import LLMService
 from app.services.llm_service import get_llm_service
 
 from app.services.validation_service import ValidationService
 from app.utils.file_handler import FileHandler
+from app.utils.text_compaction import compact_ocr_text
 from app.models import DocumentDetail, PropertyDetail, BuyerDetail, SellerDetail
 
 logger = logging.getLogger(__name__)
@@ -34,8 +35,9 @@ class PDFProcessor:
         )
         self.ocr_service = OCRService()
         self.yolo_detector = YOLOTableDetector(
-            model_path=str(settings.YOLO_MODEL_PATH),
-            conf_threshold=settings.YOLO_CONF_THRESHOLD
+            model_path=str(get_yolo_model_path()),
+            conf_threshold=settings.YOLO_CONF_THRESHOLD,
+            iou_threshold=settings.YOLO_IOU_THRESHOLD
         )
         self.llm_service = get_llm_service()
         #self.llm_service = LLMService()
@@ -99,6 +101,16 @@ class PDFProcessor:
             if self.batch_processor and not self.batch_processor.is_running:
                 raise ProcessingStoppedException(f"Stopped before LLM extraction step")
 
+            # Compact the OCR text for the LLM (repeated headers/footers, noise)
+            if settings.ENABLE_OCR_TEXT_COMPACTION:
+                compaction = compact_ocr_text(full_ocr_text, settings.OCR_COMPACTION_MIN_REPEAT_PAGES)
+                if compaction.text:
+                    logger.info(
+                        f"[{document_id}] OCR text compacted: ~{compaction.original_tokens} -> "
+                        f"~{compaction.compact_tokens} tokens (-{compaction.token_reduction:.1%})"
+                    )
+                    full_ocr_text = compaction.text
+
             # Step 3: Extract structured data with LLM
             logger.info(f"[{document_id}] Step 3: Extracting structured data with LLM")
             extracted_data = self.llm_service.extract_structured_data(full_ocr_text)
@@ -190,27 +202,16 @@ class PDFProcessor:
             images = self.ocr_service.pdf_to_images(str(pdf_path))
             logger.info(f"[{document_id}] Converted PDF to {len(images)} images for YOLO detection")
             
-            # Try to detect table in each page
+            # Output path for cropped table
+            output_image_path = settings.LEFT_OVER_REG_FEE_DIR / f"{document_id}_table.png"
+
+            # Try to detect table in each page (in memory, no temporary PNG)
             for page_num, image in enumerate(images, start=1):
-                # Save temporary image for YOLO
-                temp_image_path = settings.LEFT_OVER_REG_FEE_DIR / f"temp_{document_id}_page_{page_num}.png"
-                image.save(temp_image_path)
-                
-                # Output path for cropped table
-                output_image_path = settings.LEFT_OVER_REG_FEE_DIR / f"{document_id}_table.png"
-                
-                # Run YOLO detection and crop
-                cropped_table = self.yolo_detector.detect_and_crop(
-                    str(temp_image_path),
-                    str(output_image_path)
-                )
-                
-                # Delete temporary image
-                if temp_image_path.exists():
-                    temp_image_path.unlink()
-                
-                # If table detected, stop (we only need one table)
-                if cropped_table is not None:
+                detection = self.yolo_detector.detect(image)
+
+                # If table detected, save crop and stop (we only need one table)
+                if detection is not None:
+                    FileHandler.save_table_image(detection.crop, output_image_path)
                     logger.info(f"[{document_id}] Table detected on page {page_num}, cropped image saved")
                     return True
             
@@ -9,7 +9,9 @@ Splits processing into 2 stages:
 """
 
 from pathlib import Path
-from typing import Optional, Dict
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import Optional, Dict, List, Callable, Tuple, Any
 import logging
 from datetime import datetime
 from sqlalchemy.orm import Session
@@ -18,10 +20,16 @@ from app.config import settings
 from app.services.registration_fee_extractor import RegistrationFeeExtractor
 from app.services.ocr_service import OCRService
 from app.services.pymupdf_reader import PyMuPDFReader
-from app.services.yolo_detector import YOLOTableDetector
+from app.services.yolo_detector import YOLOTableDetector, TableDetection, get_yolo_model_path
+from app.services.table_detection_cache import TableDetectionCache, CachedTableDetection, file_sha256
 from app.services.llm_service_factory import get_llm_service
+from app.services.chunked_extraction import ChunkedExtractor
 from app.services.validation_service import ValidationService
+from app.services.llm_usage_store import save_document_usage
 from app.utils.file_handler import FileHandler
+from app.utils.text_compaction import compact_ocr_text
+from app.utils.page_selection import select_relevant_pages
+from app.utils.rate_limiter import estimate_tokens
 from app.models import DocumentDetail, PropertyDetail, BuyerDetail, SellerDetail
 from app.workers.pipeline_processor_v2 import Stage1Result
 
@@ -43,18 +51,36 @@ class PDFProcessorV2:
         )
         self.ocr_service = OCRService()
         self.pymupdf_reader = PyMuPDFReader(max_pages=25)
+        self.yolo_model_path = get_yolo_model_path()
         self.yolo_detector = YOLOTableDetector(
-            model_path=str(settings.YOLO_MODEL_PATH),
-            conf_threshold=settings.YOLO_CONF_THRESHOLD
+            model_path=str(self.yolo_model_path),
+            conf_threshold=settings.YOLO_CONF_THRESHOLD,
+            iou_threshold=settings.YOLO_IOU_THRESHOLD
         )
+        self.detection_cache = None
+        if settings.ENABLE_TABLE_DETECTION_CACHE:
+            try:
+                negative_ttl = settings.TABLE_DETECTION_NEGATIVE_TTL_HOURS * 3600 or None
+                self.detection_cache = TableDetectionCache(settings.TABLE_DETECTION_CACHE_PATH, negative_ttl)
+            except Exception as e:
+                logger.warning(f"Table detection cache disabled: {e}")
         self.llm_service = get_llm_service()
+        self.chunked_extractor = None
+        if settings.ENABLE_CHUNKED_EXTRACTION:
+            self.chunked_extractor = ChunkedExtractor(
+                self.llm_service,
+                window_pages=settings.CHUNK_WINDOW_PAGES,
+                overlap_pages=settings.CHUNK_OVERLAP_PAGES,
+                min_pages=settings.CHUNK_MIN_PAGES,
+                max_parallel=settings.CHUNK_MAX_PARALLEL
+            )
 
         logger.info("PDF Processor V2 initialized (Pipeline mode)")
 
     def process_stage1_ocr(self, pdf_path: Path, db: Session) -> Stage1Result:
         """
         Stage 1: CPU-intensive processing
-        - Extract registration fee with pdfplumber
+        - Extract registration fee with pdfplumber (Tesseract word boxes as fallback)
         - Perform OCR with Tesseract (max 25 pages)
 
         Returns:
@@ -76,10 +102,13 @@ class PDFProcessorV2:
             logger.info(f"[{document_id}] Stage1: Extracting registration fee")
             registration_fee = self.reg_fee_extractor.extract(str(pdf_path))
 
-            if registration_fee:
-                logger.info(f"[{document_id}] Registration fee: {registration_fee}")
-            else:
-                logger.warning(f"[{document_id}] pdfplumber failed, will use YOLO + Vision later")
+            # Scanned deeds have no text layer - try Tesseract word boxes on fee pages
+            use_word_boxes = not registration_fee and settings.ENABLE_OCR_WORDBOX_REG_FEE
+
+            # Step 1b: Embedded OCR renders nothing, so the fee pages get their own Tesseract pass
+            if use_word_boxes and settings.USE_EMBEDDED_OCR:
+                logger.info(f"[{document_id}] Stage1: pdfplumber failed, trying OCR word-box fee extraction")
+                registration_fee = self._extract_reg_fee_from_ocr_words(pdf_path, document_id)
 
             # STOP CHECK
             if self.batch_processor and not self.batch_processor.is_running:
@@ -91,7 +120,19 @@ class PDFProcessorV2:
                 full_ocr_text = self.pymupdf_reader.get_full_text(str(pdf_path), max_pages=25)
             else:
                 logger.info(f"[{document_id}] Stage1: Performing OCR with Poppler+Tesseract (max 25 pages)")
-                full_ocr_text = self.ocr_service.get_full_text(str(pdf_path), max_pages=25)
+                # Fee pages are OCRed to word boxes in the same pass (no second render + OCR)
+                word_pages = self.reg_fee_extractor.fee_table_page_indices(25) if use_word_boxes else ()
+                full_ocr_text, page_words = self.ocr_service.get_full_text_and_words(
+                    str(pdf_path), max_pages=25, word_pages=word_pages
+                )
+                if use_word_boxes:
+                    logger.info(f"[{document_id}] Stage1: pdfplumber failed, trying OCR word-box fee extraction")
+                    registration_fee = self.reg_fee_extractor.extract_from_ocr_words(page_words)
+
+            if registration_fee:
+                logger.info(f"[{document_id}] Registration fee: {registration_fee}")
+            else:
+                logger.warning(f"[{document_id}] pdfplumber failed, will use YOLO + Vision later")
 
             if not full_ocr_text or len(full_ocr_text) < 100:
                 raise Exception("Text extraction returned insufficient text")
@@ -115,13 +156,44 @@ class PDFProcessorV2:
             else:
                 logger.debug(f"[{document_id}] OCR reg fee extraction disabled")
 
+            # Step 4: Compact the text sent to the LLM (fee extraction above used the raw text)
+            llm_text = full_ocr_text
+            ocr_tokens = prompt_tokens = estimate_tokens(full_ocr_text)
+            if settings.ENABLE_OCR_TEXT_COMPACTION:
+                compaction = compact_ocr_text(full_ocr_text, settings.OCR_COMPACTION_MIN_REPEAT_PAGES)
+                if compaction.text:
+                    llm_text = compaction.text
+                    prompt_tokens = compaction.compact_tokens
+                    logger.info(
+                        f"[{document_id}] OCR text compacted: {compaction.original_chars} -> "
+                        f"{compaction.compact_chars} chars, ~{ocr_tokens} -> ~{prompt_tokens} tokens "
+                        f"(-{compaction.token_reduction:.1%}, removed lines: {compaction.removed_lines})"
+                    )
+
+            # Step 5: Keep only the relevant pages (full text kept for the missing-party retry)
+            full_text = None
+            if settings.ENABLE_PAGE_SELECTION:
+                selection = select_relevant_pages(llm_text, settings.PAGE_SELECTION_TOKEN_BUDGET)
+                if selection.applied:
+                    logger.info(
+                        f"[{document_id}] Page selection: {len(selection.selected_pages)}/"
+                        f"{selection.total_pages} pages, ~{prompt_tokens} -> ~{selection.tokens} tokens "
+                        f"(pages {', '.join(selection.selected_pages)})"
+                    )
+                    full_text = llm_text
+                    llm_text = selection.text
+                    prompt_tokens = selection.tokens
+
             return Stage1Result(
                 pdf_path=pdf_path,
                 document_id=document_id,
                 registration_fee=registration_fee,
                 new_ocr_reg_fee=new_ocr_reg_fee,
-                ocr_text=full_ocr_text,
-                status="success"
+                ocr_text=llm_text,
+                status="success",
+                ocr_tokens=ocr_tokens,
+                prompt_tokens=prompt_tokens,
+                full_text=full_text
             )
 
         except ProcessingStoppedException as stopped_ex:
@@ -148,17 +220,26 @@ class PDFProcessorV2:
                 error=str(e)
             )
 
-    def process_stage2_llm(self, stage1_result: Stage1Result, db: Session) -> Dict:
+    def process_stage2_llm(
+        self,
+        stage1_result: Stage1Result,
+        db: Session,
+        table_future: Optional[Future] = None,
+        llm_future: Optional[Future] = None
+    ) -> Dict:
         """
         Stage 2: I/O-intensive processing
         - Extract structured data with LLM
         - Validate and clean data
         - Save to database
-        - Detect YOLO table if needed
+        - Use YOLO table detection result if needed
 
         Args:
             stage1_result: Results from Stage 1
             db: Database session
+            table_future: Pending table-stage detection started after Stage 1
+                (None runs detection inline when pdfplumber found no fee)
+            llm_future: Completed LLM call (async runner, LLM worker or bulk job); None calls the LLM here
 
         Returns:
             Processing result dictionary
@@ -172,6 +253,8 @@ class PDFProcessorV2:
             "llm_extracted": False,
             "saved_to_db": False,
             "table_detected": False,
+            "ocr_tokens": stage1_result.ocr_tokens,
+            "prompt_tokens": stage1_result.prompt_tokens,
             "error": None
         }
 
@@ -188,8 +271,10 @@ class PDFProcessorV2:
                 raise ProcessingStoppedException("Stopped before LLM")
 
             # Step 3: Extract structured data with LLM
-            logger.info(f"[{document_id}] Stage2: Extracting with LLM")
-            extracted_data = self.llm_service.extract_structured_data(stage1_result.ocr_text)
+            if llm_future is not None:
+                extracted_data = llm_future.result()
+            else:
+                extracted_data = self.extract_structured_data(stage1_result)
 
             if not extracted_data:
                 raise Exception("LLM failed to extract structured data")
@@ -214,6 +299,15 @@ class PDFProcessorV2:
             logger.info(f"[{document_id}] Stage2: Validating data")
             cleaned_data = ValidationService.validate_and_clean_data(extracted_data)
 
+            # Page selection missed the parties: retry once with the full text
+            if stage1_result.full_text and self._missing_parties(cleaned_data):
+                logger.warning(f"[{document_id}] Buyers/sellers missing from selected pages, retrying with full text")
+                full_data = self._extract_text(stage1_result.full_text)
+                result["prompt_tokens"] = (result["prompt_tokens"] or 0) + estimate_tokens(stage1_result.full_text)
+                result["page_selection_fallback"] = True
+                if full_data:
+                    cleaned_data = ValidationService.validate_and_clean_data(full_data)
+
             # DEBUG: Log cleaned property details after validation
             if "property_details" in cleaned_data:
                 logger.info(f"[{document_id}] DEBUG - Cleaned Property Details (after validation):")
@@ -251,10 +345,14 @@ class PDFProcessorV2:
             if self.batch_processor and not self.batch_processor.is_running:
                 raise ProcessingStoppedException("Stopped before YOLO")
 
-            # Step 6: If registration fee not found via pdfplumber, run YOLO detection
+            # Step 6: If registration fee not found via pdfplumber, use YOLO detection
             if not registration_fee:
-                logger.info(f"[{document_id}] Stage2: pdfplumber failed, running YOLO detection")
-                table_detected = self._detect_and_save_table(pdf_path, document_id)
+                if table_future is not None:
+                    logger.info(f"[{document_id}] Stage2: Waiting for table detection stage")
+                    table_detected = self._wait_for_table_stage(table_future, document_id)
+                else:
+                    logger.info(f"[{document_id}] Stage2: pdfplumber failed, running YOLO detection")
+                    table_detected = self._detect_and_save_table(pdf_path, document_id)
                 result["table_detected"] = table_detected
 
                 if table_detected:
@@ -305,44 +403,337 @@ class PDFProcessorV2:
             logger.info(f"[{result['document_id']}] {stopped_ex.message}")
             result["status"] = "stopped"
             result["error"] = stopped_ex.message
+            self._discard_table_crop(table_future, result)
 
         except Exception as e:
             logger.error(f"[{result['document_id']}] Stage 2 failed: {e}")
             result["error"] = str(e)
             result["status"] = "failed"
 
+            # Table stage may still be reading the PDF
+            self._discard_table_crop(table_future, result)
+
             # Move to failed folder
             if stage1_result.pdf_path.exists():
                 FileHandler.move_file(stage1_result.pdf_path, settings.FAILED_DIR)
 
+        self._save_llm_usage(stage1_result, result, db)
         return result
 
-    def _detect_and_save_table(self, pdf_path: Path, document_id: str) -> bool:
-        """Convert PDF to images, detect table with YOLO, and save cropped table"""
+    def _save_llm_usage(self, stage1_result: Stage1Result, result: Dict, db: Session):
+        """Store the document's LLM calls (tokens, latency, cost) and add the summary to the result"""
+        batch_id = self.batch_processor.batch_id if self.batch_processor else None
+        summary = save_document_usage(db, stage1_result.document_id, batch_id, result["status"], stage1_result.usage)
+        if summary:
+            result["llm_usage"] = summary
+            logger.info(
+                f"[{stage1_result.document_id}] LLM usage: {summary['calls']} calls, "
+                f"{summary['prompt_tokens']}+{summary['completion_tokens']} tokens, "
+                f"{summary['llm_seconds']}s, queue {summary['queue_wait_seconds']}s, ${summary['cost']}"
+            )
+
+    @staticmethod
+    def _missing_parties(cleaned_data: Dict) -> bool:
+        """True when no named buyer or no named seller was extracted"""
+        return not (
+            any(buyer.get("name") for buyer in cleaned_data["buyer_details"])
+            and any(seller.get("name") for seller in cleaned_data["seller_details"])
+        )
+
+    def _llm_slot(self):
+        """Adaptive concurrency slot for a blocking LLM call (no-op outside the pipeline)"""
+        controller = self.batch_processor.llm_controller if self.batch_processor else None
+        return controller.slot() if controller is not None else nullcontext()
+
+    def _async_llm_slot(self):
+        """Adaptive concurrency slot for an async LLM call (no-op outside the pipeline)"""
+        controller = self.batch_processor.llm_controller if self.batch_processor else None
+        return controller.async_slot() if controller is not None else nullcontext()
+
+    def _extract_call(self, text: str) -> Optional[Dict]:
+        """
+        One LLM extraction: response cache first, concurrency slot only for a backend call
+
+        Cache hits must not wait behind slow calls or feed the AIMD controller
+        near-zero latencies.
+        """
+        data = self.llm_service.lookup(text)
+        if data is not None:
+            return data
+        with self._llm_slot():
+            return self.llm_service.extract_uncached(text)
+
+    async def _extract_call_async(self, text: str) -> Optional[Dict]:
+        """Async variant of _extract_call()"""
+        data = await self.llm_service.lookup_async(text)
+        if data is not None:
+            return data
+        async with self._async_llm_slot():
+            if self.batch_processor and not self.batch_processor.is_running:
+                return None
+            return await self.llm_service.extract_uncached_async(text)
+
+    def _extract_text(self, text: str) -> Optional[Dict]:
+        """Blocking LLM extraction, chunked for long deeds when ENABLE_CHUNKED_EXTRACTION is on"""
+        if self.chunked_extractor is not None:
+            return self.chunked_extractor.extract(text, extract_window=self._extract_call)
+        return self._extract_call(text)
+
+    def extract_structured_data(self, stage1_result: Stage1Result) -> Optional[Dict]:
+        """
+        Stage 2 LLM call on an LLM worker thread
+
+        Args:
+            stage1_result: Results from Stage 1
+
+        Returns:
+            Extracted data or None if the LLM failed
+        """
+        logger.info(f"[{stage1_result.document_id}] Stage2: Extracting with LLM")
+        return self._extract_text(stage1_result.ocr_text)
+
+    async def extract_structured_data_async(self, stage1_result: Stage1Result) -> Optional[Dict]:
+        """
+        Stage 2 LLM call for the async runner (ENABLE_ASYNC_LLM)
+
+        Args:
+            stage1_result: Results from Stage 1
+
+        Returns:
+            Extracted data or None if the LLM failed
+        """
+        logger.info(f"[{stage1_result.document_id}] Stage2: Extracting with LLM (async)")
+        if self.chunked_extractor is not None:
+            return await self.chunked_extractor.extract_async(
+                stage1_result.ocr_text, extract_window=self._extract_call_async
+            )
+        return await self._extract_call_async(stage1_result.ocr_text)
+
+    def process_table_detection(self, stage1_result: Stage1Result) -> bool:
+        """
+        Table stage: CPU-intensive YOLO detection for PDFs where pdfplumber found no fee
+
+        Runs on its own worker pool, overlapping the Stage 2 LLM call for the same PDF.
+
+        Args:
+            stage1_result: Results from Stage 1
+
+        Returns:
+            True if a table crop was saved for vision processing
+        """
+        logger.info(f"[{stage1_result.document_id}] Table stage: pdfplumber failed, running YOLO detection")
+        return self._detect_and_save_table(stage1_result.pdf_path, stage1_result.document_id)
+
+    def _wait_for_table_stage(self, table_future: Future, document_id: str) -> bool:
+        """Wait for the table stage and return whether a table crop was saved"""
         try:
-            images = self.ocr_service.pdf_to_images(str(pdf_path))
-            logger.info(f"[{document_id}] Converted PDF to {len(images)} images")
+            return bool(table_future.result())
+        except Exception as e:
+            logger.error(f"[{document_id}] Table detection stage error: {e}")
+            return False
 
-            for page_num, image in enumerate(images, start=1):
-                temp_image_path = settings.LEFT_OVER_REG_FEE_DIR / f"temp_{document_id}_page_{page_num}.png"
-                image.save(temp_image_path)
+    def _discard_table_crop(self, table_future: Optional[Future], result: Dict):
+        """Wait for a pending table stage and remove its crop if the document was not saved"""
+        if table_future is None or result["saved_to_db"]:
+            return
 
-                output_image_path = settings.LEFT_OVER_REG_FEE_DIR / f"{document_id}_table.png"
+        document_id = result["document_id"]
+        if self._wait_for_table_stage(table_future, document_id):
+            crop_path = settings.LEFT_OVER_REG_FEE_DIR / f"{document_id}_table.png"
+            if crop_path.exists():
+                crop_path.unlink()
+                logger.info(f"[{document_id}] Removed table crop of unsaved document")
 
-                cropped_table = self.yolo_detector.detect_and_crop(
-                    str(temp_image_path),
-                    str(output_image_path)
-                )
+    def _extract_reg_fee_from_ocr_words(self, pdf_path: Path, document_id: str) -> Optional[float]:
+        """
+        OCR the fee-table pages to word boxes and run the pdfplumber table logic on them
+
+        Only for embedded-OCR mode; the Tesseract Stage 1 pass returns the word boxes itself.
+        """
+        try:
+            total_pages = self.ocr_service.get_page_count(str(pdf_path))
+            page_indices = self.reg_fee_extractor.fee_table_page_indices(total_pages)
+            page_words = self.ocr_service.iter_page_words(str(pdf_path), page_indices)
+            return self.reg_fee_extractor.extract_from_ocr_words(page_words)
+
+        except Exception as e:
+            logger.error(f"[{document_id}] OCR word-box fee extraction error: {e}")
+            return None
+
+    def _table_search_order(self, total_pages: int) -> List[int]:
+        """0-based page indices to search for the fee table: the extractor's page range first, then the rest"""
+        if settings.YOLO_MAX_SEARCH_PAGES > 0:
+            total_pages = min(total_pages, settings.YOLO_MAX_SEARCH_PAGES)
+
+        priority = list(self.reg_fee_extractor.fee_table_page_indices(total_pages))
+        return priority + [i for i in range(total_pages) if i not in priority]
+
+    def _search_table(
+        self,
+        total_pages: int,
+        render_page: Callable[[int], Any]
+    ) -> Tuple[Optional[int], Optional[TableDetection], int, int]:
+        """
+        Search pages for the fee table with YOLO
+
+        Pages are rendered lazily in priority order, a few at a time, and the
+        search stops at the first confident detection. Pages that fail to
+        render or run through the model are skipped and counted as errors.
+
+        Args:
+            total_pages: Number of pages in the PDF
+            render_page: Renders a 0-based page index to an image (None if it fails)
 
-                if temp_image_path.exists():
-                    temp_image_path.unlink()
+        Returns:
+            (page index, detection, pages rendered, page errors); page index and
+            detection are None if not found
+        """
+        search_order = self._table_search_order(total_pages)
+        batch_size = max(1, settings.YOLO_BATCH_SIZE)
+        rendered = 0
+        errors = 0
+
+        for start in range(0, len(search_order), batch_size):
+            pages = []
+            for page_index in search_order[start:start + batch_size]:
+                try:
+                    image = render_page(page_index)
+                except Exception as e:
+                    logger.warning(f"Page {page_index + 1} render failed: {e}")
+                    image = None
+                if image is None:
+                    errors += 1
+                    continue
+                pages.append((page_index, image))
+            rendered += len(pages)
 
-                if cropped_table is not None:
-                    logger.info(f"[{document_id}] Table detected on page {page_num}")
+            try:
+                detections = self.yolo_detector.detect_batch([image for _, image in pages], raise_errors=True)
+            except Exception:
+                errors += len(pages)
+                continue
+
+            for (page_index, _), detection in zip(pages, detections):
+                if detection is not None:
+                    return page_index, detection, rendered, errors
+
+        return None, None, rendered, errors
+
+    def _detection_cache_key(self, pdf_path: Path, document_id: str) -> Optional[Tuple[str, str, str]]:
+        """(PDF hash, model hash, detection params) for the table detection cache, None if disabled"""
+        if self.detection_cache is None:
+            return None
+
+        try:
+            detect_dpi = settings.YOLO_DETECT_DPI if settings.YOLO_TWO_SCALE else settings.POPPLER_DPI
+            params = (
+                f"conf={self.yolo_detector.conf_threshold:.3f};"
+                f"dpi={detect_dpi};pages={settings.YOLO_MAX_SEARCH_PAGES}"
+            )
+            return (
+                file_sha256(pdf_path),
+                self.detection_cache.model_hash(self.yolo_model_path),
+                params
+            )
+        except Exception as e:
+            logger.warning(f"[{document_id}] Table detection cache unavailable: {e}")
+            return None
+
+    def _crop_cached_table(self, pdf_path: Path, cached: CachedTableDetection) -> Optional[Any]:
+        """Re-render only the known table box at POPPLER_DPI"""
+        margin_pt = settings.YOLO_CROP_MARGIN_PT if settings.YOLO_TWO_SCALE else 0.0
+        with self.pymupdf_reader.open_document(str(pdf_path)) as doc:
+            if cached.page_index >= len(doc):
+                return None
+            crop = self.pymupdf_reader.render_points_box(
+                doc[cached.page_index],
+                cached.box_pt,
+                dpi=settings.POPPLER_DPI,
+                margin_pt=margin_pt
+            )
+        return crop if crop.size else None
+
+    def _detect_and_save_table(self, pdf_path: Path, document_id: str) -> bool:
+        """
+        Search pages for the fee table with YOLO and save only the cropped table
+
+        With YOLO_TWO_SCALE, detection runs on cheap low-DPI renders and only the
+        detected box is re-rendered at POPPLER_DPI for the saved crop. Outcomes are
+        cached per PDF content and model, so reprocessed PDFs skip the search.
+        """
+        try:
+            output_image_path = settings.LEFT_OVER_REG_FEE_DIR / f"{document_id}_table.png"
+
+            cache_key = self._detection_cache_key(pdf_path, document_id)
+            cached = self.detection_cache.get(*cache_key) if cache_key else None
+            if cached is not None:
+                if not cached.found:
+                    logger.info(f"[{document_id}] Table detection cache hit: no table, skipping YOLO")
+                    return False
+
+                crop = self._crop_cached_table(pdf_path, cached)
+                if crop is not None:
+                    FileHandler.save_table_image(crop, output_image_path)
+                    logger.info(
+                        f"[{document_id}] Table detection cache hit: re-cropped page "
+                        f"{cached.page_index + 1} (conf={cached.confidence:.2f})"
+                    )
                     return True
+                logger.warning(f"[{document_id}] Cached table box unusable, searching again")
+
+            if settings.YOLO_TWO_SCALE:
+                detect_dpi = settings.YOLO_DETECT_DPI
+                with self.pymupdf_reader.open_document(str(pdf_path)) as doc:
+                    total_pages = len(doc)
+                    page_index, detection, rendered, errors = self._search_table(
+                        total_pages,
+                        lambda i: self.pymupdf_reader.render_page(doc[i], detect_dpi)
+                    )
+                    crop = None
+                    if detection is not None:
+                        crop = self.pymupdf_reader.render_box(
+                            doc[page_index],
+                            detection.box,
+                            detect_dpi=detect_dpi,
+                            crop_dpi=settings.POPPLER_DPI,
+                            margin_pt=settings.YOLO_CROP_MARGIN_PT
+                        )
+            else:
+                detect_dpi = settings.POPPLER_DPI
+                total_pages = self.ocr_service.get_page_count(str(pdf_path))
+                page_index, detection, rendered, errors = self._search_table(
+                    total_pages,
+                    lambda i: self.ocr_service.render_page(str(pdf_path), i + 1)
+                )
+                crop = detection.crop if detection is not None else None
 
-            logger.warning(f"[{document_id}] No table detected in any page")
-            return False
+            # A search with render / inference errors proves nothing: leave it uncached
+            if cache_key and (detection is not None or not errors):
+                if detection is None:
+                    outcome = CachedTableDetection(found=False)
+                else:
+                    scale = 72.0 / detect_dpi
+                    outcome = CachedTableDetection(
+                        found=True,
+                        page_index=page_index,
+                        box_pt=tuple(float(v) * scale for v in detection.box),
+                        confidence=detection.confidence
+                    )
+                self.detection_cache.put(*cache_key, outcome)
+
+            if detection is None:
+                logger.warning(
+                    f"[{document_id}] No table detected in {rendered} searched pages"
+                    + (f" (failed pages: {errors}, not cached)" if errors else "")
+                )
+                return False
+
+            FileHandler.save_table_image(crop, output_image_path)
+            logger.info(
+                f"[{document_id}] Table detected on page {page_index + 1} "
+                f"(conf={detection.confidence:.2f}, rendered {rendered}/{total_pages} pages)"
+            )
+            return True
 
         except Exception as e:
             logger.error(f"[{document_id}] YOLO detection error: {e}")
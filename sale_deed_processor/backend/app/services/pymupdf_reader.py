@@ -6,9 +6,11 @@ For PDFs with high-quality embedded text/OCR
 """
 
 import fitz  # PyMuPDF
+import cv2
+import numpy as np
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -116,3 +118,99 @@ class PyMuPDFReader:
             return result
 
         return self.extract_text(pdf_path)
+
+    def open_document(self, pdf_path: str) -> "fitz.Document":
+        """Open PDF with PyMuPDF (use as a context manager)"""
+        return fitz.open(pdf_path)
+
+    @staticmethod
+    def render_page(page: "fitz.Page", dpi: int, clip: Optional["fitz.Rect"] = None) -> np.ndarray:
+        """
+        Render a page (or a clip of it) to a BGR array
+
+        Args:
+            page: PyMuPDF page
+            dpi: Render resolution
+            clip: Optional area in page coordinates (points)
+
+        Returns:
+            BGR image array
+        """
+        pix = page.get_pixmap(dpi=dpi, clip=clip, alpha=False)
+        img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        if pix.n == 1:
+            return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+    @staticmethod
+    def points_box_to_page_rect(
+        page: "fitz.Page",
+        box_pt: Tuple[float, float, float, float],
+        margin_pt: float = 0.0
+    ) -> "fitz.Rect":
+        """
+        Map a box in points, measured from the page's top-left corner, to page coordinates
+
+        Args:
+            page: PyMuPDF page
+            box_pt: (x1, y1, x2, y2) in points
+            margin_pt: Padding added around the box, in points
+
+        Returns:
+            Rectangle in page coordinates, clipped to the page
+        """
+        origin = page.rect
+        x1, y1, x2, y2 = box_pt
+        rect = fitz.Rect(
+            origin.x0 + x1 - margin_pt,
+            origin.y0 + y1 - margin_pt,
+            origin.x0 + x2 + margin_pt,
+            origin.y0 + y2 + margin_pt
+        )
+        return rect & page.rect
+
+    @classmethod
+    def pixel_box_to_page_rect(
+        cls,
+        page: "fitz.Page",
+        box: Tuple[int, int, int, int],
+        dpi: int,
+        margin_pt: float = 0.0
+    ) -> "fitz.Rect":
+        """
+        Map a pixel box from a full-page render at `dpi` back to page coordinates
+
+        Args:
+            page: PyMuPDF page the box was detected on
+            box: (x1, y1, x2, y2) in pixels of the render
+            dpi: Resolution the page was rendered at
+            margin_pt: Padding added around the box, in points
+
+        Returns:
+            Rectangle in page coordinates, clipped to the page
+        """
+        scale = 72.0 / dpi
+        return cls.points_box_to_page_rect(page, tuple(v * scale for v in box), margin_pt)
+
+    def render_box(
+        self,
+        page: "fitz.Page",
+        box: Tuple[int, int, int, int],
+        detect_dpi: int,
+        crop_dpi: int,
+        margin_pt: float = 0.0
+    ) -> np.ndarray:
+        """Re-render only the area of a box detected on a low-DPI render, at high DPI"""
+        clip = self.pixel_box_to_page_rect(page, box, detect_dpi, margin_pt)
+        return self.render_page(page, crop_dpi, clip=clip)
+
+    def render_points_box(
+        self,
+        page: "fitz.Page",
+        box_pt: Tuple[float, float, float, float],
+        dpi: int,
+        margin_pt: float = 0.0
+    ) -> np.ndarray:
+        """Render only the area of a box given in points (see points_box_to_page_rect)"""
+        clip = self.points_box_to_page_rect(page, box_pt, margin_pt)
+        return self.render_page(page, dpi, clip=clip)
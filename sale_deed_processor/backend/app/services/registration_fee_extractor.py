@@ -3,16 +3,25 @@
 import pdfplumber
 import re
 import os
-from typing import Optional
+from typing import Optional, Iterable, List, Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 class RegistrationFeeExtractor:
+    # The fee table is searched on pages 3-6 (0-based index 2 to 5)
+    FEE_TABLE_START_PAGE = 2
+    FEE_TABLE_PAGE_SPAN = 4
+
     def __init__(self, threshold_pct=0.7, max_misc_fee=4000.0, min_fee=4000.0):
         self.threshold_pct = threshold_pct
         self.max_misc_fee = max_misc_fee
         self.min_fee = min_fee
+
+    def fee_table_page_indices(self, total_pages: int) -> range:
+        """0-based page indices where the registration fee table is expected."""
+        start = self.FEE_TABLE_START_PAGE
+        return range(start, min(total_pages, start + self.FEE_TABLE_PAGE_SPAN))
         
     def validate_table_numbers(self, numbers):
         """Allow 2 to 5 distinct numeric values as valid."""
@@ -31,8 +40,16 @@ class RegistrationFeeExtractor:
 
     def extract_ordered_numbers_from_page(self, page):
         """Extracts numbers and sorts them by vertical position (Top to Bottom)."""
-        words = page.extract_words()
-        
+        return self.extract_ordered_numbers_from_words(page.extract_words())
+
+    def extract_ordered_numbers_from_words(self, words: List[Dict]) -> List[str]:
+        """
+        Extracts currency numbers from word boxes and sorts them Top to Bottom.
+
+        Args:
+            words: Word dicts with at least 'text' and 'top' keys
+                   (pdfplumber extract_words or Tesseract image_to_data rows)
+        """
         currency_re = re.compile(r"^\d{2,7}\.\d{2}$")
         time_re = re.compile(r"\d{1,2}[:.]\d{2}")
 
@@ -135,6 +152,53 @@ class RegistrationFeeExtractor:
 
         return None
 
+    def extract_from_words(self, words: List[Dict]) -> Optional[float]:
+        """Extract registration fee from the word boxes of a single table/page."""
+        numbers = self.extract_ordered_numbers_from_words(words)
+        if not numbers:
+            return None
+
+        is_valid, _ = self.validate_table_numbers(numbers)
+        if not is_valid:
+            return None
+
+        return self.post_process_registration_fee(numbers)
+
+    def _extract_from_page_words(self, page_words: Iterable[Tuple[int, List[Dict]]]) -> Optional[float]:
+        """
+        Walk fee-table pages in order and apply the table validation logic.
+
+        Args:
+            page_words: Iterable of (0-based page index, word dicts). Consumed lazily,
+                        so pages after the one holding the fee are never produced.
+        """
+        for page_num, words in page_words:
+            logger.debug(f"Processing Page {page_num+1} for table extraction.")
+
+            numbers = self.extract_ordered_numbers_from_words(words)
+
+            if not numbers:
+                logger.debug(f"Page {page_num+1} yielded no currency numbers.")
+                continue
+
+            is_valid, try_next = self.validate_table_numbers(numbers)
+
+            if is_valid:
+                reg_fee = self.post_process_registration_fee(numbers)
+
+                if reg_fee is not None:
+                    logger.info(f"Registration Fee extracted from page {page_num+1}: {reg_fee}")
+                    return reg_fee
+                continue
+            elif try_next:
+                logger.debug(f"Page {page_num+1} has too much noise. Trying next page.")
+                continue
+            else:
+                logger.debug(f"Page {page_num+1} invalid data. Stopping.")
+                break
+
+        return None
+
     def extract(self, pdf_path: str) -> Optional[float]:
         """Extract registration fee from PDF."""
         if not os.path.exists(pdf_path):
@@ -143,38 +207,15 @@ class RegistrationFeeExtractor:
 
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                page_num = 2  # Start from page 2 (index 2) like reg_fee_plumber
-                max_page = min(len(pdf.pages), page_num + 4)
-                
-                while page_num < max_page:
-                    page = pdf.pages[page_num]
-                    logger.debug(f"Processing Page {page_num+1} for table extraction.")
-
-                    numbers = self.extract_ordered_numbers_from_page(page)
-                    
-                    if not numbers:
-                        logger.debug(f"Page {page_num+1} yielded no currency numbers.")
-                        page_num += 1
-                        continue
+                # Start from page 2 (index 2) like reg_fee_plumber
+                page_words = (
+                    (page_num, pdf.pages[page_num].extract_words())
+                    for page_num in self.fee_table_page_indices(len(pdf.pages))
+                )
+                reg_fee = self._extract_from_page_words(page_words)
 
-                    is_valid, try_next = self.validate_table_numbers(numbers)
-
-                    if is_valid:
-                        reg_fee = self.post_process_registration_fee(numbers)
-                        
-                        if reg_fee is not None:
-                            logger.info(f"Registration Fee extracted from page {page_num+1}: {reg_fee}")
-                            return reg_fee
-                        else:
-                            page_num += 1
-                            continue
-                    elif try_next:
-                        logger.debug(f"Page {page_num+1} has too much noise. Trying next page.")
-                        page_num += 1
-                        continue
-                    else:
-                        logger.debug(f"Page {page_num+1} invalid data. Stopping.")
-                        break
+            if reg_fee is not None:
+                return reg_fee
 
             logger.warning("Registration fee not found in PDF")
             return None
@@ -183,6 +224,34 @@ class RegistrationFeeExtractor:
             logger.error(f"Error extracting registration fee: {e}")
             return None
 
+    def extract_from_ocr_words(self, page_words: Iterable[Tuple[int, List[Dict]]]) -> Optional[float]:
+        """
+        Extract registration fee from Tesseract word boxes of the fee-table pages.
+
+        Unlike extract_from_ocr_text, this keeps the physical Top to Bottom
+        ordering of the numbers, so the same table logic as the pdfplumber
+        path applies to scanned deeds without a text layer.
+
+        Args:
+            page_words: Iterable of (0-based page index, word dicts with 'text' and 'top')
+
+        Returns:
+            Registration fee or None if not found
+        """
+        try:
+            reg_fee = self._extract_from_page_words(page_words)
+
+            if reg_fee is not None:
+                logger.info(f"OCR word-box Registration Fee found: {reg_fee}")
+                return reg_fee
+
+            logger.debug("No registration fee found in OCR word boxes")
+            return None
+
+        except Exception as e:
+            logger.error(f"Error extracting registration fee from OCR word boxes: {e}")
+            return None
+
     def extract_from_ocr_text(self, ocr_text: str) -> Optional[float]:
         """
         Extract registration fee from OCR text.
@@ -0,0 +1,156 @@
+# backend/app/services/table_detection_cache.py
+
+"""
+Table Detection Cache - Remembers YOLO fee-table search outcomes per document
+
+Entries are keyed by PDF content hash, model file hash and the detection
+parameters, so a reprocessed deed (rerun-failed, after recreate_db.py, after
+an LLM backend change) skips the page search: a known table is re-cropped
+straight from its page, a known "no table" skips detection entirely.
+
+"No table" is only stored after a search in which every page rendered and
+ran through the model cleanly, and it expires after negative_ttl seconds so
+a wrong negative cannot stick forever.
+
+The cache is a small SQLite file next to the data folders rather than a table
+in the main database, so it survives database recreation.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedTableDetection:
+    """Outcome of one fee-table search"""
+    found: bool
+    page_index: Optional[int] = None                               # 0-based
+    box_pt: Optional[Tuple[float, float, float, float]] = None     # PDF points from the page's top-left corner
+    confidence: Optional[float] = None
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TableDetectionCache:
+    """
+    Thread-safe SQLite store of table detection outcomes
+    """
+
+    def __init__(self, db_path: Path, negative_ttl: Optional[float] = None):
+        """
+        Open (or create) the cache
+
+        Args:
+            db_path: SQLite file location
+            negative_ttl: Seconds a "no table" outcome stays valid (None = never expires)
+        """
+        self.db_path = Path(db_path)
+        self.negative_ttl = negative_ttl
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._model_hashes: Dict[Tuple[str, int, float], str] = {}
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS table_detections (
+                pdf_hash TEXT NOT NULL,
+                model_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                found INTEGER NOT NULL,
+                page_index INTEGER,
+                x1 REAL, y1 REAL, x2 REAL, y2 REAL,
+                confidence REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (pdf_hash, model_hash, params)
+            )
+            """
+        )
+        self._conn.commit()
+
+        logger.info(f"Table detection cache opened: {self.db_path}")
+
+    def model_hash(self, model_path: Path) -> str:
+        """Content hash of the model file, computed once per file version"""
+        stat = model_path.stat()
+        key = (str(model_path), stat.st_size, stat.st_mtime)
+
+        with self._lock:
+            cached = self._model_hashes.get(key)
+        if cached is None:
+            cached = file_sha256(model_path)
+            with self._lock:
+                self._model_hashes[key] = cached
+        return cached
+
+    def get(self, pdf_hash: str, model_hash: str, params: str) -> Optional[CachedTableDetection]:
+        """
+        Look up a previous search outcome
+
+        Returns:
+            CachedTableDetection, or None if this document was never searched
+            (or its "no table" outcome has expired)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT found, page_index, x1, y1, x2, y2, confidence, created_at FROM table_detections "
+                "WHERE pdf_hash = ? AND model_hash = ? AND params = ?",
+                (pdf_hash, model_hash, params)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        found, page_index, x1, y1, x2, y2, confidence, created_at = row
+        if not found:
+            if self.negative_ttl is not None and time.time() - created_at > self.negative_ttl:
+                return None
+            return CachedTableDetection(found=False)
+        return CachedTableDetection(
+            found=True,
+            page_index=page_index,
+            box_pt=(x1, y1, x2, y2),
+            confidence=confidence
+        )
+
+    def put(self, pdf_hash: str, model_hash: str, params: str, result: CachedTableDetection):
+        """Store (or replace) a search outcome"""
+        box = result.box_pt if result.found else (None, None, None, None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO table_detections "
+                "(pdf_hash, model_hash, params, found, page_index, x1, y1, x2, y2, confidence, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    pdf_hash, model_hash, params, int(result.found),
+                    result.page_index if result.found else None,
+                    *box,
+                    result.confidence if result.found else None,
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def clear(self) -> int:
+        """Remove all entries, returns the number removed"""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM table_detections").rowcount
+            self._conn.commit()
+        return removed
@@ -1,6 +1,5 @@
 # backend/app/services/vision_service.py
 
-import requests
 import json
 import base64
 from typing import Optional
@@ -8,6 +7,7 @@ from pathlib import Path
 import logging
 from app.config import settings
 from app.utils.prompts import get_vision_registration_fee_prompt
+from app.utils.http_client import get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,7 @@ class VisionService:
         self.base_url = base_url or settings.OLLAMA_BASE_URL
         self.model = model or settings.OLLAMA_VISION_MODEL  # Updated to use new config
         self.api_url = f"{self.base_url}/api/generate"
+        self.session = get_http_session(self.base_url)
 
         logger.info(f"Vision Service initialized: {self.model} at {self.base_url}")
     
@@ -65,7 +66,7 @@ class VisionService:
             
             logger.info(f"Sending image to vision model: {Path(image_path).name}")
             
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 json=payload,
                 timeout=400
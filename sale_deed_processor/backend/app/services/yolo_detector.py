@@ -4,89 +4,492 @@ import cv2
 import numpy as np
 import onnxruntime as ort
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Union
+from dataclasses import dataclass
+from PIL import Image
 import logging
+import threading
+import time
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Model input is a square letterboxed image
+INPUT_SIZE = 640
+LETTERBOX_COLOR = (114, 114, 114)
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def get_yolo_model_path() -> Path:
+    """
+    Model file to load: the INT8 variant when enabled and present, otherwise FP32
+    """
+    if settings.YOLO_USE_INT8:
+        if settings.YOLO_INT8_MODEL_PATH.exists():
+            return settings.YOLO_INT8_MODEL_PATH
+        logger.warning(
+            f"YOLO_USE_INT8 is enabled but {settings.YOLO_INT8_MODEL_PATH} does not exist, "
+            f"using FP32 model"
+        )
+    return settings.YOLO_MODEL_PATH
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    IoU between one box and an array of boxes (x1, y1, x2, y2)
+
+    Args:
+        box: Array of shape (4,)
+        boxes: Array of shape (N, 4)
+
+    Returns:
+        Array of shape (N,) with IoU values
+    """
+    xx1 = np.maximum(box[0], boxes[:, 0])
+    yy1 = np.maximum(box[1], boxes[:, 1])
+    xx2 = np.minimum(box[2], boxes[:, 2])
+    yy2 = np.minimum(box[3], boxes[:, 3])
+
+    inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+    area = max(box[2] - box[0], 0) * max(box[3] - box[1], 0)
+    areas = np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Greedy NMS. Each iteration compares the best remaining box against all
+    others at once, so the Python loop only runs once per kept box.
+
+    Args:
+        boxes: Array of shape (N, 4) in (x1, y1, x2, y2)
+        scores: Array of shape (N,)
+        iou_threshold: Boxes overlapping a kept box above this IoU are dropped
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    order = np.argsort(scores)[::-1]
+    keep = []
+
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        if order.size == 1:
+            break
+
+        rest = order[1:]
+        order = rest[box_iou(boxes[best], boxes[rest]) <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode_predictions(
+    pred: np.ndarray,
+    img_shape: Tuple[int, int],
+    ratio: Tuple,
+    dwdh: Tuple,
+    conf_threshold: float,
+    iou_threshold: float
+) -> np.ndarray:
+    """
+    Decode raw YOLO output for one image into scaled, NMS-filtered boxes
+
+    Args:
+        pred: Raw model output for one image, shape (5, 8400) as (cx, cy, w, h, conf)
+        img_shape: Original image (height, width)
+        ratio: Letterbox ratio
+        dwdh: Letterbox padding (left, top)
+        conf_threshold: Minimum confidence
+        iou_threshold: NMS IoU threshold
+
+    Returns:
+        Array of shape (K, 5) as (x1, y1, x2, y2, conf) in original image pixels,
+        sorted by confidence (highest first). K may be 0.
+    """
+    conf = pred[4]
+    mask = conf >= conf_threshold
+    if not mask.any():
+        return np.empty((0, 5), dtype=np.float32)
+
+    cx, cy, bw, bh = pred[:4, mask]
+    scores = conf[mask]
+
+    boxes = np.stack(
+        [cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2],
+        axis=1
+    )
+
+    keep = non_max_suppression(boxes, scores, iou_threshold)
+    boxes = scale_boxes(img_shape, boxes[keep], ratio, dwdh)
+
+    return np.concatenate([boxes.astype(np.float32), scores[keep, None]], axis=1)
+
+
+def scale_boxes(img_shape: Tuple[int, int], boxes: np.ndarray, ratio: Tuple, dwdh: Tuple) -> np.ndarray:
+    """
+    Scale letterboxed boxes back to original image coordinates
+
+    Args:
+        img_shape: Original image (height, width)
+        boxes: Array of shape (N, 4) in letterbox pixels
+        ratio: Letterbox ratio
+        dwdh: Letterbox padding (left, top)
+
+    Returns:
+        Integer array of shape (N, 4) clipped to the image
+    """
+    h0, w0 = img_shape
+    gain = ratio[0]
+    pad_w, pad_h = dwdh
+
+    scaled = (boxes - np.array([pad_w, pad_h, pad_w, pad_h], dtype=boxes.dtype)) / gain
+    scaled = scaled.astype(np.int64)
+
+    scaled[:, [0, 2]] = np.clip(scaled[:, [0, 2]], 0, w0)
+    scaled[:, [1, 3]] = np.clip(scaled[:, [1, 3]], 0, h0)
+    return scaled
+
+
+def letterbox_into(
+    img: np.ndarray,
+    canvas: np.ndarray,
+    color: Tuple[int, int, int] = LETTERBOX_COLOR
+) -> Tuple[Tuple[float, float], Tuple[int, int]]:
+    """
+    Letterbox an image into a preallocated canvas
+
+    The image is resized straight into the canvas region it occupies, so no
+    resized or padded intermediate is allocated.
+
+    Args:
+        img: BGR image of any size
+        canvas: uint8 array of shape (H, W, 3), overwritten
+        color: Padding color
+
+    Returns:
+        (ratio, (pad_w, pad_h)) to map boxes back to the original image
+    """
+    h, w = img.shape[:2]
+    new_h, new_w = canvas.shape[:2]
+
+    r = min(new_h / h, new_w / w)
+    unpad_w = min(int(round(w * r)), new_w)
+    unpad_h = min(int(round(h * r)), new_h)
+    left = int(round((new_w - unpad_w) / 2))
+    top = int(round((new_h - unpad_h) / 2))
+
+    canvas[:top] = color
+    canvas[top + unpad_h:] = color
+    canvas[top:top + unpad_h, :left] = color
+    canvas[top:top + unpad_h, left + unpad_w:] = color
+
+    cv2.resize(
+        img, (unpad_w, unpad_h),
+        dst=canvas[top:top + unpad_h, left:left + unpad_w],
+        interpolation=cv2.INTER_LINEAR
+    )
+    return (r, r), (left, top)
+
+
+def normalize_into(canvas: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Convert a letterboxed BGR canvas to the model's input layout in place
+
+    BGR->RGB, HWC->CHW and /255 are done by one ufunc over strided views,
+    writing float32 straight into `out`.
+
+    Args:
+        canvas: uint8 array of shape (H, W, 3)
+        out: float32 array of shape (3, H, W), overwritten
+
+    Returns:
+        out
+    """
+    np.divide(canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(255.0), out=out, dtype=np.float32)
+    return out
+
+
+@dataclass
+class TableDetection:
+    """Best table found on one image"""
+    box: Tuple[int, int, int, int]  # (x1, y1, x2, y2) in image pixels
+    confidence: float
+    crop: np.ndarray
+
+
 class YOLOTableDetector:
-    def __init__(self, model_path: str, conf_threshold: float = 0.80):
+    def __init__(self, model_path: str, conf_threshold: float = 0.80, iou_threshold: float = 0.45):
         """
         Initialize YOLO detector with ONNX model
         
         Args:
             model_path: Path to ONNX model file
             conf_threshold: Confidence threshold for detection
+            iou_threshold: IoU threshold for non-max suppression
         """
         self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        # Per-thread preprocessing buffers (the detector is shared by pipeline workers)
+        self._buffers = threading.local()
         
         try:
-            self.session = ort.InferenceSession(
-                model_path,
-                providers=["CPUExecutionProvider"]
-            )
+            self.session = self._load_session(Path(model_path))
             logger.info(f"YOLO model loaded from {model_path}")
         except Exception as e:
             logger.error(f"Failed to load YOLO model: {e}")
             raise
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Dynamic batch exports report a symbolic name (or None) instead of an int
+        self.supports_batch = not isinstance(model_input.shape[0], int)
+        logger.info(f"YOLO batch inference {'enabled' if self.supports_batch else 'disabled (fixed batch dimension)'}")
     
-    def letterbox(self, img: np.ndarray, new_shape=(640, 640), color=(114, 114, 114)):
-        """Resize image with padding (letterbox)"""
-        h, w = img.shape[:2]
-        if isinstance(new_shape, int):
-            new_shape = (new_shape, new_shape)
-
-        r = min(new_shape[0] / h, new_shape[1] / w)
-        new_unpad = (int(round(w * r)), int(round(h * r)))
-
-        dw, dh = new_shape[1] - new_unpad[0], new_shape[0] - new_unpad[1]
-        dw /= 2
-        dh /= 2
-
-        img_resized = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
-        top, bottom = int(round(dh)), int(round(dh))
-        left, right = int(round(dw)), int(round(dw))
-
-        # Ensure final dimensions are exactly new_shape
-        img_padded = cv2.copyMakeBorder(
-            img_resized, top, bottom, left, right,
-            cv2.BORDER_CONSTANT, value=color
+    @staticmethod
+    def _session_options() -> ort.SessionOptions:
+        """Build session options from config (threads, execution mode, memory arena)"""
+        options = ort.SessionOptions()
+
+        # 0 keeps the ONNX Runtime default; small values leave cores for Tesseract
+        if settings.YOLO_INTRA_OP_THREADS > 0:
+            options.intra_op_num_threads = settings.YOLO_INTRA_OP_THREADS
+        if settings.YOLO_INTER_OP_THREADS > 0:
+            options.inter_op_num_threads = settings.YOLO_INTER_OP_THREADS
+
+        if settings.YOLO_EXECUTION_MODE.lower() == "parallel":
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        else:
+            options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        options.enable_cpu_mem_arena = settings.YOLO_ENABLE_MEM_ARENA
+        return options
+
+    @staticmethod
+    def _optimized_model_path(model_path: Path) -> Optional[Path]:
+        """Cache location of the graph-optimized model (None if caching is disabled)"""
+        if not settings.YOLO_CACHE_OPTIMIZED_MODEL:
+            return None
+
+        level = settings.YOLO_GRAPH_OPTIMIZATION.lower()
+        return settings.YOLO_OPTIMIZED_MODEL_DIR / f"{model_path.stem}.{level}.ort{ort.__version__}.onnx"
+
+    def _load_session(self, model_path: Path) -> ort.InferenceSession:
+        """
+        Create the inference session, reusing a cached graph-optimized model when available
+
+        The first start saves the optimized graph via optimized_model_filepath;
+        later starts load it with optimization disabled, skipping that work.
+        """
+        providers = ["CPUExecutionProvider"]
+        optimized_path = self._optimized_model_path(model_path)
+
+        if (
+            optimized_path is not None
+            and optimized_path.exists()
+            and optimized_path.stat().st_mtime >= model_path.stat().st_mtime
+        ):
+            options = self._session_options()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            try:
+                session = ort.InferenceSession(str(optimized_path), options, providers=providers)
+                logger.info(f"Loaded cached optimized YOLO model: {optimized_path.name}")
+                return session
+            except Exception as e:
+                logger.warning(f"Cached optimized YOLO model unusable ({e}), rebuilding")
+
+        options = self._session_options()
+        options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS.get(
+            settings.YOLO_GRAPH_OPTIMIZATION.lower(),
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
         )
+        if optimized_path is not None:
+            optimized_path.parent.mkdir(parents=True, exist_ok=True)
+            options.optimized_model_filepath = str(optimized_path)
 
-        # Final check: ensure exact dimensions (handle rounding edge cases)
-        if img_padded.shape[0] != new_shape[0] or img_padded.shape[1] != new_shape[1]:
-            img_padded = cv2.resize(img_padded, (new_shape[1], new_shape[0]), interpolation=cv2.INTER_LINEAR)
+        return ort.InferenceSession(str(model_path), options, providers=providers)
 
-        return img_padded, (r, r), (left, top)
+    def warmup(self, runs: int = 1) -> float:
+        """
+        Run dummy inferences so the first real page does not pay for lazy initialisation
+
+        Returns:
+            Elapsed time in milliseconds
+        """
+        start = time.perf_counter()
+        dummy = np.zeros((1, 3, 640, 640), dtype=np.float32)
+        for _ in range(runs):
+            self.infer(dummy)
+        return (time.perf_counter() - start) * 1000
+
+    def _canvas(self) -> np.ndarray:
+        """This thread's reusable letterbox canvas"""
+        canvas = getattr(self._buffers, "canvas", None)
+        if canvas is None:
+            canvas = np.empty((INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+            self._buffers.canvas = canvas
+        return canvas
+
+    def _input_buffer(self, batch_size: int) -> np.ndarray:
+        """This thread's reusable (N, 3, 640, 640) float32 input tensor, grown on demand"""
+        inputs = getattr(self._buffers, "inputs", None)
+        if inputs is None or inputs.shape[0] < batch_size:
+            inputs = np.empty((batch_size, 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+            self._buffers.inputs = inputs
+        return inputs[:batch_size]
+
+    def letterbox(self, img: np.ndarray) -> Tuple[np.ndarray, Tuple, Tuple]:
+        """Resize image with padding (letterbox) into this thread's canvas"""
+        canvas = self._canvas()
+        ratio, dwdh = letterbox_into(img, canvas)
+        return canvas, ratio, dwdh
+
+    def _preprocess_into(self, img: np.ndarray, out: np.ndarray) -> Tuple[Tuple, Tuple]:
+        """Letterbox and normalize one image into a (3, 640, 640) slot of the input tensor"""
+        canvas, ratio, dwdh = self.letterbox(img)
+        normalize_into(canvas, out)
+        return ratio, dwdh
 
     def preprocess(self, img: np.ndarray) -> Tuple[np.ndarray, Tuple, Tuple]:
-        """Preprocess image for YOLO inference"""
-        img_lb, ratio, dwdh = self.letterbox(img, (640, 640))
-        img_lb = img_lb[:, :, ::-1] / 255.0
-        img_lb = np.transpose(img_lb, (2, 0, 1)).astype(np.float32)
-        img_lb = np.expand_dims(img_lb, axis=0)
-        return img_lb, ratio, dwdh
-
-    def scale_boxes(self, img_shape: Tuple[int, int], boxes: list, ratio: Tuple, dwdh: Tuple) -> list:
+        """
+        Preprocess image for YOLO inference
+
+        Returns a view of this thread's input buffer, overwritten by the next
+        call; copy it if it must outlive that.
+        """
+        inputs = self._input_buffer(1)
+        ratio, dwdh = self._preprocess_into(img, inputs[0])
+        return inputs, ratio, dwdh
+
+    def scale_boxes(self, img_shape: Tuple[int, int], boxes: np.ndarray, ratio: Tuple, dwdh: Tuple) -> np.ndarray:
         """Scale boxes back to original image coordinates"""
-        h0, w0 = img_shape
-        gain = ratio[0]
-        pad_w, pad_h = dwdh
+        return scale_boxes(img_shape, boxes, ratio, dwdh)
+
+    def decode(self, pred: np.ndarray, img_shape: Tuple[int, int], ratio: Tuple, dwdh: Tuple) -> np.ndarray:
+        """Decode raw output (5, 8400) of one image into (K, 5) boxes, best first"""
+        return decode_predictions(pred, img_shape, ratio, dwdh, self.conf_threshold, self.iou_threshold)
+
+    def infer(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Run the model on a preprocessed batch
+
+        Args:
+            inputs: Array of shape (N, 3, 640, 640)
+
+        Returns:
+            Raw output of shape (N, 5, 8400)
+        """
+        if self.supports_batch or len(inputs) == 1:
+            try:
+                return self.session.run(None, {self.input_name: inputs})[0]
+            except Exception as e:
+                if len(inputs) == 1:
+                    raise
+                logger.warning(f"Batched YOLO inference failed ({e}), falling back to per-page runs")
+                self.supports_batch = False
+
+        return np.concatenate(
+            [self.session.run(None, {self.input_name: inputs[i:i + 1]})[0] for i in range(len(inputs))],
+            axis=0
+        )
+
+    def _best_detection(self, img: np.ndarray, det_boxes: np.ndarray) -> Optional[TableDetection]:
+        """Crop the highest confidence box (det_boxes is sorted best first)"""
+        for x1, y1, x2, y2, conf in det_boxes:
+            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+            # Boxes clipped to nothing at the page edge cannot be cropped
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            return TableDetection(
+                box=(x1, y1, x2, y2),
+                confidence=float(conf),
+                crop=img[y1:y2, x1:x2]
+            )
+
+        return None
+
+    @staticmethod
+    def to_bgr(image: Union[np.ndarray, Image.Image]) -> np.ndarray:
+        """Convert a PIL image (RGB) to a BGR array; arrays are assumed BGR already"""
+        if isinstance(image, Image.Image):
+            return cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+        return image
+
+    def detect_all(self, image: Union[np.ndarray, Image.Image]) -> np.ndarray:
+        """
+        All boxes on one image after NMS
+
+        Returns:
+            Array of shape (K, 5) as (x1, y1, x2, y2, conf), best first
+        """
+        img = self.to_bgr(image)
+        inp, ratio, dwdh = self.preprocess(img)
+        pred = self.infer(inp)
+        return self.decode(pred[0], img.shape[:2], ratio, dwdh)
+
+    def detect(self, image: Union[np.ndarray, Image.Image]) -> Optional[TableDetection]:
+        """
+        Detect table in an in-memory image
+
+        Args:
+            image: BGR numpy array or PIL image
+
+        Returns:
+            TableDetection with box, confidence and crop, or None if no detection
+        """
+        return self.detect_batch([image])[0]
+
+    def detect_batch(
+        self,
+        images: List[Union[np.ndarray, Image.Image]],
+        raise_errors: bool = False
+    ) -> List[Optional[TableDetection]]:
+        """
+        Detect tables on several pages with a single session run
 
-        corrected = []
-        for x1, y1, x2, y2, conf in boxes:
-            x1 = (x1 - pad_w) / gain
-            y1 = (y1 - pad_h) / gain
-            x2 = (x2 - pad_w) / gain
-            y2 = (y2 - pad_h) / gain
+        Pages are letterboxed into one (N, 3, 640, 640) tensor. Models exported
+        with a fixed batch dimension are run page by page instead.
 
-            x1 = max(0, min(int(x1), w0))
-            y1 = max(0, min(int(y1), h0))
-            x2 = max(0, min(int(x2), w0))
-            y2 = max(0, min(int(y2), h0))
+        Args:
+            images: BGR numpy arrays or PIL images
+            raise_errors: Re-raise inference errors instead of reporting "no table"
+                for every page (callers that must tell failure from absence)
+
+        Returns:
+            One TableDetection (or None) per input image, in input order
+        """
+        if not images:
+            return []
+
+        images = [self.to_bgr(img) for img in images]
+
+        inputs = self._input_buffer(len(images))
+        ratios, pads = [], []
+        for img, slot in zip(images, inputs):
+            ratio, dwdh = self._preprocess_into(img, slot)
+            ratios.append(ratio)
+            pads.append(dwdh)
+
+        try:
+            preds = self.infer(inputs)
+        except Exception as e:
+            logger.error(f"YOLO inference error: {e}")
+            if raise_errors:
+                raise
+            return [None] * len(images)
 
-            corrected.append([x1, y1, x2, y2, conf])
-        return corrected
+        return [
+            self._best_detection(img, self.decode(pred, img.shape[:2], ratio, dwdh))
+            for img, pred, ratio, dwdh in zip(images, preds, ratios, pads)
+        ]
 
     def detect_and_crop(self, image_path: str, output_path: str) -> Optional[np.ndarray]:
         """
@@ -103,47 +506,18 @@ class YOLOTableDetector:
         if img is None:
             logger.error(f"Could not read image: {image_path}")
             return None
-            
-        h, w = img.shape[:2]
-
-        # Preprocess
-        inp, ratio, dwdh = self.preprocess(img)
-
-        # Inference
-        try:
-            pred = self.session.run(None, {"images": inp})[0]  # (1,5,8400)
-            pred = pred[0].T  # -> (8400, 5)
-        except Exception as e:
-            logger.error(f"YOLO inference error: {e}")
-            return None
-
-        # Collect boxes
-        det_boxes = []
-        for cx, cy, bw, bh, conf in pred:
-            if conf < self.conf_threshold:
-                continue
 
-            x1 = cx - bw / 2
-            y1 = cy - bh / 2
-            x2 = cx + bw / 2
-            y2 = cy + bh / 2
-            det_boxes.append([x1, y1, x2, y2, conf])
+        detection = self.detect(img)
 
-        if not det_boxes:
+        if detection is None:
             logger.info(f"No table detected in {Path(image_path).name}")
             return None
 
-        # Scale to original coordinates
-        det_boxes = self.scale_boxes((h, w), det_boxes, ratio, dwdh)
-
-        # Choose highest confidence box
-        x1, y1, x2, y2, conf = sorted(det_boxes, key=lambda x: x[4], reverse=True)[0]
-
-        # Crop
-        crop = img[y1:y2, x1:x2]
-
         # Save output
-        cv2.imwrite(output_path, crop)
-        logger.info(f"Table detected and cropped: {Path(image_path).name} -> {Path(output_path).name} (conf={conf:.2f})")
+        cv2.imwrite(output_path, detection.crop)
+        logger.info(
+            f"Table detected and cropped: {Path(image_path).name} -> {Path(output_path).name} "
+            f"(conf={detection.confidence:.2f})"
+        )
 
-        return crop
\ No newline at end of file
+        return detection.crop
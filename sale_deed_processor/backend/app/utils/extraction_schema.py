@@ -0,0 +1,107 @@
+# backend/app/utils/extraction_schema.py
+
+"""
+Extraction JSON Schema - Constrained decoding for the sale deed extraction
+
+Backends used to be asked only for "a JSON object", so a model could add
+keys, nest fields wrongly or run out of tokens mid-string, and a failed
+json.loads failed the whole document. The schema derived here is passed to
+each backend's guided decoding, so only output of the extraction structure
+can be generated:
+
+- vLLM / llama.cpp: response_format json_schema (vLLM guided decoding,
+  llama.cpp converts it to a GBNF grammar)
+- Ollama: the schema as "format"
+- Gemini: response_schema (OpenAPI subset: "nullable" instead of null types)
+
+The schema is built from the JSON structure in the extraction prompt, so the
+prompt stays the single definition of the fields.
+"""
+
+import json
+from functools import lru_cache
+from typing import Dict
+
+from app.utils.prompts import get_sale_deed_extraction_prompt
+
+SCHEMA_NAME = "sale_deed_extraction"
+
+# Placeholder types used in the prompt's structure
+PLACEHOLDER_TYPES = {
+    "string": "string",
+    "float": "number",
+    "int": "integer",
+    "integer": "integer",
+    "number": "number",
+    "boolean": "boolean",
+}
+
+
+def _prompt_structure() -> Dict:
+    """The example JSON structure at the end of the extraction prompt"""
+    prompt = get_sale_deed_extraction_prompt()
+    return json.loads(prompt[prompt.rindex("\n{\n") + 1:])
+
+
+def _placeholder_type(placeholder: str) -> str:
+    """'float or null' -> 'number'"""
+    name = placeholder.split(" or ")[0].strip().lower()
+    try:
+        return PLACEHOLDER_TYPES[name]
+    except KeyError:
+        raise ValueError(f"Unknown placeholder type '{placeholder}' in extraction prompt") from None
+
+
+def _to_schema(example, nullable_style: bool) -> Dict:
+    """JSON schema of one node of the prompt structure (Gemini style: upper-case types, nullable)"""
+    if isinstance(example, dict):
+        schema = {
+            "type": "OBJECT" if nullable_style else "object",
+            "properties": {key: _to_schema(value, nullable_style) for key, value in example.items()},
+            "required": list(example)
+        }
+        if not nullable_style:
+            schema["additionalProperties"] = False
+        return schema
+
+    if isinstance(example, list):
+        return {"type": "ARRAY" if nullable_style else "array", "items": _to_schema(example[0], nullable_style)}
+
+    value_type = _placeholder_type(example)
+    if nullable_style:
+        value_type = value_type.upper()
+        return {"type": value_type, "nullable": True} if "null" in example else {"type": value_type}
+    return {"type": [value_type, "null"]} if "null" in example else {"type": value_type}
+
+
+@lru_cache(maxsize=None)
+def _cached_schema(nullable_style: bool) -> str:
+    return json.dumps(_to_schema(_prompt_structure(), nullable_style))
+
+
+def get_extraction_json_schema() -> Dict:
+    """
+    Standard JSON schema of the extraction result (vLLM, llama.cpp, Ollama)
+
+    Nullable fields use type unions (["string", "null"]); objects forbid
+    additional properties.
+    """
+    return json.loads(_cached_schema(False))
+
+
+def get_extraction_response_schema() -> Dict:
+    """
+    Gemini response_schema of the extraction result
+
+    Gemini takes an OpenAPI schema subset: upper-case type names,
+    "nullable": true instead of type unions and no additionalProperties.
+    """
+    return json.loads(_cached_schema(True))
+
+
+def build_json_schema_response_format() -> Dict:
+    """OpenAI-style response_format requesting schema-constrained output"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": SCHEMA_NAME, "strict": True, "schema": get_extraction_json_schema()}
+    }
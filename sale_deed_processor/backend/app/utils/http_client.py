@@ -0,0 +1,153 @@
+# backend/app/utils/http_client.py
+
+"""
+Shared HTTP sessions for the self-hosted backends (Ollama, llama.cpp, vLLM)
+
+One requests.Session per base URL, reused by all worker threads, so requests
+to a backend go over keep-alive connections instead of a new TCP connection
+per extraction. The connection pool is sized to the LLM worker count and
+connection errors / 502-504 responses are retried with backoff.
+
+Async httpx clients serve the same purpose for the event-loop LLM stage
+(ENABLE_ASYNC_LLM).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import settings
+from app.exceptions import LLMBackendError
+
+logger = logging.getLogger(__name__)
+
+# Transport failures (timeouts, refused/reset connections) of either client
+TRANSPORT_ERRORS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError, httpx.TransportError)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), None if absent/invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def raise_for_backend_status(response, backend: str):
+    """
+    Raise LLMBackendError for a non-200 response (requests or httpx)
+
+    Args:
+        response: HTTP response
+        backend: Backend name for the error message
+    """
+    if response.status_code == 200:
+        return
+    raise LLMBackendError(
+        f"{backend} API error: {response.status_code}",
+        status_code=response.status_code,
+        retry_after=parse_retry_after(response.headers.get("Retry-After"))
+    )
+
+
+def _build_session() -> requests.Session:
+    """Session with a pooled, retrying adapter"""
+    retries = settings.HTTP_MAX_RETRIES
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,  # Never resend a request whose response timed out (generation may take minutes)
+        status=retries,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        raise_on_status=False
+    )
+
+    pool_size = settings.HTTP_POOL_MAXSIZE or settings.MAX_LLM_WORKERS
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session(base_url: str) -> requests.Session:
+    """
+    Shared session for a backend base URL
+
+    Args:
+        base_url: Backend base URL (one pool per URL)
+
+    Returns:
+        Thread-safe pooled requests.Session
+    """
+    key = base_url.rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session()
+            _sessions[key] = session
+            logger.info(f"HTTP session pool created for {key}")
+        return session
+
+
+def close_http_sessions():
+    """Close all pooled connections (called on shutdown)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+# Async clients for the event-loop LLM stage. httpx clients are bound to the
+# event loop that first uses them, so they are kept per (loop, base URL).
+_async_clients: Dict[Tuple[int, str], httpx.AsyncClient] = {}
+
+
+def get_async_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Shared async client for a backend base URL on the running event loop
+
+    Must be called from a coroutine. The pool is sized to
+    ASYNC_LLM_MAX_CONCURRENCY; connection errors are retried.
+    """
+    loop = asyncio.get_running_loop()
+    key = (id(loop), base_url.rstrip("/"))
+    client = _async_clients.get(key)
+    if client is None:
+        limits = httpx.Limits(
+            max_connections=settings.ASYNC_LLM_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.ASYNC_LLM_MAX_CONCURRENCY
+        )
+        transport = httpx.AsyncHTTPTransport(retries=settings.HTTP_MAX_RETRIES, limits=limits)
+        client = httpx.AsyncClient(transport=transport, timeout=settings.LLM_TIMEOUT)
+        _async_clients[key] = client
+        logger.info(f"Async HTTP client created for {key[1]}")
+    return client
+
+
+async def close_async_http_clients():
+    """Close the async clients of the running event loop"""
+    loop_id = id(asyncio.get_running_loop())
+    for key in [k for k in _async_clients if k[0] == loop_id]:
+        await _async_clients.pop(key).aclose()
@@ -0,0 +1,193 @@
+# backend/app/utils/llm_usage.py
+
+"""
+LLM Usage Accounting - Tokens, latency and cost of every LLM call
+
+Each backend wraps every request attempt in track_llm_call(), filling in
+the token counts its response reports (Gemini usage_metadata, OpenAI-style
+usage, Ollama prompt_eval_count / eval_count). The call is added to the
+UsageRecorder active in the current context: the pipeline opens one per
+document (recording_usage), so retries, fallbacks, chunk windows and hedged
+requests all end up on the document that caused them.
+
+Helper threads do not inherit context variables; functions handed to an
+executor are wrapped with bind_context() so their calls are still attributed.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.exceptions import LLMBackendError
+from app.utils.http_client import TRANSPORT_ERRORS
+
+BATCH_SUFFIX = "-batch"  # Backend name suffix of calls made through a batch API
+
+
+@dataclass
+class LLMCallUsage:
+    """One LLM request attempt"""
+    backend: str
+    model: str
+    started_at: float                        # time.monotonic() when the request was sent
+    latency_seconds: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None      # Prompt tokens served from a prefix / context cache
+    status: str = "ok"                       # ok, error, invalid (unusable answer), cancelled, cache_hit
+
+    def set_tokens(self, prompt: Optional[int], completion: Optional[int], cached: Optional[int] = None):
+        self.prompt_tokens = prompt
+        self.completion_tokens = completion
+        self.cached_tokens = cached
+
+    @property
+    def cost(self) -> float:
+        return estimate_cost(self.backend, self.prompt_tokens or 0, self.completion_tokens or 0)
+
+
+def estimate_cost(backend: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Cost in USD from <BACKEND>_INPUT_PRICE_PER_M / _OUTPUT_PRICE_PER_M
+
+    Backends without prices (local servers) cost 0. Batch calls are billed
+    at BULK_BATCH_PRICE_FACTOR of the interactive price.
+    """
+    factor = 1.0
+    if backend.endswith(BATCH_SUFFIX):
+        backend = backend[:-len(BATCH_SUFFIX)]
+        factor = settings.BULK_BATCH_PRICE_FACTOR
+    prefix = backend.upper()
+    input_price = getattr(settings, f"{prefix}_INPUT_PRICE_PER_M", 0.0)
+    output_price = getattr(settings, f"{prefix}_OUTPUT_PRICE_PER_M", 0.0)
+    return factor * (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
+
+
+class UsageRecorder:
+    """
+    LLM calls made for one document
+    """
+
+    def __init__(self, ready_at: float = None):
+        """
+        Args:
+            ready_at: time.monotonic() when the document became ready for the
+                LLM (end of Stage 1); the gap to the first call is its queue wait
+        """
+        self.ready_at = ready_at if ready_at is not None else time.monotonic()
+        self._calls: List[LLMCallUsage] = []
+        self._lock = threading.Lock()
+
+    def add(self, call: LLMCallUsage):
+        with self._lock:
+            self._calls.append(call)
+
+    @property
+    def calls(self) -> List[LLMCallUsage]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self) -> Dict:
+        """Totals over all calls"""
+        calls = [call for call in self.calls if call.status != "cache_hit"]
+        first_start = min((call.started_at for call in self.calls), default=None)
+        return {
+            "calls": len(calls),
+            "failed_calls": sum(1 for call in calls if call.status != "ok"),
+            "cache_hits": sum(1 for call in self.calls if call.status == "cache_hit"),
+            "prompt_tokens": sum(call.prompt_tokens or 0 for call in calls),
+            "completion_tokens": sum(call.completion_tokens or 0 for call in calls),
+            "cached_tokens": sum(call.cached_tokens or 0 for call in calls),
+            "llm_seconds": round(sum(call.latency_seconds for call in calls), 3),
+            "queue_wait_seconds": round(max(0.0, first_start - self.ready_at), 3) if first_start is not None else None,
+            "cost": round(sum(call.cost for call in calls), 6),
+            "backends": sorted({call.backend for call in self.calls}),
+            "models": sorted({call.model for call in self.calls if call.model}),
+        }
+
+    def details(self) -> List[Dict]:
+        """Per-call records (start times relative to ready_at)"""
+        records = []
+        for call in self.calls:
+            record = asdict(call)
+            record["started_at"] = round(call.started_at - self.ready_at, 3)
+            record["latency_seconds"] = round(call.latency_seconds, 3)
+            records.append(record)
+        return records
+
+
+USAGE_TOTAL_KEYS = (
+    "calls", "failed_calls", "cache_hits", "prompt_tokens", "completion_tokens",
+    "cached_tokens", "llm_seconds", "queue_wait_seconds", "cost",
+)
+
+
+def empty_usage_totals() -> Dict:
+    """Running totals for a batch (see add_usage_totals)"""
+    return {"documents": 0, **{key: 0 for key in USAGE_TOTAL_KEYS}}
+
+
+def add_usage_totals(totals: Dict, summary: Optional[Dict]):
+    """Add one document's UsageRecorder.summary() to batch totals"""
+    if not summary:
+        return
+    totals["documents"] += 1
+    for key in USAGE_TOTAL_KEYS:
+        totals[key] = round(totals[key] + (summary.get(key) or 0), 6)
+
+
+_current_recorder: contextvars.ContextVar[Optional[UsageRecorder]] = contextvars.ContextVar(
+    "llm_usage_recorder", default=None
+)
+
+
+@contextmanager
+def recording_usage(recorder: Optional[UsageRecorder]) -> Iterator[Optional[UsageRecorder]]:
+    """Attribute LLM calls made in this context to `recorder`"""
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def record_call(call: LLMCallUsage):
+    """Add a finished call to the active recorder (no-op outside a document)"""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add(call)
+
+
+@contextmanager
+def track_llm_call(backend: str, model: str) -> Iterator[LLMCallUsage]:
+    """
+    Time one request attempt and record it
+
+    The caller sets the token counts from the response with call.set_tokens().
+    Backend/transport failures are recorded as "error", other exceptions
+    (e.g. unparsable answers) as "invalid".
+    """
+    call = LLMCallUsage(backend=backend, model=model, started_at=time.monotonic())
+    try:
+        yield call
+    except BaseException as e:
+        if isinstance(e, (LLMBackendError,) + TRANSPORT_ERRORS):
+            call.status = "error"
+        elif isinstance(e, Exception):
+            call.status = "invalid"
+        else:
+            call.status = "cancelled"
+        raise
+    finally:
+        call.latency_seconds = time.monotonic() - call.started_at
+        record_call(call)
+
+
+def bind_context(fn: Callable) -> Callable:
+    """fn wrapped to run in a copy of the caller's context (for executor threads)"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
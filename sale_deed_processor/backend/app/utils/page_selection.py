@@ -0,0 +1,115 @@
+# backend/app/utils/page_selection.py
+
+"""
+Relevant-Page Selection - Send only the pages that carry the extracted fields
+
+Parties, schedules B/C, consideration and stamp duty usually sit on a handful
+of a deed's pages; the rest is recitals, boilerplate and annexures. Each page
+is scored by keyword/pattern hits (English and Kannada) for the fields in the
+extraction prompt, and the best pages are kept in document order up to a
+token budget. The first page (parties, date) is always kept.
+
+Selection needs page markers ("--- Page N ---"), so text without them (for
+example PyMuPDF embedded text) is sent whole. If the answer from the
+selected pages is missing buyers or sellers, Stage 2 retries with the full
+text.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.utils.rate_limiter import estimate_tokens
+from app.utils.text_compaction import split_pages
+
+# (pattern, weight); hits per pattern are capped so one long list cannot dominate
+PAGE_PATTERNS = [
+    # Parties
+    (re.compile(r"\b(?:vendor|seller|purchaser|buyer|executant|claimant)s?\b", re.I), 2.0),
+    (re.compile(r"\b(?:[SDWC]/o|son of|daughter of|wife of|aged about)\b", re.I), 2.0),
+    (re.compile(r"ಖರೀದಿದಾರ|ಮಾರಾಟಗಾರ|ಕ್ರಯದಾರ|ಬರೆದುಕೊಡುವವರ|ಬರೆಸಿಕೊಳ್ಳುವವರ"), 2.0),
+    (re.compile(r"\b[A-Z]{5}\d{4}[A-Z]\b"), 3.0),                 # PAN
+    (re.compile(r"\b\d{4}\s?\d{4}\s?\d{4}\b"), 3.0),               # Aadhaar
+    (re.compile(r"\b(?:pan|aadha?ar|uid)\b|ಆಧಾರ್", re.I), 2.0),
+    # Property schedules
+    (re.compile(r"\bschedule\b|ಷೆಡ್ಯೂಲ್|ಅನುಸೂಚಿ", re.I), 3.0),
+    (re.compile(r"\b(?:sy\.?|survey)\s*no|ಸರ್ವೆ\s*ನಂ", re.I), 2.0),
+    (re.compile(r"\b(?:sq\.?\s*(?:ft|feet|mtrs?|meters?)|square\s+(?:feet|meters?)|acres?|guntas?)\b|ಚದರ", re.I), 2.0),
+    (re.compile(r"\b(?:apartment|flat|plot|site|khata)\s*no\b|\bbounded\s+(?:on|by)\b", re.I), 1.5),
+    (re.compile(r"\b\d{6}\b"), 0.5),                               # Pincode
+    # Consideration and fees
+    (re.compile(r"\bconsideration\b|\bsale\s+price\b|ಕ್ರಯದ\s*ಹಣ", re.I), 3.0),
+    (re.compile(r"\bstamp\s+duty\b|ಮುದ್ರಾಂಕ\s*ಶುಲ್ಕ", re.I), 3.0),
+    (re.compile(r"\bregistration\s+fee\b|ನೋಂದಣಿ\s*ಶುಲ್ಕ|ನೊಂದಣಿ", re.I), 3.0),
+    (re.compile(r"\bRs\.?\s*[\d,]+|₹\s*[\d,]+", re.I), 1.0),
+    (re.compile(r"\bcash\b", re.I), 1.0),
+    # Document details
+    (re.compile(r"\bsub[-\s]?registrar\b|ಉಪ\s*ನೋಂದಣಾಧಿಕಾರಿ", re.I), 1.5),
+]
+MAX_HITS_PER_PATTERN = 5
+
+
+@dataclass
+class PageSelection:
+    """Text to send to the LLM and which pages it contains"""
+    text: str
+    applied: bool                    # False when the full text is sent
+    total_pages: int
+    selected_pages: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+
+def score_page(text: str) -> float:
+    """Relevance of one page to the extraction fields"""
+    return sum(
+        weight * min(len(pattern.findall(text)), MAX_HITS_PER_PATTERN)
+        for pattern, weight in PAGE_PATTERNS
+    )
+
+
+def _page_text(label: Optional[str], body: str) -> str:
+    body = body.strip()
+    return f"--- Page {label} ---\n\n{body}" if label is not None else body
+
+
+def select_relevant_pages(text: str, token_budget: int) -> PageSelection:
+    """
+    Keep the highest-scoring pages within a token budget
+
+    Args:
+        text: OCR text with page markers
+        token_budget: Max estimated tokens of the selected pages
+
+    Returns:
+        PageSelection (the full text when it already fits or cannot be split)
+    """
+    pages = [(label, body) for label, body in split_pages(text) if body.strip()]
+    full_tokens = estimate_tokens(text)
+    labelled = [label for label, _ in pages if label is not None]
+
+    if full_tokens <= token_budget or len(labelled) < 2:
+        return PageSelection(text=text, applied=False, total_pages=len(pages), tokens=full_tokens)
+
+    page_texts = [_page_text(label, body) for label, body in pages]
+    page_tokens = [estimate_tokens(page) for page in page_texts]
+    scores = [score_page(body) for _, body in pages]
+
+    # First page always, then by score (earlier page wins ties)
+    order = sorted(range(1, len(pages)), key=lambda i: (-scores[i], i))
+    chosen = {0}
+    used = page_tokens[0]
+    for i in order:
+        if scores[i] <= 0:
+            break
+        if used + page_tokens[i] <= token_budget:
+            chosen.add(i)
+            used += page_tokens[i]
+
+    selected = sorted(chosen)
+    return PageSelection(
+        text="\n\n".join(page_texts[i] for i in selected),
+        applied=True,
+        total_pages=len(pages),
+        selected_pages=[pages[i][0] for i in selected],
+        tokens=used
+    )
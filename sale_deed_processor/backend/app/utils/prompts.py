@@ -1,5 +1,18 @@
 # backend/app/utils/prompts.py
 
+import hashlib
+from typing import Dict, List
+
+# Per-document part of the extraction prompt. The instruction block from
+# get_sale_deed_extraction_prompt() always comes first and byte-identical
+# (system message / system instruction), so servers can reuse its KV cache
+# (llama.cpp cache_prompt, vLLM prefix caching, Ollama, Gemini context caching).
+EXTRACTION_USER_TEMPLATE = (
+    "Here is the complete OCR text from the document:\n\n{ocr_text}\n\n"
+    "Extract the data and return ONLY valid JSON:"
+)
+
+
 def get_sale_deed_extraction_prompt() -> str:
     """
     Returns the system prompt for sale deed data extraction
@@ -92,6 +105,32 @@ Return *ONLY valid JSON* in this exact structure:
 }"""
 
 
+def build_extraction_user_message(ocr_text: str) -> str:
+    """
+    Document-specific message that follows the fixed instruction block
+    """
+    return EXTRACTION_USER_TEMPLATE.format(ocr_text=ocr_text)
+
+
+def build_extraction_messages(ocr_text: str) -> List[Dict[str, str]]:
+    """
+    Chat messages for sale deed extraction: the instruction block as the
+    system message (identical on every call), then the OCR text
+    """
+    return [
+        {"role": "system", "content": get_sale_deed_extraction_prompt()},
+        {"role": "user", "content": build_extraction_user_message(ocr_text)},
+    ]
+
+
+def get_sale_deed_prompt_version() -> str:
+    """
+    Short hash of the extraction prompt, changes whenever the prompt text changes
+    """
+    prompt = get_sale_deed_extraction_prompt() + EXTRACTION_USER_TEMPLATE
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
 def get_vision_registration_fee_prompt() -> str:
     """
     Returns the prompt for vision model to extract registration fee from table images
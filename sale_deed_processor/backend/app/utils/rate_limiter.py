@@ -0,0 +1,236 @@
+# backend/app/utils/rate_limiter.py
+
+"""
+Per-backend rate limiting for the hosted LLM APIs (Gemini, Groq)
+
+Each backend gets one limiter shared by all workers (threads and the async
+LLM stage) with two token buckets: requests per minute and tokens per minute.
+A request reserves its share up front and waits until the bucket covers it,
+so requests beyond the quota queue instead of failing with 429.
+
+429/503 responses that still happen (quota shared with other clients, server
+overload) are retried with jittered exponential backoff; a Retry-After hint
+from the server replaces the computed delay. Each retried response is also
+passed to the listener active in the calling context (reporting_retries), so
+the adaptive concurrency controller sees every overload signal, not only the
+final failure.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from app.config import settings
+from app.exceptions import LLMBackendError
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 503)
+
+_retry_listener: contextvars.ContextVar[Optional[Callable[[LLMBackendError], None]]] = contextvars.ContextVar(
+    "rate_limit_retry_listener", default=None
+)
+
+
+@contextmanager
+def reporting_retries(listener: Callable[[LLMBackendError], None]) -> Iterator[None]:
+    """Pass every retried 429/503 in this context to listener"""
+    token = _retry_listener.set(listener)
+    try:
+        yield
+    finally:
+        _retry_listener.reset(token)
+
+
+def _report_retry(error: LLMBackendError):
+    listener = _retry_listener.get()
+    if listener is not None:
+        listener(error)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for quota accounting (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate
+    """
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: Refill rate; also the bucket capacity (one minute of burst)
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount from the bucket, going into debt if needed
+
+        Later callers queue behind the debt, so waiters are served in order.
+
+        Returns:
+            Seconds to wait before the reserved amount is actually available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, amount: float):
+        """Correct a reservation (positive amount takes more, negative gives back)"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class BackendRateLimiter:
+    """
+    RPM/TPM limits and 429/503 retry policy for one LLM backend
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 0,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        """
+        Args:
+            backend: Backend name for logging
+            requests_per_minute: Request quota (0 = unlimited)
+            tokens_per_minute: Token quota (0 = unlimited)
+            max_retries: Retries of a 429/503 response
+            base_delay: First backoff delay in seconds (doubles per attempt)
+            max_delay: Cap for one backoff or Retry-After wait
+        """
+        self.backend = backend
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve one request and its tokens, returns the wait in seconds"""
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            logger.info(f"{self.backend} rate limit: request queued for {wait:.1f}s")
+        return wait
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Replace the token estimate with the usage reported by the API"""
+        if self.tokens is not None and actual_tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number attempt + 1
+
+        Uses the server's Retry-After when given (plus a little jitter so
+        waiting workers do not retry in lockstep), otherwise exponential
+        backoff with equal jitter.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay) + random.uniform(0, self.base_delay)
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _should_retry(self, error: LLMBackendError, attempt: int) -> bool:
+        return error.status_code in RETRY_STATUS_CODES and attempt < self.max_retries
+
+    def call(self, fn: Callable[..., Any], *args, tokens: int = 0) -> Any:
+        """
+        Run a blocking API call within the quota, retrying 429/503 responses
+
+        Args:
+            fn: Function performing the request; raises LLMBackendError on failure
+            *args: Its arguments
+            tokens: Estimated tokens the request consumes
+
+        Returns:
+            fn's result
+        """
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait:
+                time.sleep(wait)
+            try:
+                return fn(*args)
+            except LLMBackendError as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                _report_retry(e)
+                delay = self.backoff_delay(attempt, e.retry_after)
+                attempt += 1
+                logger.warning(
+                    f"{self.backend} returned {e.status_code}, retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    async def call_async(self, coro_fn: Callable[..., Awaitable], *args, tokens: int = 0) -> Any:
+        """Async variant of call() for the event-loop LLM stage"""
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                return await coro_fn(*args)
+            except LLMBackendError as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                _report_retry(e)
+                delay = self.backoff_delay(attempt, e.retry_after)
+                attempt += 1
+                logger.warning(
+                    f"{self.backend} returned {e.status_code}, retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+
+_limiters: Dict[str, BackendRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(backend: str) -> BackendRateLimiter:
+    """
+    Shared limiter for a hosted backend ("gemini" or "groq")
+
+    Limits come from <BACKEND>_RPM / <BACKEND>_TPM; all service instances of
+    the backend share one quota.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(backend)
+        if limiter is None:
+            prefix = backend.upper()
+            limiter = BackendRateLimiter(
+                backend,
+                requests_per_minute=getattr(settings, f"{prefix}_RPM", 0),
+                tokens_per_minute=getattr(settings, f"{prefix}_TPM", 0),
+                max_retries=settings.LLM_RATE_LIMIT_RETRIES,
+                base_delay=settings.LLM_RETRY_BASE_DELAY,
+                max_delay=settings.LLM_RETRY_MAX_DELAY
+            )
+            _limiters[backend] = limiter
+        return limiter
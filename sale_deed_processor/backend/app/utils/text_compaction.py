@@ -0,0 +1,191 @@
+# backend/app/utils/text_compaction.py
+
+"""
+OCR Text Compaction - Deterministic cleanup of OCR text before the LLM
+
+Up to 25 pages of raw OCR output go into every extraction prompt, and much
+of it carries nothing the LLM extracts:
+- Headers/footers and stamp-paper text repeated on every page
+- Page numbers ("Page 3 of 12", "- 3 -") and e-stamp certificate numbers
+- Lines of OCR garbage (rules, table borders, speckle read as punctuation)
+- Leader dots/dashes, invisible characters and runs of whitespace
+
+Compaction removes those and normalises Unicode (NFKC) so the same input
+always gives the same output (it also keeps LLM cache keys stable). Only
+lines in header/footer positions are dropped as repeats, and their first
+copy is kept. Body lines (party or schedule text restated on several pages)
+are never dropped, so page selection and chunk windows, which may leave out
+the page holding a first copy, cannot lose them.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.rate_limiter import estimate_tokens
+
+PAGE_MARKER_RE = re.compile(r"^--- Page (\d+) ---$", re.MULTILINE)
+PAGE_NUMBER_RE = re.compile(
+    r"^(?:page\s*)?[-(\[]?\s*\d{1,3}\s*[-)\]]?(?:\s*(?:of|/)\s*\d{1,3})?$",
+    re.IGNORECASE
+)
+ESTAMP_ID_RE = re.compile(r"\bIN-[A-Z]{2}\d{8,}[A-Z]?\b")
+PUNCTUATION_RUN_RE = re.compile(r"([^\w\s])\1{2,}")
+SPACE_RUN_RE = re.compile(r"[ \t]+")
+
+# Invisible characters (ZWJ/ZWNJ are kept: they shape Kannada conjuncts)
+INVISIBLE_CHARS = dict.fromkeys(map(ord, "​⁠﻿­"), None)
+
+EDGE_LINES = 2          # Lines at the top/bottom of a page treated as header/footer
+MASKED_MIN_LETTERS = 6  # Header/footer lines need this many letters to match with digits masked
+
+
+@dataclass
+class CompactionResult:
+    """Compacted text with before/after sizes"""
+    text: str
+    original_chars: int
+    compact_chars: int
+    original_tokens: int
+    compact_tokens: int
+    removed_lines: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def token_reduction(self) -> float:
+        """Fraction of estimated input tokens removed"""
+        if not self.original_tokens:
+            return 0.0
+        return 1 - self.compact_tokens / self.original_tokens
+
+
+def _informative_chars(line: str) -> int:
+    """Letters, digits and combining marks (Kannada vowel signs are marks)"""
+    return sum(1 for ch in line if unicodedata.category(ch)[0] in "LNM")
+
+
+def split_pages(text: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split into (page label, body) using the OCR page markers
+
+    Falls back to form feeds, or a single unlabelled page (PyMuPDF text).
+    """
+    parts = PAGE_MARKER_RE.split(text)
+    if len(parts) > 1:
+        pages = [(None, parts[0])] if parts[0].strip() else []
+        pages += [(parts[i], parts[i + 1]) for i in range(1, len(parts), 2)]
+        return pages
+    return [(None, page) for page in text.split("\f")]
+
+
+def normalize_line(line: str) -> str:
+    """Unicode NFKC, invisible characters, leader runs, e-stamp ids and spaces"""
+    line = unicodedata.normalize("NFKC", line).translate(INVISIBLE_CHARS)
+    line = PUNCTUATION_RUN_RE.sub(" ", line)
+    line = ESTAMP_ID_RE.sub(" ", line)
+    return SPACE_RUN_RE.sub(" ", line).strip()
+
+
+def is_noise_line(line: str) -> bool:
+    """Line without usable content: no letters/digits, or mostly OCR speckle"""
+    informative = _informative_chars(line)
+    if informative == 0:
+        return True
+    if any(ch.isdigit() for ch in line):
+        return False
+    visible = len(line.replace(" ", ""))
+    return informative < 2 or informative / visible < 0.5
+
+
+def _repeat_keys(line: str, edge: Optional[str]) -> List[str]:
+    """
+    Keys under which a header/footer line counts as repeated
+
+    Exact text in any header/footer position, and with digits masked at the
+    same position (edge, e.g. "top0"), so headers with page counters or
+    stamp serials match. Body lines (edge None) have no keys.
+    """
+    if edge is None:
+        return []
+    exact = line.lower()
+    keys = [exact]
+    if sum(ch.isalpha() for ch in line) >= MASKED_MIN_LETTERS:
+        keys.append(f"#{edge}:" + re.sub(r"\d", "#", exact))
+    return keys
+
+
+def _edge_position(index: int, count: int) -> Optional[str]:
+    """Header/footer slot of a line, None in the page body (or on short pages)"""
+    if count <= 3 * EDGE_LINES:
+        return None
+    if index < EDGE_LINES:
+        return f"top{index}"
+    if index >= count - EDGE_LINES:
+        return f"bottom{count - 1 - index}"
+    return None
+
+
+def compact_ocr_text(text: str, min_repeat_pages: int = 3) -> CompactionResult:
+    """
+    Compact OCR text for the LLM prompt
+
+    Args:
+        text: Full OCR text (with "--- Page N ---" markers when available)
+        min_repeat_pages: A header/footer line found on at least this many
+            pages is dropped after its first copy
+
+    Returns:
+        CompactionResult
+    """
+    removed = defaultdict(int)
+    pages = []
+    for label, body in split_pages(text):
+        lines = [normalize_line(line) for line in body.splitlines()]
+        lines = [line for line in lines if line]
+
+        kept = []
+        for i, line in enumerate(lines):
+            at_edge = i < EDGE_LINES or i >= len(lines) - EDGE_LINES
+            if is_noise_line(line):
+                removed["noise"] += 1
+            elif at_edge and PAGE_NUMBER_RE.match(line):
+                removed["page_number"] += 1
+            else:
+                kept.append(line)
+        pages.append((label, [(line, _edge_position(i, len(kept))) for i, line in enumerate(kept)]))
+
+    # Pages each line key appears on
+    key_pages = defaultdict(set)
+    for page_index, (_, lines) in enumerate(pages):
+        for line, edge in lines:
+            for key in _repeat_keys(line, edge):
+                key_pages[key].add(page_index)
+    repeated = {key for key, found_on in key_pages.items() if len(found_on) >= max(2, min_repeat_pages)}
+
+    seen = set()
+    output = []
+    for label, lines in pages:
+        body = []
+        for line, edge in lines:
+            keys = [key for key in _repeat_keys(line, edge) if key in repeated]
+            if keys and any(key in seen for key in keys):
+                removed["repeated"] += 1
+                continue
+            seen.update(keys)
+            body.append(line)
+
+        if not body:
+            continue
+        page_text = "\n".join(body)
+        output.append(f"--- Page {label} ---\n\n{page_text}" if label is not None else page_text)
+
+    compact = "\n\n".join(output)
+    return CompactionResult(
+        text=compact,
+        original_chars=len(text),
+        compact_chars=len(compact),
+        original_tokens=estimate_tokens(text),
+        compact_tokens=estimate_tokens(compact),
+        removed_lines=dict(removed)
+    )
@@ -0,0 +1,100 @@
+# backend/app/workers/async_llm_runner.py
+
+"""
+Async LLM Runner - Event loop for the LLM stage of the pipeline
+
+LLM calls spend seconds waiting on the backend. Running them as coroutines on
+one event loop (in a background thread) lets a single process keep many
+requests in flight without one blocked OS thread per request, which is what
+batching servers such as vLLM need to reach full throughput.
+
+The number of requests in flight is capped by a semaphore
+(ASYNC_LLM_MAX_CONCURRENCY).
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable
+
+from app.config import settings
+from app.utils.http_client import close_async_http_clients
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLLMRunner:
+    """
+    Runs LLM coroutines on a dedicated event loop thread
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        """
+        Start the event loop thread
+
+        Args:
+            max_concurrency: Max requests in flight (default from config)
+        """
+        self.max_concurrency = max_concurrency or settings.ASYNC_LLM_MAX_CONCURRENCY
+        self.loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._in_flight = 0
+
+        started = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            args=(started,),
+            name="async-llm-loop",
+            daemon=True
+        )
+        self._thread.start()
+        started.wait()
+
+        logger.info(f"Async LLM runner started (max {self.max_concurrency} requests in flight)")
+
+    def _run_loop(self, started: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        started.set()
+        self.loop.run_forever()
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently awaiting the backend"""
+        return self._in_flight
+
+    async def _run_limited(self, coro_fn: Callable[..., Awaitable], *args) -> Any:
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                return await coro_fn(*args)
+            finally:
+                self._in_flight -= 1
+
+    def submit(self, coro_fn: Callable[..., Awaitable], *args) -> Future:
+        """
+        Schedule a coroutine function on the event loop
+
+        Args:
+            coro_fn: Async function to call
+            *args: Its arguments
+
+        Returns:
+            concurrent.futures.Future with the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(self._run_limited(coro_fn, *args), self.loop)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Close async HTTP clients and stop the event loop"""
+        if not self.loop.is_running():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_async_http_clients(), self.loop).result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Closing async HTTP clients failed: {e}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=timeout)
+        logger.info("Async LLM runner stopped")
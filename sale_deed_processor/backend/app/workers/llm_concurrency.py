@@ -0,0 +1,237 @@
+# backend/app/workers/llm_concurrency.py
+
+"""
+Adaptive LLM Concurrency - AIMD limit on concurrent LLM requests
+
+A fixed worker count is either too low for a batching server (vLLM) or too
+high for a rate-limited API (Groq, Gemini). The controller treats the number
+of requests in flight like a TCP congestion window:
+
+- Additive increase: after a full round of successful calls (one call per
+  slot) with no backend errors and p50 latency within
+  LLM_AIMD_LATENCY_TOLERANCE of the baseline, the limit grows by 1.
+- Multiplicative decrease: a retryable LLMBackendError (429, 5xx, timeout,
+  connection failure) multiplies the limit by LLM_AIMD_DECREASE_FACTOR, at most
+  once per p50 latency so one overload event is not counted per request.
+  429/503 responses retried inside the rate limiter count as well, while the
+  slot is still held.
+
+The limit never exceeds the configured maximum (LLM pool size, or
+ASYNC_LLM_MAX_CONCURRENCY in async mode) and never drops below
+LLM_AIMD_MIN_LIMIT.
+
+Threads (slot) and coroutines (async_slot) share one limit. Every release or
+increase wakes both: blocked threads through the condition, waiting
+coroutines by resolving their future on its own event loop.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.exceptions import LLMBackendError
+from app.utils.rate_limiter import reporting_retries
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 50         # Recent call latencies used for the p50
+HISTORY_SIZE = 50           # Limit changes kept for /process/stats
+BASELINE_DRIFT = 0.05       # Fraction the baseline p50 moves towards the current p50 per round
+
+
+class AIMDConcurrencyController:
+    """
+    Thread-safe AIMD concurrency limit with blocking (threads) and async gates
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 1.5
+    ):
+        """
+        Args:
+            initial_limit: Starting limit (clamped to min/max)
+            min_limit: Lowest limit after backoff
+            max_limit: Highest limit (worker pool or async concurrency cap)
+            decrease_factor: Multiplier applied on a retryable backend error
+            latency_tolerance: Max ratio of current to baseline p50 that still allows an increase
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._async_waiters: Set[asyncio.Future] = set()
+
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._baseline_p50: Optional[float] = None
+        self._round_successes = 0
+        self._last_decrease = 0.0
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._record_change("initial")
+
+        logger.info(
+            f"Adaptive LLM concurrency: limit {self.limit} "
+            f"(min {self.min_limit}, max {self.max_limit})"
+        )
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrent LLM requests allowed"""
+        return int(self._limit)
+
+    @property
+    def in_use(self) -> int:
+        """LLM requests currently holding a slot"""
+        return self._in_use
+
+    def history(self) -> List[Dict]:
+        """Recent limit changes, oldest first"""
+        with self._condition:
+            return list(self._history)
+
+    def _p50(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[len(ordered) // 2]
+
+    def _record_change(self, reason: str):
+        self._history.append({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "limit": self.limit,
+            "reason": reason
+        })
+
+    def _try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_use >= self.limit:
+                return False
+            self._in_use += 1
+            return True
+
+    def _release(self):
+        with self._condition:
+            self._in_use -= 1
+            self._notify_waiters()
+
+    def _notify_waiters(self):
+        """Wake blocked threads and waiting coroutines (called with the lock held)"""
+        self._condition.notify_all()
+        waiters = list(self._async_waiters)
+        self._async_waiters.clear()
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def record_success(self, latency: float):
+        """Count a completed call; grow the limit after a clean round at stable latency"""
+        with self._condition:
+            self._latencies.append(latency)
+            self._round_successes += 1
+            if self._round_successes < self.limit:
+                return
+
+            # Round complete: one success per slot without a backend error
+            self._round_successes = 0
+            p50 = self._p50()
+            if self._baseline_p50 is None:
+                self._baseline_p50 = p50
+
+            stable = p50 <= self._baseline_p50 * self.latency_tolerance
+            self._baseline_p50 += BASELINE_DRIFT * (p50 - self._baseline_p50)
+
+            if stable and self.limit < self.max_limit:
+                self._limit = min(self._limit + 1, float(self.max_limit))
+                self._record_change(f"increase (p50 {p50:.2f}s)")
+                logger.info(f"LLM concurrency limit raised to {self.limit} (p50 {p50:.2f}s)")
+            self._notify_waiters()
+
+    def record_backoff(self, error: LLMBackendError):
+        """Shrink the limit after a rate limit, server error or timeout"""
+        with self._condition:
+            self._round_successes = 0
+            now = time.monotonic()
+            cooldown = self._p50() or 1.0
+            if now - self._last_decrease < cooldown:
+                return
+
+            self._last_decrease = now
+            previous = self.limit
+            self._limit = max(self._limit * self.decrease_factor, float(self.min_limit))
+            cause = error.status_code if error.status_code is not None else "transport"
+            self._record_change(f"decrease ({cause})")
+            logger.warning(
+                f"LLM concurrency limit lowered {previous} -> {self.limit} after backend error: {error}"
+            )
+
+    def _record_outcome(self, start: float, error: Optional[BaseException]):
+        if error is None:
+            self.record_success(time.monotonic() - start)
+        elif isinstance(error, LLMBackendError) and error.retryable:
+            self.record_backoff(error)
+
+    @contextmanager
+    def slot(self):
+        """Block the calling thread until a slot is free, then hold it for one LLM call"""
+        with self._condition:
+            self._condition.wait_for(self._try_acquire)
+
+        start = time.monotonic()
+        error = None
+        try:
+            with reporting_retries(self.record_backoff):
+                yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record_outcome(start, error)
+            self._release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Async variant of slot() for the event-loop LLM stage (shares the limit with thread slots)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._try_acquire():
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.add(waiter)
+            try:
+                await waiter
+            finally:
+                with self._condition:
+                    self._async_waiters.discard(waiter)
+
+        start = time.monotonic()
+        error = None
+        try:
+            with reporting_retries(self.record_backoff):
+                yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record_outcome(start, error)
+            self._release()
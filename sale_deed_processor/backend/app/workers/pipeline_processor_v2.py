@@ -5,10 +5,27 @@ Pipeline Batch Processor - Version 2
 
 This processor implements true pipeline parallelism with separate worker pools:
 - OCR Pool: CPU-intensive tasks (RegFee extraction + Tesseract OCR)
+- Table Pool: CPU-intensive tasks (page rendering + YOLO table detection)
 - LLM Pool: I/O-intensive tasks (LLM API calls + Validation + DB save)
 
 Architecture:
   [PDF Files] → [OCR Pool (5 workers)] → [Queue] → [LLM Pool (5 workers)] → [Complete]
+                                       ↘ [Table Pool (2 workers)] ↗
+                                         (only when pdfplumber found no fee;
+                                          overlaps the LLM call for the same PDF)
+
+With ENABLE_ASYNC_LLM the LLM call itself runs as a coroutine on an event
+loop (AsyncLLMRunner), so requests in flight are not limited by the LLM pool
+size; the pool then only runs validation and the DB save.
+
+With ENABLE_ADAPTIVE_LLM_CONCURRENCY the number of concurrent LLM calls is
+further limited by an AIMD controller that backs off on rate limits and
+server errors (see llm_concurrency.py).
+
+Bulk mode (process_bulk_batch) replaces the per-document LLM calls with one
+batch-inference job: all Stage 1 texts are submitted together, the job is
+polled until it completes, and the results then go through validation and
+the DB save on the LLM pool (see batch_inference.py).
 
 Benefits:
 - Maximum CPU utilization (OCR workers always busy)
@@ -17,15 +34,24 @@ Benefits:
 - Automatic load balancing via queue
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from pathlib import Path
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Tuple, Any
 from queue import Queue
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 import logging
+import time
 from threading import Lock
 from app.config import settings
 from app.database import get_db_context
+from app.exceptions import LLMBackendError
+from app.services.batch_inference import BaseBatchBackend, BatchItem, BatchJob, TERMINAL_STATES, batch_custom_id
+from app.utils.llm_usage import (
+    BATCH_SUFFIX, LLMCallUsage, UsageRecorder, add_usage_totals, empty_usage_totals, recording_usage
+)
+from app.workers.async_llm_runner import AsyncLLMRunner
+from app.workers.llm_concurrency import AIMDConcurrencyController
 
 logger = logging.getLogger(__name__)
 
@@ -37,28 +63,42 @@ class Stage1Result:
     document_id: str
     registration_fee: Optional[float]  # From pdfplumber
     new_ocr_reg_fee: Optional[float]  # From OCR text
-    ocr_text: str
+    ocr_text: str  # Compacted for the LLM when ENABLE_OCR_TEXT_COMPACTION is on
     status: str
     error: Optional[str] = None
+    ocr_tokens: Optional[int] = None      # Estimated tokens of the raw OCR text
+    prompt_tokens: Optional[int] = None   # Estimated tokens actually sent (after compaction / page selection)
+    full_text: Optional[str] = None       # Text before page selection, for the missing-party retry
+    usage: UsageRecorder = field(default_factory=UsageRecorder)  # LLM calls for this document (queue wait from creation)
 
 
 class PipelineBatchProcessor:
     """
-    Pipeline processor with separate OCR and LLM worker pools
+    Pipeline processor with separate OCR, table-detection and LLM worker pools
     """
 
-    def __init__(self, max_ocr_workers: int = None, max_llm_workers: int = None):
+    def __init__(
+        self,
+        max_ocr_workers: int = None,
+        max_llm_workers: int = None,
+        max_table_workers: int = None
+    ):
         """
         Initialize pipeline processor
 
         Args:
             max_ocr_workers: Number of OCR workers (default from config)
             max_llm_workers: Number of LLM workers (default from config)
+            max_table_workers: Number of table-detection workers (default from config)
         """
         self.max_ocr_workers = max_ocr_workers or settings.MAX_OCR_WORKERS
         self.max_llm_workers = max_llm_workers or settings.MAX_LLM_WORKERS
+        self.max_table_workers = max_table_workers or settings.MAX_TABLE_WORKERS
         self.is_running = False
         self.lock = Lock()
+        self.async_runner = None  # Created on first use when ENABLE_ASYNC_LLM is on
+        self.llm_controller = None  # Created per batch when ENABLE_ADAPTIVE_LLM_CONCURRENCY is on
+        self.batch_id = None  # Set per batch, stored with each document's LLM usage
 
         self.stats = {
             "total": 0,
@@ -68,7 +108,13 @@ class PipelineBatchProcessor:
             "stopped": 0,
             "ocr_active": 0,      # Currently processing in OCR stage
             "llm_active": 0,      # Currently processing in LLM stage
+            "table_active": 0,    # Currently running YOLO table detection
+            "llm_in_flight": 0,   # Async LLM requests awaiting the backend
             "in_queue": 0,        # Waiting in queue between stages
+            "bulk_job": None,     # Batch-inference job id (bulk mode)
+            "bulk_state": None,   # Batch-inference job state (bulk mode)
+            "batch_id": None,
+            "llm_usage": empty_usage_totals(),  # Token / latency / cost totals of the batch
             "current_file": None
         }
 
@@ -76,6 +122,7 @@ class PipelineBatchProcessor:
             f"Pipeline Processor V2 initialized: "
             f"{self.max_ocr_workers} OCR workers + "
             f"{self.max_llm_workers} LLM workers + "
+            f"{self.max_table_workers} table workers + "
             f"Stage-2 Queue Size: {settings.STAGE2_QUEUE_SIZE}"
         )
 
@@ -83,12 +130,19 @@ class PipelineBatchProcessor:
         """Get current processing statistics"""
         with self.lock:
             stats = self.stats.copy()
+            stats["llm_usage"] = dict(stats["llm_usage"])
             stats["is_running"] = self.is_running
             stats["active_workers"] = (
-                (self.max_ocr_workers + self.max_llm_workers) if self.is_running else 0
+                (self.max_ocr_workers + self.max_llm_workers + self.max_table_workers)
+                if self.is_running else 0
             )
             stats["ocr_workers"] = self.max_ocr_workers if self.is_running else 0
             stats["llm_workers"] = self.max_llm_workers if self.is_running else 0
+            stats["table_workers"] = self.max_table_workers if self.is_running else 0
+            stats["llm_in_flight"] = self.async_runner.in_flight if self.async_runner else 0
+            if self.llm_controller is not None:
+                stats["llm_limit"] = self.llm_controller.limit
+                stats["llm_limit_history"] = self.llm_controller.history()
             return stats
 
     def update_stats(self, **kwargs):
@@ -96,6 +150,12 @@ class PipelineBatchProcessor:
         with self.lock:
             self.stats.update(kwargs)
 
+    def adjust_stats(self, **deltas):
+        """Thread-safe increment/decrement of counters"""
+        with self.lock:
+            for key, delta in deltas.items():
+                self.stats[key] += delta
+
     def process_batch(
         self,
         pdf_files: List[Path],
@@ -109,7 +169,7 @@ class PipelineBatchProcessor:
         Args:
             pdf_files: List of PDF file paths
             stage1_processor: Processor for Stage 1 (OCR)
-            stage2_processor: Processor for Stage 2 (LLM)
+            stage2_processor: Processor for Stage 2 (LLM) and table detection
             progress_callback: Optional callback for progress updates
 
         Returns:
@@ -126,13 +186,19 @@ class PipelineBatchProcessor:
             stopped=0,
             ocr_active=0,
             llm_active=0,
+            table_active=0,
             in_queue=0,
+            bulk_job=None,
+            bulk_state=None,
             current_file=None
         )
+        self._start_batch_usage()
+        self.llm_controller = self._create_llm_controller()
 
         logger.info(
             f"Starting pipeline processing: {total_files} files "
-            f"({self.max_ocr_workers} OCR + {self.max_llm_workers} LLM workers)"
+            f"({self.max_ocr_workers} OCR + {self.max_llm_workers} LLM + "
+            f"{self.max_table_workers} table workers)"
         )
 
         results = []
@@ -140,9 +206,10 @@ class PipelineBatchProcessor:
         stage2_queue = Queue(maxsize=settings.STAGE2_QUEUE_SIZE)
 
         try:
-            # Create both worker pools
+            # Create all worker pools
             with ThreadPoolExecutor(max_workers=self.max_ocr_workers) as ocr_executor, \
-                 ThreadPoolExecutor(max_workers=self.max_llm_workers) as llm_executor:
+                 ThreadPoolExecutor(max_workers=self.max_llm_workers) as llm_executor, \
+                 ThreadPoolExecutor(max_workers=self.max_table_workers) as table_executor:
 
                 # Submit all PDFs to Stage 1 (OCR)
                 stage1_futures = {}
@@ -163,6 +230,7 @@ class PipelineBatchProcessor:
                         logger.info("Pipeline processing stopped by user")
                         ocr_executor.shutdown(wait=False)
                         llm_executor.shutdown(wait=False)
+                        table_executor.shutdown(wait=False)
                         break
 
                     pdf_path = stage1_futures[future]
@@ -177,14 +245,40 @@ class PipelineBatchProcessor:
                         )
 
                         if stage1_result.status == "success":
-                            # Submit to Stage 2 (LLM)
-                            self.update_stats(in_queue=self.stats["in_queue"] + 1)
+                            # pdfplumber found no fee: start table detection now so it
+                            # overlaps the LLM call instead of following it
+                            table_future = None
+                            if not stage1_result.registration_fee:
+                                table_future = table_executor.submit(
+                                    self._stage_table,
+                                    stage2_processor,
+                                    stage1_result
+                                )
 
-                            stage2_future = llm_executor.submit(
-                                self._stage2_llm,
-                                stage2_processor,
-                                stage1_result
-                            )
+                            # Submit to Stage 2 (LLM)
+                            self.adjust_stats(in_queue=1)
+
+                            if settings.ENABLE_ASYNC_LLM:
+                                stage2_future = self._submit_async_stage2(
+                                    llm_executor,
+                                    stage2_processor,
+                                    stage1_result,
+                                    table_future
+                                )
+                            elif table_future is not None:
+                                stage2_future = self._submit_split_stage2(
+                                    llm_executor,
+                                    stage2_processor,
+                                    stage1_result,
+                                    table_future
+                                )
+                            else:
+                                stage2_future = llm_executor.submit(
+                                    self._stage2_llm,
+                                    stage2_processor,
+                                    stage1_result,
+                                    table_future
+                                )
                             stage2_futures[stage2_future] = stage1_result
 
                         else:
@@ -252,49 +346,486 @@ class PipelineBatchProcessor:
             "successful": self.stats["successful"],
             "failed": self.stats["failed"],
             "stopped": self.stats["stopped"],
+            "batch_id": self.batch_id,
+            "llm_usage": dict(self.stats["llm_usage"]),
             "results": results
         }
 
         logger.info(
-            f"Pipeline processing completed: {summary['successful']}/{summary['total']} successful"
+            f"Pipeline processing completed: {summary['successful']}/{summary['total']} successful, "
+            f"LLM usage: {summary['llm_usage']}"
         )
 
         return summary
 
-    def _stage1_ocr(self, processor, pdf_path: Path) -> Stage1Result:
+    def process_bulk_batch(
+        self,
+        pdf_files: List[Path],
+        stage1_processor,
+        stage2_processor,
+        backend: BaseBatchBackend,
+        progress_callback: Callable = None
+    ) -> Dict:
         """
-        Stage 1: CPU-intensive processing (RegFee + OCR)
+        Process PDFs with one batch-inference job for the LLM stage
+
+        Stage 1 (and table detection) runs on the worker pools as usual; the
+        LLM calls are replaced by a single job on a batch API. When the job
+        completes, each result goes through validation and the DB save on the
+        LLM pool. A failed or expired job fails its documents (they can be
+        rerun); stopping cancels the job and leaves the PDFs in place.
+
+        Args:
+            pdf_files: List of PDF file paths
+            stage1_processor: Processor for Stage 1 (OCR)
+            stage2_processor: Processor for Stage 2 (validation + DB) and table detection
+            backend: Batch backend (gemini, vllm or local)
+            progress_callback: Optional callback for progress updates
+
+        Returns:
+            Summary of batch processing results
         """
+        self.is_running = True
+        total_files = len(pdf_files)
+
         self.update_stats(
-            ocr_active=self.stats["ocr_active"] + 1,
-            current_file=pdf_path.name
+            total=total_files,
+            processed=0,
+            successful=0,
+            failed=0,
+            stopped=0,
+            ocr_active=0,
+            llm_active=0,
+            table_active=0,
+            in_queue=0,
+            bulk_job=None,
+            bulk_state=None,
+            current_file=None
+        )
+        self._start_batch_usage()
+        self.llm_controller = None
+
+        logger.info(
+            f"Starting bulk processing: {total_files} files "
+            f"({self.max_ocr_workers} OCR workers, {backend.name} batch backend)"
+        )
+
+        results = []
+        ready: List[Tuple[Stage1Result, Optional[Future]]] = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_ocr_workers) as ocr_executor, \
+                 ThreadPoolExecutor(max_workers=self.max_llm_workers) as llm_executor, \
+                 ThreadPoolExecutor(max_workers=self.max_table_workers) as table_executor:
+
+                stage1_futures = {
+                    ocr_executor.submit(self._stage1_ocr, stage1_processor, pdf_path): pdf_path
+                    for pdf_path in pdf_files
+                }
+
+                for future in as_completed(stage1_futures):
+                    if not self.is_running:
+                        logger.info("Bulk processing stopped by user")
+                        ocr_executor.shutdown(wait=False, cancel_futures=True)
+                        break
+
+                    pdf_path = stage1_futures[future]
+
+                    try:
+                        stage1_result = future.result()
+                    except Exception as e:
+                        logger.error(f"Stage 1 exception for {pdf_path.name}: {e}")
+                        results.append({
+                            "document_id": pdf_path.stem,
+                            "status": "failed",
+                            "error": f"Stage 1 exception: {str(e)}",
+                            "llm_extracted": False,
+                            "saved_to_db": False
+                        })
+                        self._update_completion_stats(results[-1], progress_callback)
+                        continue
+
+                    if stage1_result.status != "success":
+                        results.append({
+                            "document_id": stage1_result.document_id,
+                            "status": stage1_result.status,
+                            "error": stage1_result.error,
+                            "registration_fee": stage1_result.registration_fee,
+                            "llm_extracted": False,
+                            "saved_to_db": False
+                        })
+                        self._update_completion_stats(results[-1], progress_callback)
+                        continue
+
+                    # Table detection runs while the batch job is pending
+                    table_future = None
+                    if not stage1_result.registration_fee:
+                        table_future = table_executor.submit(self._stage_table, stage2_processor, stage1_result)
+                    ready.append((stage1_result, table_future))
+
+                outputs, job = self._run_bulk_job(backend, ready) if ready and self.is_running else ({}, None)
+
+                # Validation + DB save (stop checks inside report the rest as stopped)
+                stage2_futures = {}
+                for index, (stage1_result, table_future) in enumerate(ready):
+                    llm_future = Future()
+                    custom_id = batch_custom_id(index, stage1_result.document_id)
+                    outcome = outputs.get(custom_id)
+                    if job is not None and custom_id in job.usage:
+                        self._record_bulk_usage(stage1_result, backend, job, custom_id)
+                    if isinstance(outcome, BaseException):
+                        llm_future.set_exception(outcome)
+                    elif outcome is None and self.stats["bulk_state"] != "succeeded":
+                        llm_future.set_exception(
+                            LLMBackendError(f"Bulk job {self.stats['bulk_state'] or 'not run'}")
+                        )
+                    else:
+                        llm_future.set_result(outcome)
+
+                    stage2_future = self._submit_stage2_post(
+                        llm_executor,
+                        stage2_processor,
+                        stage1_result,
+                        table_future,
+                        llm_future
+                    )
+                    stage2_futures[stage2_future] = stage1_result
+
+                for future in as_completed(stage2_futures):
+                    stage1_result = stage2_futures[future]
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Stage 2 exception for {stage1_result.document_id}: {e}")
+                        results.append({
+                            "document_id": stage1_result.document_id,
+                            "status": "failed",
+                            "error": f"Stage 2 exception: {str(e)}",
+                            "registration_fee": stage1_result.registration_fee,
+                            "llm_extracted": False,
+                            "saved_to_db": False
+                        })
+                    self._update_completion_stats(results[-1], progress_callback)
+
+        finally:
+            self.is_running = False
+
+        summary = {
+            "total": total_files,
+            "processed": self.stats["processed"],
+            "successful": self.stats["successful"],
+            "failed": self.stats["failed"],
+            "stopped": self.stats["stopped"],
+            "bulk_job": self.stats["bulk_job"],
+            "bulk_state": self.stats["bulk_state"],
+            "batch_id": self.batch_id,
+            "llm_usage": dict(self.stats["llm_usage"]),
+            "results": results
+        }
+
+        logger.info(
+            f"Bulk processing completed: {summary['successful']}/{summary['total']} successful "
+            f"(job {summary['bulk_job']}: {summary['bulk_state']})"
         )
 
+        return summary
+
+    def _run_bulk_job(
+        self,
+        backend: BaseBatchBackend,
+        ready: List[Tuple[Stage1Result, Optional[Future]]]
+    ) -> Tuple[Dict[str, Any], Optional[BatchJob]]:
+        """
+        Submit the Stage 1 texts as one batch job and wait for its results
+
+        Returns:
+            (custom_id -> extracted dict / None / LLMBackendError, job); the
+            outputs are {} if the job did not succeed, was stopped or timed out
+        """
+        job_dir = settings.BULK_BATCH_DIR / self.batch_id
+        items = [
+            BatchItem(custom_id=batch_custom_id(index, stage1_result.document_id), ocr_text=stage1_result.ocr_text)
+            for index, (stage1_result, _) in enumerate(ready)
+        ]
+
+        try:
+            input_path = backend.write_requests(items, job_dir / "requests.jsonl")
+            job = backend.submit(input_path)
+        except Exception as e:
+            logger.error(f"Bulk job submission failed: {e}")
+            self.update_stats(bulk_state="failed")
+            return {}, None
+
+        self.update_stats(bulk_job=job.job_id, bulk_state=job.state, current_file=None)
+        deadline = time.monotonic() + settings.BULK_MAX_WAIT_HOURS * 3600
+
+        while True:
+            try:
+                state = backend.poll(job)
+            except Exception as e:
+                # Transient API error: keep the job, check again next interval
+                logger.warning(f"Bulk job {job.job_id} status check failed: {e}")
+                state = job.state
+            self.update_stats(bulk_state=state)
+
+            if state in TERMINAL_STATES:
+                break
+
+            if not self.is_running or time.monotonic() > deadline:
+                reason = "stopped" if not self.is_running else f"not done after {settings.BULK_MAX_WAIT_HOURS:g}h"
+                logger.warning(f"Bulk job {job.job_id} {reason}, cancelling")
+                try:
+                    backend.cancel(job)
+                except Exception as e:
+                    logger.error(f"Bulk job {job.job_id} cancel failed: {e}")
+                self.update_stats(bulk_state="cancelled" if not self.is_running else "expired")
+                return {}, job
+
+            self._wait_while_running(settings.BULK_POLL_INTERVAL)
+
+        if state != "succeeded":
+            logger.error(f"Bulk job {job.job_id} ended as {state}")
+            return {}, job
+
+        try:
+            outputs = backend.results(job)
+        except Exception as e:
+            logger.error(f"Bulk job {job.job_id} results unavailable: {e}")
+            self.update_stats(bulk_state="failed")
+            return {}, job
+
+        job.finished_at = time.time()
+        logger.info(f"Bulk job {job.job_id} succeeded: {len(outputs)}/{len(items)} results")
+        return outputs, job
+
+    @staticmethod
+    def _record_bulk_usage(stage1_result: Stage1Result, backend: BaseBatchBackend, job: BatchJob, custom_id: str):
+        """Token counts of a batch result as one "<backend>-batch" call (latency = job turnaround)"""
+        tokens = job.usage[custom_id]
+        turnaround = (job.finished_at or time.time()) - job.submitted_at
+        call = LLMCallUsage(
+            backend=backend.name + BATCH_SUFFIX,
+            model=backend.model_name,
+            started_at=time.monotonic() - turnaround,
+            latency_seconds=turnaround
+        )
+        call.set_tokens(tokens.get("prompt_tokens"), tokens.get("completion_tokens"), tokens.get("cached_tokens"))
+        stage1_result.usage.add(call)
+
+    def _wait_while_running(self, seconds: float):
+        """Sleep up to `seconds`, returning early when processing is stopped"""
+        end = time.monotonic() + seconds
+        while self.is_running and time.monotonic() < end:
+            time.sleep(min(1.0, end - time.monotonic()))
+
+    def _stage1_ocr(self, processor, pdf_path: Path) -> Stage1Result:
+        """
+        Stage 1: CPU-intensive processing (RegFee + OCR)
+        """
+        self.adjust_stats(ocr_active=1)
+        self.update_stats(current_file=pdf_path.name)
+
         try:
             with get_db_context() as db:
                 result = processor.process_stage1_ocr(pdf_path, db)
                 return result
 
         finally:
-            self.update_stats(ocr_active=self.stats["ocr_active"] - 1)
+            self.adjust_stats(ocr_active=-1)
 
-    def _stage2_llm(self, processor, stage1_result: Stage1Result) -> Dict:
+    def _stage_table(self, processor, stage1_result: Stage1Result) -> bool:
         """
-        Stage 2: I/O-intensive processing (LLM + Validation + DB)
+        Table stage: CPU-intensive YOLO table detection (runs alongside Stage 2)
         """
-        self.update_stats(
-            llm_active=self.stats["llm_active"] + 1,
-            in_queue=self.stats["in_queue"] - 1,
-            current_file=stage1_result.document_id
+        if not self.is_running:
+            return False
+
+        self.adjust_stats(table_active=1)
+
+        try:
+            return processor.process_table_detection(stage1_result)
+
+        finally:
+            self.adjust_stats(table_active=-1)
+
+    def _create_llm_controller(self) -> Optional[AIMDConcurrencyController]:
+        """AIMD limit for this batch, capped at the LLM pool size (or the async cap)"""
+        if not settings.ENABLE_ADAPTIVE_LLM_CONCURRENCY:
+            return None
+
+        max_limit = (
+            settings.ASYNC_LLM_MAX_CONCURRENCY if settings.ENABLE_ASYNC_LLM
+            else self.max_llm_workers
+        )
+        return AIMDConcurrencyController(
+            initial_limit=settings.LLM_AIMD_INITIAL_LIMIT,
+            min_limit=settings.LLM_AIMD_MIN_LIMIT,
+            max_limit=max_limit,
+            decrease_factor=settings.LLM_AIMD_DECREASE_FACTOR,
+            latency_tolerance=settings.LLM_AIMD_LATENCY_TOLERANCE
         )
 
+    def _start_batch_usage(self):
+        """New batch id and empty usage totals"""
+        self.batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.update_stats(batch_id=self.batch_id, llm_usage=empty_usage_totals())
+
+    def _get_async_runner(self) -> AsyncLLMRunner:
+        """Event loop runner for async LLM calls, started on first use"""
+        with self.lock:
+            if self.async_runner is None:
+                self.async_runner = AsyncLLMRunner()
+            return self.async_runner
+
+    async def _async_llm_call(self, processor, stage1_result: Stage1Result) -> Optional[Dict]:
+        """
+        Stage 2 LLM call on the event loop
+
+        The processor takes an adaptive concurrency slot per backend call
+        (after its response cache lookup), as in blocking mode.
+        """
+        self.adjust_stats(in_queue=-1)
+        self.update_stats(current_file=stage1_result.document_id)
+
+        if not self.is_running:
+            return None
+
+        with recording_usage(stage1_result.usage):
+            return await processor.extract_structured_data_async(stage1_result)
+
+    def _submit_async_stage2(
+        self,
+        llm_executor: ThreadPoolExecutor,
+        processor,
+        stage1_result: Stage1Result,
+        table_future: Optional[Future]
+    ) -> Future:
+        """
+        Stage 2 with the LLM call on the async runner
+
+        The request waits on the event loop instead of a worker thread; when it
+        and the table stage complete, validation and the DB save are submitted
+        to the LLM pool.
+
+        Returns:
+            Future completing with the Stage 2 result
+        """
+        llm_future = self._get_async_runner().submit(self._async_llm_call, processor, stage1_result)
+        return self._submit_stage2_post(llm_executor, processor, stage1_result, table_future, llm_future)
+
+    def _submit_split_stage2(
+        self,
+        llm_executor: ThreadPoolExecutor,
+        processor,
+        stage1_result: Stage1Result,
+        table_future: Future
+    ) -> Future:
+        """
+        Stage 2 with a pending table stage (blocking LLM mode)
+
+        The LLM call runs as its own LLM-pool task and releases the worker when
+        it returns; validation and the DB save follow once the table stage is
+        done too, so no LLM worker sits waiting on the table pool.
+
+        Returns:
+            Future completing with the Stage 2 result
+        """
+        llm_future = llm_executor.submit(self._sync_llm_call, processor, stage1_result)
+        return self._submit_stage2_post(llm_executor, processor, stage1_result, table_future, llm_future)
+
+    def _submit_stage2_post(
+        self,
+        llm_executor: ThreadPoolExecutor,
+        processor,
+        stage1_result: Stage1Result,
+        table_future: Optional[Future],
+        llm_future: Future
+    ) -> Future:
+        """
+        Submit validation + DB save to the LLM pool once the LLM call and the table stage are done
+
+        Returns:
+            Future completing with the Stage 2 result
+        """
+        stage2_future = Future()
+        pending = [future for future in (llm_future, table_future) if future is not None]
+        remaining = {"count": len(pending)}
+        lock = Lock()
+
+        def on_done(_):
+            with lock:
+                remaining["count"] -= 1
+                if remaining["count"]:
+                    return
+            try:
+                post_future = llm_executor.submit(
+                    self._stage2_llm,
+                    processor,
+                    stage1_result,
+                    table_future,
+                    llm_future
+                )
+            except Exception as e:
+                # Pool already shut down (processing stopped)
+                stage2_future.set_exception(e)
+                return
+            post_future.add_done_callback(lambda f: self._chain_future(f, stage2_future))
+
+        for future in pending:
+            future.add_done_callback(on_done)
+        return stage2_future
+
+    def _sync_llm_call(self, processor, stage1_result: Stage1Result) -> Optional[Dict]:
+        """
+        Stage 2 LLM call as its own LLM-pool task (blocking LLM mode with a pending table stage)
+        """
+        self.adjust_stats(llm_active=1, in_queue=-1)
+        self.update_stats(current_file=stage1_result.document_id)
+
         try:
-            with get_db_context() as db:
-                result = processor.process_stage2_llm(stage1_result, db)
+            if not self.is_running:
+                return None
+            with recording_usage(stage1_result.usage):
+                return processor.extract_structured_data(stage1_result)
+
+        finally:
+            self.adjust_stats(llm_active=-1)
+
+    @staticmethod
+    def _chain_future(source: Future, target: Future):
+        """Copy the outcome of one future to another"""
+        error = source.exception()
+        if error is not None:
+            target.set_exception(error)
+        else:
+            target.set_result(source.result())
+
+    def _stage2_llm(
+        self,
+        processor,
+        stage1_result: Stage1Result,
+        table_future: Optional[Future] = None,
+        llm_future: Optional[Future] = None
+    ) -> Dict:
+        """
+        Stage 2: I/O-intensive processing (LLM + Validation + DB)
+
+        With llm_future the LLM call has already run (event loop, separate LLM
+        task or bulk job) and the table stage, if any, is done.
+        """
+        if llm_future is None:
+            self.adjust_stats(llm_active=1, in_queue=-1)
+            self.update_stats(current_file=stage1_result.document_id)
+        else:
+            self.adjust_stats(llm_active=1)
+
+        try:
+            with get_db_context() as db, recording_usage(stage1_result.usage):
+                result = processor.process_stage2_llm(stage1_result, db, table_future, llm_future)
                 return result
 
         finally:
-            self.update_stats(llm_active=self.stats["llm_active"] - 1)
+            self.adjust_stats(llm_active=-1)
 
     def _update_completion_stats(self, result: Dict, callback: Callable):
         """Update completion statistics"""
@@ -309,6 +840,8 @@ class PipelineBatchProcessor:
             failed=failed,
             stopped=stopped
         )
+        with self.lock:
+            add_usage_totals(self.stats["llm_usage"], result.get("llm_usage"))
 
         if callback:
             callback(processed, self.stats["total"], result)
@@ -317,3 +850,9 @@ class PipelineBatchProcessor:
         """Stop pipeline processing"""
         logger.info("Stopping pipeline processor...")
         self.is_running = False
+
+    def shutdown(self):
+        """Release background resources (called on API shutdown)"""
+        if self.async_runner is not None:
+            self.async_runner.shutdown()
+            self.async_runner = None
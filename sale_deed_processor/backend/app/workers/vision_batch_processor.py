@@ -11,6 +11,8 @@ from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.services.vision_service_factory import get_vision_service
+from app.services.ocr_service import OCRService
+from app.services.registration_fee_extractor import RegistrationFeeExtractor
 from app.services.validation_service import ValidationService
 from app.database import get_db_context
 from app.models import PropertyDetail
@@ -22,6 +24,12 @@ class VisionBatchProcessor:
         """Initialize vision batch processor (max_workers=1 for sequential processing)"""
         self.max_workers = max_workers
         self.vision_service = get_vision_service()
+        self.ocr_service = OCRService()
+        self.reg_fee_extractor = RegistrationFeeExtractor(
+            threshold_pct=0.7,
+            max_misc_fee=settings.MAX_MISC_FEE,
+            min_fee=settings.MIN_REGISTRATION_FEE
+        )
         self.is_running = False
         self.lock = Lock()
         self.stats = {
@@ -29,7 +37,8 @@ class VisionBatchProcessor:
             "processed": 0,
             "successful": 0,
             "failed": 0,
-            "stopped": 0
+            "stopped": 0,
+            "local_ocr_successful": 0
         }
 
         logger.info(f"Vision Batch Processor initialized with {self.max_workers} workers")
@@ -69,7 +78,8 @@ class VisionBatchProcessor:
             processed=0,
             successful=0,
             failed=0,
-            stopped=0
+            stopped=0,
+            local_ocr_successful=0
         )
         
         logger.info(f"Starting vision batch processing: {total_files} images")
@@ -100,12 +110,16 @@ class VisionBatchProcessor:
                         # Don't count stopped as failed
                         failed = self.stats["failed"] + (1 if not result["success"] and not result.get("stopped", False) else 0)
                         stopped = self.stats["stopped"] + (1 if result.get("stopped", False) else 0)
+                        local_ocr_successful = self.stats["local_ocr_successful"] + (
+                            1 if result["success"] and result.get("source") == "local_ocr" else 0
+                        )
 
                         self.update_stats(
                             processed=processed,
                             successful=successful,
                             failed=failed,
-                            stopped=stopped
+                            stopped=stopped,
+                            local_ocr_successful=local_ocr_successful
                         )
                         
                         logger.info(f"Vision progress: {processed}/{total_files} - {image_path.name}")
@@ -122,6 +136,7 @@ class VisionBatchProcessor:
             "successful": self.stats["successful"],
             "failed": self.stats["failed"],
             "stopped": self.stats["stopped"],
+            "local_ocr_successful": self.stats["local_ocr_successful"],
             "results": results
         }
         
@@ -137,6 +152,7 @@ class VisionBatchProcessor:
             "image": image_path.name,
             "document_id": None,
             "registration_fee": None,
+            "source": None,
             "success": False,
             "stopped": False,
             "error": None
@@ -157,8 +173,17 @@ class VisionBatchProcessor:
 
             result["document_id"] = document_id
 
+            # Try local digit OCR first; only crops that fail table validation go to the vision model
+            reg_fee = None
+            if settings.ENABLE_LOCAL_TABLE_OCR:
+                reg_fee = self._extract_fee_locally(image_path)
+                if reg_fee:
+                    result["source"] = "local_ocr"
+
             # Extract registration fee using vision model
-            reg_fee = self.vision_service.extract_registration_fee(str(image_path))
+            if not reg_fee:
+                reg_fee = self.vision_service.extract_registration_fee(str(image_path))
+                result["source"] = "vision"
 
             # Vision model exception: Accept any positive value (no MIN_REGISTRATION_FEE check)
             # Vision can extract values from bad prints that would otherwise be rejected
@@ -231,6 +256,23 @@ class VisionBatchProcessor:
 
         return result
 
+    def _extract_fee_locally(self, image_path: Path):
+        """Digit-only Tesseract pass on the crop, accepted only if the table validates"""
+        try:
+            words = self.ocr_service.ocr_table_crop_words(str(image_path))
+            reg_fee = self.reg_fee_extractor.extract_from_words(words)
+
+            if reg_fee is not None:
+                logger.info(f"Local table OCR extracted fee {reg_fee} from {image_path.name}, skipping vision model")
+            else:
+                logger.info(f"Local table OCR could not validate {image_path.name}, falling back to vision model")
+
+            return reg_fee
+
+        except Exception as e:
+            logger.warning(f"Local table OCR error on {image_path.name}: {e}")
+            return None
+
     def _move_to_failed(self, image_path: Path, reason: str):
         """Move failed image to vision_failed folder"""
         try:
@@ -0,0 +1,160 @@
+# backend/benchmark_llm_prefix.py
+
+"""
+Time-to-first-token with and without prompt prefix reuse
+
+Sends the extraction prompt for each sample text twice per run:
+- cold:   a unique marker is put at the start of the instructions, so the
+          server cannot reuse any cached prefix (what every request cost
+          when the prefix varied)
+- stable: the byte-identical instruction prefix the services now send
+
+and streams the answer only until the first token arrives. The difference
+is the prefill time saved by the server's prefix / context cache.
+
+Usage:
+    python benchmark_llm_prefix.py ollama [--samples ocr1.txt ocr2.txt] [--runs 5]
+    python benchmark_llm_prefix.py llamacpp|vllm [--samples ...] [--runs 5]
+    python benchmark_llm_prefix.py gemini [--samples ...] [--runs 5]
+"""
+
+import sys
+import json
+import time
+import uuid
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import requests
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from app.config import settings
+from app.utils.prompts import build_extraction_messages
+
+SAMPLE_TEXT = "\n\n".join(
+    f"--- Page {page} ---\n\nThis deed of sale is executed on the {page}th day by the vendor "
+    f"Sri Ramesh Kumar S/o Late Krishnappa, aged about 54 years, PAN ABCDE1234F, in favour of "
+    f"the purchaser Smt Lakshmi W/o Suresh. Schedule property: Sy. No. {page}2/1 measuring "
+    f"1200 sq. ft. Sale consideration Rs. 45,00,000. Stamp duty Rs. 2,50,000."
+    for page in range(1, 9)
+)
+
+
+def cold_messages(ocr_text: str) -> List[Dict[str, str]]:
+    """Extraction messages whose first bytes differ on every call"""
+    messages = build_extraction_messages(ocr_text)
+    messages[0] = {"role": "system", "content": f"[request {uuid.uuid4()}]\n{messages[0]['content']}"}
+    return messages
+
+
+def ttft_openai(base_url: str, model: str) -> Callable[[List[Dict[str, str]]], float]:
+    """TTFT probe for llama.cpp / vLLM (OpenAI-compatible streaming)"""
+    session = requests.Session()
+
+    def probe(messages):
+        start = time.perf_counter()
+        payload = {"model": model, "messages": messages, "stream": True, "max_tokens": 8, "cache_prompt": True}
+        with session.post(f"{base_url}/v1/chat/completions", json=payload, stream=True, timeout=settings.LLM_TIMEOUT) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.startswith(b"data: ") and line != b"data: [DONE]":
+                    delta = json.loads(line[6:])["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        return time.perf_counter() - start
+        return time.perf_counter() - start
+
+    return probe
+
+
+def ttft_ollama(base_url: str, model: str) -> Callable[[List[Dict[str, str]]], float]:
+    """TTFT probe for Ollama /api/chat streaming"""
+    session = requests.Session()
+
+    def probe(messages):
+        start = time.perf_counter()
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": True,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+            "options": {"num_predict": 8}
+        }
+        with session.post(f"{base_url}/api/chat", json=payload, stream=True, timeout=settings.LLM_TIMEOUT) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line and json.loads(line).get("message", {}).get("content"):
+                    return time.perf_counter() - start
+        return time.perf_counter() - start
+
+    return probe
+
+
+def ttft_gemini() -> Callable[[List[Dict[str, str]]], float]:
+    """TTFT probe for Gemini (system instruction + streamed content)"""
+    import google.generativeai as genai
+    from app.services.gemini_llm_service import GeminiLLMService
+
+    service = GeminiLLMService()
+
+    def probe(messages):
+        system, user = messages[0]["content"], messages[1]["content"]
+        if system == service.system_instruction:
+            model = service._get_model()
+        else:
+            model = genai.GenerativeModel(
+                model_name=service.model_name,
+                generation_config=service.generation_config,
+                system_instruction=system
+            )
+        start = time.perf_counter()
+        for chunk in model.generate_content(user, stream=True):
+            if chunk.text:
+                return time.perf_counter() - start
+        return time.perf_counter() - start
+
+    return probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure TTFT gain from a stable prompt prefix")
+    parser.add_argument("backend", choices=["ollama", "llamacpp", "vllm", "gemini"])
+    parser.add_argument("--samples", nargs="*", default=[], help="OCR text files (default: synthetic deed)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [Path(p).read_text(encoding="utf-8") for p in args.samples] or [SAMPLE_TEXT]
+
+    if args.backend == "ollama":
+        probe = ttft_ollama(settings.OLLAMA_BASE_URL, settings.OLLAMA_LLM_MODEL)
+    elif args.backend == "llamacpp":
+        probe = ttft_openai(settings.LLAMACPP_BASE_URL, settings.LLAMACPP_LLM_MODEL)
+    elif args.backend == "vllm":
+        probe = ttft_openai(settings.VLLM_BASE_URL, settings.VLLM_LLM_MODEL)
+    else:
+        probe = ttft_gemini()
+
+    # Warm up the model and the stable prefix
+    probe(build_extraction_messages(texts[0]))
+
+    results = {"cold": [], "stable": []}
+    for _ in range(args.runs):
+        for text in texts:
+            results["cold"].append(probe(cold_messages(text)))
+            results["stable"].append(probe(build_extraction_messages(text)))
+
+    print(f"Backend: {args.backend}, {len(texts)} sample(s) x {args.runs} runs")
+    print(f"{'prefix':<8} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, values in results.items():
+        ms = np.asarray(values) * 1000
+        print(f"{name:<8} {ms.mean():>9.1f} {np.percentile(ms, 50):>8.1f} {np.percentile(ms, 95):>8.1f}")
+
+    cold, stable = np.mean(results["cold"]), np.mean(results["stable"])
+    print(f"TTFT reduction: {(1 - stable / cold):.1%} ({cold / stable:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
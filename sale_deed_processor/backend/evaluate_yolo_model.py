@@ -0,0 +1,162 @@
+# backend/evaluate_yolo_model.py
+
+"""
+Compare the INT8 YOLO model against FP32 on a labelled page set
+
+The labelled set is a folder of page images, each with a YOLO-format label
+file of the same name (class cx cy w h, normalised to 0-1), one table per line.
+
+Reports detection recall, IoU against the labels, agreement between the two
+models' best boxes and CPU latency. Exits with status 1 when INT8 recall
+drops more than --max-recall-drop below FP32, so it can gate adoption.
+
+Usage:
+    python evaluate_yolo_model.py path/to/labelled_pages [--fp32 ...] [--int8 ...] [--iou 0.5]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from app.config import settings
+from app.services.yolo_detector import YOLOTableDetector, box_iou
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+
+def load_labels(label_path: Path, img_shape) -> np.ndarray:
+    """Read YOLO-format labels as (N, 4) pixel boxes (x1, y1, x2, y2)"""
+    h, w = img_shape
+    boxes = []
+    if label_path.exists():
+        for line in label_path.read_text().splitlines():
+            parts = line.split()
+            if len(parts) != 5:
+                continue
+            cx, cy, bw, bh = (float(v) for v in parts[1:])
+            boxes.append([(cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h])
+    return np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+
+def match_detections(gt_boxes: np.ndarray, det_boxes: np.ndarray, iou_threshold: float):
+    """
+    Greedy one-to-one matching, detections in confidence order
+
+    Returns:
+        (matched ground-truth count, IoU of each matched pair)
+    """
+    if len(gt_boxes) == 0 or len(det_boxes) == 0:
+        return 0, []
+
+    unmatched = np.ones(len(gt_boxes), dtype=bool)
+    ious = []
+    for det in det_boxes[:, :4]:
+        if not unmatched.any():
+            break
+        overlap = box_iou(det, gt_boxes)
+        overlap[~unmatched] = 0
+        best = int(np.argmax(overlap))
+        if overlap[best] >= iou_threshold:
+            unmatched[best] = False
+            ious.append(float(overlap[best]))
+
+    return int((~unmatched).sum()), ious
+
+
+def evaluate(detector: YOLOTableDetector, samples, iou_threshold: float):
+    """Run one model over the labelled set"""
+    matched, total_gt, ious, latencies, best_boxes = 0, 0, [], [], []
+
+    for img, gt_boxes in samples:
+        start = time.perf_counter()
+        det_boxes = detector.detect_all(img)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        hits, pair_ious = match_detections(gt_boxes, det_boxes, iou_threshold)
+        matched += hits
+        total_gt += len(gt_boxes)
+        ious.extend(pair_ious)
+        best_boxes.append(det_boxes[0, :4] if len(det_boxes) else None)
+
+    return {
+        "recall": matched / total_gt if total_gt else 0.0,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "latency_mean": float(np.mean(latencies)),
+        "latency_p50": float(np.percentile(latencies, 50)),
+        "latency_p95": float(np.percentile(latencies, 95)),
+        "best_boxes": best_boxes,
+    }
+
+
+def best_box_agreement(fp32_boxes, int8_boxes) -> float:
+    """Mean IoU between the two models' best boxes (the box the pipeline crops)"""
+    scores = []
+    for a, b in zip(fp32_boxes, int8_boxes):
+        if a is None and b is None:
+            scores.append(1.0)
+        elif a is None or b is None:
+            scores.append(0.0)
+        else:
+            scores.append(float(box_iou(a, b[None, :])[0]))
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate INT8 vs FP32 YOLO table detection")
+    parser.add_argument("dataset", type=str, help="Folder of page images with YOLO-format .txt labels")
+    parser.add_argument("--fp32", type=str, default=str(settings.YOLO_MODEL_PATH))
+    parser.add_argument("--int8", type=str, default=str(settings.YOLO_INT8_MODEL_PATH))
+    parser.add_argument("--conf", type=float, default=settings.YOLO_CONF_THRESHOLD)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU needed to count a label as detected")
+    parser.add_argument("--max-recall-drop", type=float, default=0.01, help="Allowed absolute recall drop")
+    args = parser.parse_args()
+
+    dataset = Path(args.dataset)
+    samples = []
+    for image_path in sorted(p for p in dataset.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS):
+        img = cv2.imread(str(image_path))
+        if img is None:
+            print(f"Skipping unreadable image: {image_path}")
+            continue
+        samples.append((img, load_labels(image_path.with_suffix(".txt"), img.shape[:2])))
+
+    if not samples:
+        print(f"No labelled images found in {dataset}")
+        sys.exit(1)
+
+    results = {}
+    for name, model_path in (("FP32", args.fp32), ("INT8", args.int8)):
+        detector = YOLOTableDetector(model_path=model_path, conf_threshold=args.conf,
+                                     iou_threshold=settings.YOLO_IOU_THRESHOLD)
+        detector.warmup()
+        results[name] = evaluate(detector, samples, args.iou)
+
+    total_labels = sum(len(gt) for _, gt in samples)
+    print(f"Labelled set: {len(samples)} images, {total_labels} tables (match IoU >= {args.iou})")
+    print(f"{'model':<6} {'recall':>8} {'mean IoU':>9} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<6} {r['recall']:>8.3f} {r['mean_iou']:>9.3f} "
+            f"{r['latency_mean']:>9.1f} {r['latency_p50']:>8.1f} {r['latency_p95']:>8.1f}"
+        )
+
+    fp32, int8 = results["FP32"], results["INT8"]
+    print(f"Best-box agreement (IoU FP32 vs INT8): {best_box_agreement(fp32['best_boxes'], int8['best_boxes']):.3f}")
+    print(f"Latency speedup: {fp32['latency_mean'] / int8['latency_mean']:.2f}x")
+
+    if int8["recall"] < fp32["recall"] - args.max_recall_drop:
+        print(f"REJECT: INT8 recall dropped by more than {args.max_recall_drop:.3f}")
+        sys.exit(1)
+
+    print("ACCEPT: INT8 recall holds, YOLO_USE_INT8=True can be enabled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# backend/quantize_yolo_model.py
+
+"""
+Produce an INT8 quantized variant of the YOLO table-detection model
+
+Dynamic quantization needs no data but only quantizes weights; static (QDQ)
+quantization calibrates activations on real page images and is usually the
+faster option for convolutional models on CPU.
+
+Usage:
+    python quantize_yolo_model.py dynamic
+    python quantize_yolo_model.py static --calibration-dir path/to/page_images [--count 100]
+
+Validate the result with evaluate_yolo_model.py before setting YOLO_USE_INT8=True.
+"""
+
+import sys
+import argparse
+import tempfile
+from pathlib import Path
+
+import cv2
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_dynamic,
+    quantize_static,
+)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from app.config import settings
+from app.services.yolo_detector import YOLOTableDetector
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+
+class PageCalibrationReader(CalibrationDataReader):
+    """Feeds letterboxed page images to the static quantization calibrator"""
+
+    def __init__(self, detector: YOLOTableDetector, image_paths: list):
+        self.detector = detector
+        self.image_paths = iter(image_paths)
+
+    def get_next(self):
+        for image_path in self.image_paths:
+            img = cv2.imread(str(image_path))
+            if img is None:
+                print(f"Skipping unreadable image: {image_path}")
+                continue
+            inp, _, _ = self.detector.preprocess(img)
+            return {self.detector.input_name: inp.copy()}
+        return None
+
+
+def preprocess_model(model_path: Path, work_dir: Path) -> Path:
+    """Run ONNX Runtime's recommended shape inference / graph cleanup before quantizing"""
+    output_path = work_dir / f"{model_path.stem}.preprocessed.onnx"
+    quant_pre_process(str(model_path), str(output_path))
+    return output_path
+
+
+def quantize_dynamic_model(args):
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = preprocess_model(Path(args.input), Path(work_dir))
+        quantize_dynamic(
+            str(model_path),
+            args.output,
+            weight_type=QuantType.QInt8
+        )
+    print(f"Dynamic INT8 model written to {args.output}")
+
+
+def quantize_static_model(args):
+    calibration_dir = Path(args.calibration_dir)
+    image_paths = sorted(
+        p for p in calibration_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+    )[:args.count]
+
+    if not image_paths:
+        print(f"No calibration images found in {calibration_dir}")
+        sys.exit(1)
+
+    print(f"Calibrating on {len(image_paths)} page images from {calibration_dir}")
+    detector = YOLOTableDetector(model_path=args.input)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = preprocess_model(Path(args.input), Path(work_dir))
+        quantize_static(
+            str(model_path),
+            args.output,
+            PageCalibrationReader(detector, image_paths),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True
+        )
+    print(f"Static INT8 model written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the YOLO table-detection model to INT8")
+    parser.add_argument("--input", type=str, default=str(settings.YOLO_MODEL_PATH), help="FP32 ONNX model")
+    parser.add_argument("--output", type=str, default=str(settings.YOLO_INT8_MODEL_PATH), help="INT8 ONNX model")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    dynamic = sub.add_parser("dynamic", help="Weight-only quantization, no calibration data")
+    dynamic.set_defaults(func=quantize_dynamic_model)
+
+    static = sub.add_parser("static", help="QDQ quantization calibrated on page images")
+    static.add_argument("--calibration-dir", type=str, required=True, help="Folder of rendered page images")
+    static.add_argument("--count", type=int, default=100, help="Maximum calibration images")
+    static.set_defaults(func=quantize_static_model)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()